@@ -1,18 +1,23 @@
 import os
-import tempfile
-import fitz  # PyMuPDF
 import unicodedata
-from docx import Document as DocxDocument
-from openpyxl import load_workbook
-from pptx import Presentation
 import re
 from nicegui import ui, app
 from pathlib import Path
-from docling.document_converter import DocumentConverter
 import logging
 import asyncio
 from typing import Optional, Callable
-import pandas as pd
+
+from src.api.download import router as download_router
+from src.api.preview import router as preview_router
+from src.services.ocr.direct_converter import get_direct_converter
+from src.services.ocr.ocr_service import ocr_service
+from src.services.preview.csv_index import CSVIndex
+from src.services.preview.pdf_render_cache import pdf_render_cache
+from src.services.preview.sheet_reader import SheetReader
+from src.ui.components.batch_panel import BatchPanel
+from src.ui.components.preview import create_paginated_table
+from src.services.result_store import result_store
+from src.utils.file_utils import hash_file, write_stream
 
 # 設定 logging
 logging.basicConfig(level=logging.INFO)
@@ -89,11 +94,18 @@ async def handle_upload(e):
         return
     
     try:
-        # 檢查檔案大小
-        file_size = len(e.content.read())
-        e.content.seek(0)  # 重置文件指針
+        # 獲取上傳的文件
+        file_obj = e.content  # 獲取 SpooledTemporaryFile 物件
+        file_name = e.name
+        file_type = e.type
         
-        if file_size > MAX_FILE_SIZE:
+        # 生成安全檔名，單次分塊寫入目標位置並同時檢查檔案大小
+        safe_name = sanitize_filename(file_name)
+        file_path = UPLOAD_DIR / safe_name
+        try:
+            file_obj.seek(0)
+            file_size, _ = write_stream(file_obj, file_path, max_size=MAX_FILE_SIZE)
+        except ValueError:
             ui.notify(f"檔案大小超過限制 (最大 {MAX_FILE_SIZE/1_000_000}MB)", type='negative')
             # 關閉並刪除暫存檔案
             e.content.close()
@@ -101,41 +113,11 @@ async def handle_upload(e):
             if hasattr(e.sender, 'reset'):
                 e.sender.reset()
             return
-            
-        # 獲取上傳的文件
-        file_obj = e.content  # 獲取 SpooledTemporaryFile 物件
-        file_name = e.name
-        file_type = e.type
-        
-        # 使用臨時文件保存上傳的內容
-        with tempfile.NamedTemporaryFile(
-            delete=False, 
-            suffix=os.path.splitext(file_name)[1]  # 保留原始副檔名
-        ) as tmp:
-            # 重置文件指針並寫入文件內容
-            file_obj.seek(0)
-            tmp.write(file_obj.read())
-            tmp_path = tmp.name  # 獲取臨時文件路徑
         
-        try:
-            # 獲取文件大小
-            file_size = os.path.getsize(tmp_path)
-            
-            # 生成安全檔名並移動到目標目錄
-            safe_name = sanitize_filename(file_name)
-            file_path = UPLOAD_DIR / safe_name
-            os.rename(tmp_path, file_path)  # 移動文件到目標位置
-            
-            # 更新全局變量
-            current_file_path = file_path
-            pdf_pages = 0
-            current_page = 0
-            
-        except Exception as ex:
-            # 發生錯誤時確保刪除臨時文件
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
-            raise ex
+        # 更新全局變量
+        current_file_path = file_path
+        pdf_pages = 0
+        current_page = 0
         
         # 顯示文件訊息
         file_info_text = f"""
@@ -189,24 +171,17 @@ async def process_ocr(file_path: Path, progress_callback: Optional[Callable[[int
             await asyncio.get_event_loop().run_in_executor(None, lambda: progress_callback(10, "正在初始化..."))
             await asyncio.sleep(0.1)  # 讓 UI 有時間更新
         
-        # 初始化轉換器
-        converter = DocumentConverter()
-        
         if progress_callback:
             await asyncio.get_event_loop().run_in_executor(None, lambda: progress_callback(30, "正在處理文件..."))
             await asyncio.sleep(0.1)
         
-        # 執行轉換
-        result = await asyncio.get_event_loop().run_in_executor(None, lambda: converter.convert(str(file_path)))
-
-        if progress_callback:
-            await asyncio.get_event_loop().run_in_executor(None, lambda: progress_callback(80, "正在生成 Markdown..."))
-            await asyncio.sleep(0.1)
-        
-        # 轉換為 Markdown
-        markdown_result = await asyncio.get_event_loop().run_in_executor(
-            None, lambda: result.document.export_to_markdown()
-        )
+        direct_converter = get_direct_converter(file_path)
+        if direct_converter:
+            # 不需要 OCR 的格式直接解析
+            markdown_result = await asyncio.get_event_loop().run_in_executor(None, direct_converter, file_path)
+        else:
+            # 交由工作進程池轉換，取消或逾時時會直接終止執行中的工作進程
+            markdown_result = await ocr_service.pool.submit('convert', file_path=str(file_path))
         
         if progress_callback:
             await asyncio.get_event_loop().run_in_executor(None, lambda: progress_callback(100, "處理完成!"))
@@ -400,7 +375,7 @@ def show_ocr_result(content: str, original_filename: str):
             
         try:
             # 直接調用下載函數
-            download_markdown(content, original_filename)
+            await download_markdown(content, original_filename)
         except Exception as e:
             error_msg = f"下載過程中出錯: {str(e)}"
             logger.error(f"[ERROR] {error_msg}")
@@ -436,7 +411,7 @@ def show_ocr_result(content: str, original_filename: str):
     ui.run_javascript('document.querySelector(".ocr-result-card").scrollIntoView({behavior: "smooth"})')
     ui.update(ocr_result_container)
 
-def download_markdown(content: str, original_filename: str):
+async def download_markdown(content: str, original_filename: str):
     """下載 Markdown 文件"""
     logger.debug(f"開始下載處理，原始檔名: {original_filename}")
     logger.debug(f"內容長度: {len(content) if content else 0} 字元")
@@ -447,36 +422,11 @@ def download_markdown(content: str, original_filename: str):
         safe_name = sanitize_filename(f"{base_name}_ocr.md")
         logger.debug(f"安全檔名: {safe_name}")
         
-        # 確保內容是字節類型
-        if isinstance(content, str):
-            logger.debug("內容是字符串，進行編碼")
-            content_bytes = content.encode('utf-8')
-        
-        logger.debug(f"內容字節長度: {len(content_bytes) if content_bytes else 0}")
-        
-        # 使用 JavaScript 處理下載
-        js = f"""
-        try {{
-            // 將 Python 字節轉換為 JavaScript Uint8Array
-            const content = new TextDecoder().decode(new Uint8Array({list(content_bytes)}));
-            const blob = new Blob([content], {{ type: 'text/markdown;charset=utf-8' }});
-            const url = URL.createObjectURL(blob);
-            const a = document.createElement('a');
-            a.href = url;
-            a.download = '{safe_name}';
-            document.body.appendChild(a);
-            a.click();
-            // 清理
-            setTimeout(() => {{
-                document.body.removeChild(a);
-                URL.revokeObjectURL(url);
-            }}, 100);
-        }} catch (e) {{
-            console.error('下載錯誤:', e);
-            throw e;
-        }}
-        """
-        ui.run_javascript(js)
+        # 保存到伺服器端，由瀏覽器直接向下載路由請求文件
+        result_id = await asyncio.get_running_loop().run_in_executor(
+            None, result_store.put, content, safe_name
+        )
+        ui.download(f"/download/{result_id}")
         
         # 顯示成功訊息
         logger.debug(f"下載已觸發: {safe_name}")
@@ -508,18 +458,8 @@ async def show_pdf_preview(file_path: Path):
     async def update_page():
         global current_page
         if 0 <= current_page < pdf_pages:
-            # 加載頁面
-            page = doc.load_page(current_page)
-            # 調整縮放以獲得更好的顯示效果
-            mat = fitz.Matrix(2.0, 2.0)  # 提高 DPI 以獲得更好的清晰度
-            pix = page.get_pixmap(matrix=mat, alpha=False)
-            
-            # 將圖片保存到臨時文件
-            img_path = UPLOAD_DIR / f"preview_{os.urandom(8).hex()}.png"
-            pix.save(img_path)
-            
-            # 更新圖片
-            image_container.source = str(img_path)
+            # 頁面由渲染快取產生並經由預覽路由提供，不再寫入臨時圖片
+            image_container.source = f"/preview/pdf/{doc_hash}/{current_page}.png?zoom=2.0"
             page_info.text = f"PDF 頁面 {current_page + 1} / {pdf_pages}"
             
             # 更新按鈕狀態
@@ -527,9 +467,10 @@ async def show_pdf_preview(file_path: Path):
             next_btn.disable = current_page >= pdf_pages - 1
                     
     try:
-        # 開啟 PDF 文件
-        doc = fitz.open(file_path)
-        pdf_pages = len(doc)
+        # 登記 PDF 文件供渲染快取使用
+        loop = asyncio.get_running_loop()
+        doc_hash = await loop.run_in_executor(None, hash_file, file_path)
+        pdf_pages = await loop.run_in_executor(None, pdf_render_cache.register, doc_hash, file_path)
         current_page = 0  # 重置為第一頁
         
         # 創建外層容器
@@ -556,6 +497,7 @@ async def show_pdf_preview(file_path: Path):
 
 async def show_docx_preview(file_path: Path):
     """顯示 Word 文件預覽"""
+    from docx import Document as DocxDocument
     doc = DocxDocument(file_path)
     with ui.column().classes('w-full'):
         for para in doc.paragraphs:
@@ -576,6 +518,7 @@ async def show_html_preview(file_path: Path):
 
 async def show_pptx_preview(file_path: Path):
     """顯示 PowerPoint 文件預覽"""
+    from pptx import Presentation
     prs = Presentation(file_path)
     with ui.column().classes('w-full'):
         for i, slide in enumerate(prs.slides):
@@ -586,37 +529,33 @@ async def show_pptx_preview(file_path: Path):
 
 async def show_xlsx_preview(file_path: Path):
     """顯示 Excel 文件預覽"""
-    wb = load_workbook(file_path, read_only=True)
+    # 以唯讀串流方式讀取，每個工作表只取出目前頁面的資料列
+    loop = asyncio.get_running_loop()
+    reader = SheetReader(file_path)
+    sheet_names = await loop.run_in_executor(None, lambda: reader.sheet_names)
     with ui.column().classes('w-full'):
-        for sheet in wb:
-            with ui.expansion(sheet.title, icon='table_chart'):
-                table_data = []
-                for row in sheet.iter_rows(values_only=True):
-                    table_data.append(row)
-                
-                if table_data:
-                    ui.table(
-                        columns=[{'name': f'Col {i+1}', 'field': str(i), 'label': f'Col {i+1}'} for i in range(len(table_data[0]))],
-                        rows=[{str(i): str(cell) if cell is not None else '' for i, cell in enumerate(row)} for row in table_data],
-                        row_key='id',
-                        pagination={'rowsPerPage': 10}
+        for sheet_name in sheet_names:
+            header, total = await loop.run_in_executor(
+                None, lambda: (reader.header(sheet_name), reader.row_count(sheet_name))
+            )
+            with ui.expansion(sheet_name, icon='table_chart'):
+                if header:
+                    await create_paginated_table(
+                        header,
+                        total,
+                        lambda start, count, name=sheet_name: reader.read_rows(name, start, count)
                     )
 
-async def show_csv_preview(file_path: Path, num_rows=100):
+async def show_csv_preview(file_path: Path):
     """顯示 CSV 文件預覽"""
-    df = pd.read_csv(file_path)
-    
-    rows = [df.columns.tolist()]  # 表頭
-    rows.extend(df.values.tolist())  # 資料列
+    # 建立行位移索引，翻頁時直接跳至對應位置讀取
+    loop = asyncio.get_running_loop()
+    index = await loop.run_in_executor(None, CSVIndex, file_path)
+    header = await loop.run_in_executor(None, index.header)
     
     with ui.column().classes('w-full'):
-        ui.label(f"預覽限制: {num_rows} 筆").classes('text-caption text-grey-7 q-mb-md')
-        ui.table(
-            columns=[{'name': str(col), 'label': str(col), 'field': str(col)} 
-                    for col in df.columns],
-            rows=df.head(num_rows).to_dict('records'), # 限制顯示前 100 筆資料
-            pagination={'rowsPerPage': 10}
-        )
+        ui.label(f"總筆數: {index.row_count}").classes('text-caption text-grey-7 q-mb-md')
+        await create_paginated_table(header, index.row_count, index.read_rows)
 
 # 自定義 CSS 樣式
 ui.add_head_html('''
@@ -718,6 +657,11 @@ def create_ui():
                         ui.label('拖曳文件至此或點擊選擇').classes('q-mt-sm')
                         ui.label('(支援 PDF、Word、Excel、PPT 等格式)').classes('text-caption text-grey-7')
         
+        # 批次處理區域
+        with ui.card().classes('w-full custom-card'):
+            with ui.expansion('批次處理多個文件', icon='library_books').classes('w-full'):
+                BatchPanel().create()
+        
         # 預覽區域
         global preview_container
         preview_container = ui.column().classes('w-full q-mt-lg')
@@ -734,5 +678,9 @@ def create_ui():
 # 啟動應用
 if __name__ in ["__main__", "__mp_main__"]:
     app.add_static_files('/temp_uploads', 'temp_uploads')
+    app.include_router(download_router)
+    app.include_router(preview_router)
+    app.on_startup(result_store.cleanup)
+    app.on_shutdown(ocr_service.shutdown)
     create_ui()
     ui.run(title="Document Assistant", port=8080, reload=False, show=False)
@@ -0,0 +1,231 @@
+"""
+基準測試語料產生模組
+
+此模組以固定的亂數種子產生各格式的測試文件：有文字層的 PDF、純圖片（模擬掃描）的 PDF、
+DOCX、PPTX、XLSX 與 CSV，各格式分為數種大小。相同參數每次產生的內容都相同，
+已存在的文件不會重新產生。
+"""
+import csv
+import random
+import re
+import zipfile
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+CORPUS_DIR = Path(__file__).parent / 'corpus'
+
+_WORDS = (
+    'invoice report quarterly revenue customer account balance shipment order total '
+    'contract service period payment amount summary analysis region product margin '
+    'forecast budget statement delivery schedule review approval department number'
+).split()
+
+# 文件元數據中的日期固定，讓產生的文件內容一致
+_PDF_METADATA = {'creationDate': 'D:20240101000000', 'modDate': 'D:20240101000000', 'producer': 'benchmark'}
+_CORE_DATES = re.compile(rb'(<dcterms:(?:created|modified)[^>]*>)[^<]*')
+
+
+class Case(NamedTuple):
+    """單一測試文件"""
+    case_id: str
+    kind: str
+    size: str
+    path: Path
+    mime_type: str
+
+
+def _sentence(rng: random.Random, words: int = 12) -> str:
+    """產生一個句子"""
+    text = ' '.join(rng.choice(_WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + '.'
+
+
+def _paragraph(rng: random.Random) -> str:
+    """產生一個段落"""
+    return ' '.join(_sentence(rng, rng.randint(8, 16)) for _ in range(rng.randint(3, 6)))
+
+
+def _write_text_pdf(path: Path, pages: int, rng: random.Random) -> None:
+    """產生有文字層的 PDF"""
+    import fitz
+
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        text = f"Section {page_num + 1}\n\n" + '\n\n'.join(_paragraph(rng) for _ in range(4))
+        page.insert_textbox(fitz.Rect(50, 50, 545, 790), text, fontsize=11)
+    doc.set_metadata(_PDF_METADATA)
+    doc.save(path, garbage=4, deflate=True, no_new_id=True)
+    doc.close()
+
+
+def _write_scanned_pdf(path: Path, pages: int, rng: random.Random) -> None:
+    """產生只有頁面圖片、沒有文字層的 PDF，模擬掃描文件"""
+    import fitz
+
+    doc = fitz.open()
+    for page_num in range(pages):
+        source = fitz.open()
+        source_page = source.new_page()
+        text = f"Scanned page {page_num + 1}\n\n" + '\n\n'.join(_paragraph(rng) for _ in range(4))
+        source_page.insert_textbox(fitz.Rect(50, 50, 545, 790), text, fontsize=11)
+        pixmap = source_page.get_pixmap(dpi=150, colorspace=fitz.csGRAY)
+        source.close()
+
+        page = doc.new_page()
+        page.insert_image(page.rect, pixmap=pixmap)
+    doc.set_metadata(_PDF_METADATA)
+    doc.save(path, garbage=4, deflate=True, no_new_id=True)
+    doc.close()
+
+
+def _normalize_zip(path: Path) -> None:
+    """將 Office 文件中的時間戳記與建立、修改日期改為固定值，讓相同內容產生相同的位元組"""
+    tmp_path = path.with_name(f"zip_{path.name}")
+    with zipfile.ZipFile(path) as source, zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as target:
+        for info in source.infolist():
+            member = zipfile.ZipInfo(info.filename, date_time=(2024, 1, 1, 0, 0, 0))
+            member.compress_type = zipfile.ZIP_DEFLATED
+            data = source.read(info)
+            if info.filename == 'docProps/core.xml':
+                data = _CORE_DATES.sub(rb'\g<1>2024-01-01T00:00:00Z', data)
+            target.writestr(member, data)
+    tmp_path.replace(path)
+
+
+def _write_docx(path: Path, paragraphs: int, rng: random.Random) -> None:
+    """產生 Word 文件，每 20 段插入一個標題，每 100 段插入一個表格"""
+    from docx import Document
+
+    document = Document()
+    document.add_heading('Benchmark document', level=1)
+    for index in range(paragraphs):
+        if index % 20 == 0:
+            document.add_heading(f"Section {index // 20 + 1}", level=2)
+        if index % 100 == 50:
+            table = document.add_table(rows=6, cols=4)
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = rng.choice(_WORDS)
+        document.add_paragraph(_paragraph(rng))
+    document.save(path)
+    _normalize_zip(path)
+
+
+def _write_pptx(path: Path, slides: int, rng: random.Random) -> None:
+    """產生 PowerPoint 簡報，每張投影片包含標題、項目符號與備註"""
+    from pptx import Presentation
+
+    presentation = Presentation()
+    layout = presentation.slide_layouts[1]
+    for index in range(slides):
+        slide = presentation.slides.add_slide(layout)
+        slide.shapes.title.text = f"Slide {index + 1}: {rng.choice(_WORDS).title()}"
+        body = slide.placeholders[1].text_frame
+        body.text = _sentence(rng)
+        for _ in range(4):
+            body.add_paragraph().text = _sentence(rng)
+        slide.notes_slide.notes_text_frame.text = _sentence(rng)
+    presentation.save(path)
+    _normalize_zip(path)
+
+
+def _table_row(rng: random.Random, index: int) -> List:
+    """產生一列表格資料"""
+    return [
+        index,
+        f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        rng.choice(_WORDS),
+        rng.choice(_WORDS),
+        round(rng.uniform(0, 10_000), 2),
+        rng.randint(1, 500),
+        _sentence(rng, 6),
+    ]
+
+
+_TABLE_HEADER = ['id', 'date', 'region', 'product', 'amount', 'quantity', 'note']
+
+
+def _write_xlsx(path: Path, rows: int, rng: random.Random) -> None:
+    """產生包含兩張工作表的 Excel 活頁簿"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for sheet_index, sheet_rows in enumerate((rows, max(1, rows // 10))):
+        sheet = workbook.create_sheet(f"Sheet{sheet_index + 1}")
+        sheet.append(_TABLE_HEADER)
+        for index in range(sheet_rows):
+            sheet.append(_table_row(rng, index))
+    workbook.save(path)
+    _normalize_zip(path)
+
+
+def _write_csv(path: Path, rows: int, rng: random.Random) -> None:
+    """產生 CSV 文件"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(_TABLE_HEADER)
+        for index in range(rows):
+            writer.writerow(_table_row(rng, index))
+
+
+# 各格式的產生函數、副檔名、MIME 類型與各大小對應的數量（頁數、段落數、投影片數或列數）
+FORMATS: Dict[str, tuple] = {
+    'text_pdf': (_write_text_pdf, '.pdf', 'application/pdf', {'small': 1, 'medium': 10, 'large': 50}),
+    'scanned_pdf': (_write_scanned_pdf, '.pdf', 'application/pdf', {'small': 1, 'medium': 5, 'large': 20}),
+    'docx': (
+        _write_docx, '.docx',
+        'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+        {'small': 50, 'medium': 500, 'large': 5000}
+    ),
+    'pptx': (
+        _write_pptx, '.pptx',
+        'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+        {'small': 5, 'medium': 50, 'large': 200}
+    ),
+    'xlsx': (
+        _write_xlsx, '.xlsx',
+        'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        {'small': 1_000, 'medium': 10_000, 'large': 50_000}
+    ),
+    'csv': (_write_csv, '.csv', 'text/csv', {'small': 1_000, 'medium': 50_000, 'large': 500_000}),
+}
+
+SIZES = ('small', 'medium', 'large')
+
+
+def build_corpus(
+    kinds: Optional[List[str]] = None,
+    sizes: Optional[List[str]] = None,
+    corpus_dir: Path = CORPUS_DIR,
+    log: Callable[[str], None] = print
+) -> List[Case]:
+    """
+    產生（或沿用已存在的）測試文件
+
+    Args:
+        kinds: 要產生的格式，None 表示全部
+        sizes: 要產生的大小，None 表示全部
+        corpus_dir: 語料目錄
+        log: 輸出訊息的函數
+
+    Returns:
+        List[Case]: 測試文件列表
+    """
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    cases = []
+    for kind in kinds or FORMATS:
+        writer, suffix, mime_type, counts = FORMATS[kind]
+        for size in sizes or SIZES:
+            count = counts[size]
+            case_id = f"{kind}-{size}"
+            path = corpus_dir / f"{kind}_{count}{suffix}"
+            if not path.exists():
+                log(f"產生測試文件 {path.name}")
+                # 每個文件使用獨立的種子，只產生部分文件時內容也不變
+                rng = random.Random(f"{kind}:{count}")
+                tmp_path = path.with_name(f"tmp_{path.name}")
+                writer(tmp_path, count, rng)
+                tmp_path.replace(path)
+            cases.append(Case(case_id, kind, size, path, mime_type))
+    return cases
@@ -0,0 +1,354 @@
+"""
+端對端基準測試
+
+此模組以 benchmarks/corpus.py 產生的測試文件分別計時各處理階段：
+
+- ingest：以上傳流程保存文件（分塊寫入並計算雜湊）
+- preview：FilePreview.show 處理器；PDF 另計第一頁的渲染時間（preview_render）
+- convert：轉換為文件模型（docling 的 converter.convert，或直接解析、試算表轉換）
+- export：由 docling 文件模型輸出 Markdown（export_to_markdown）
+- service：經由 OCRService.process_document 的完整處理（含工作進程池與排隊，不使用既有快取）
+
+結果寫入 benchmarks/results/ 下的 JSON 文件，並與 benchmarks/baseline.json 比較。
+
+使用方式:
+    python -m benchmarks.run [--kinds csv,docx] [--sizes small,medium] [--repeat 3]
+                             [--no-service] [--save-baseline] [--fail-on-regression]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from benchmarks.corpus import FORMATS, SIZES, Case, build_corpus
+
+BENCHMARK_DIR = Path(__file__).parent
+RESULT_DIR = BENCHMARK_DIR / 'results'
+BASELINE_PATH = BENCHMARK_DIR / 'baseline.json'
+
+STAGES = ('ingest', 'preview', 'preview_render', 'convert', 'export', 'service')
+
+
+class StageSkipped(Exception):
+    """此文件不適用該階段"""
+
+
+def _summarize(runs: List[float]) -> Dict[str, Any]:
+    """彙整單一階段的多次計時結果"""
+    return {
+        'median': statistics.median(runs),
+        'min': min(runs),
+        'max': max(runs),
+        'runs': runs,
+    }
+
+
+async def _measure(repeat: int, stage: Callable[[], Awaitable[Optional[float]]]) -> Dict[str, Any]:
+    """
+    重複執行並計時單一階段
+
+    階段函數返回 None 時以整個調用計時；返回數值時以該數值作為本次耗時，
+    用於只計算部分步驟的階段。
+    """
+    runs = []
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            elapsed = await stage()
+            runs.append(elapsed if elapsed is not None else time.perf_counter() - started)
+    except StageSkipped:
+        return {}
+    except Exception as e:
+        return {'error': f"{type(e).__name__}: {e}"}
+    return _summarize(runs)
+
+
+class Benchmark:
+    """各處理階段的計時"""
+
+    def __init__(self, repeat: int, work_dir: Path, service: bool):
+        self.repeat = repeat
+        self.work_dir = work_dir
+        self.use_service = service
+        self.ocr_service = None
+
+    async def run_case(self, case: Case) -> Dict[str, Any]:
+        """計時單一測試文件的所有階段"""
+        from src.utils.file_utils import hash_file
+
+        content_hash = hash_file(case.path)
+        stages = {
+            'ingest': await _measure(self.repeat, lambda: self._ingest(case)),
+            'preview': await _measure(self.repeat, lambda: self._preview(case, content_hash)),
+            'preview_render': await _measure(self.repeat, lambda: self._preview_render(case, content_hash)),
+        }
+        stages.update(await self._convert_and_export(case))
+        if self.use_service:
+            stages['service'] = await _measure(self.repeat, lambda: self._service(case, content_hash))
+        return {
+            'kind': case.kind,
+            'size': case.size,
+            'bytes': case.path.stat().st_size,
+            'stages': {name: result for name, result in stages.items() if result},
+        }
+
+    async def _ingest(self, case: Case) -> None:
+        """以上傳事件的形式保存文件"""
+        from src.utils.file_utils import save_uploaded_file
+
+        target_dir = self.work_dir / 'uploads'
+        with open(case.path, 'rb') as content:
+            upload = SimpleNamespace(name=case.path.name, type=case.mime_type, content=content)
+            _, _, error = save_uploaded_file(upload, target_dir)
+        shutil.rmtree(target_dir, ignore_errors=True)
+        if error:
+            raise RuntimeError(error)
+
+    async def _preview(self, case: Case, content_hash: str) -> None:
+        """在不連線的 NiceGUI 客戶端中執行預覽處理器"""
+        from nicegui import Client
+        from nicegui.page import page
+
+        from src.services.preview import pdf_render_cache as render_module
+        from src.ui.components import preview as preview_module
+
+        # 每次使用新的渲染快取，避免沿用前一次登記的文件
+        preview_module.pdf_render_cache = render_module.PDFRenderCache()
+        handler = preview_module.get_preview_handler(case.path, case.mime_type, content_hash)
+        if handler is None:
+            raise StageSkipped()
+
+        client = Client(page('/benchmark'), request=None)
+        try:
+            with client.content:
+                await handler.show()
+        finally:
+            client.delete()
+
+    async def _preview_render(self, case: Case, content_hash: str) -> float:
+        """PDF 第一頁的渲染時間（未命中渲染快取）"""
+        if case.mime_type != 'application/pdf':
+            raise StageSkipped()
+        from src.services.preview.pdf_render_cache import PDFRenderCache
+
+        cache = PDFRenderCache(prefetch_pages=0)
+        cache.register(content_hash, case.path)
+        started = time.perf_counter()
+        await cache.render(content_hash, 0)
+        return time.perf_counter() - started
+
+    async def _convert_and_export(self, case: Case) -> Dict[str, Dict[str, Any]]:
+        """依 OCRService 的路由方式在本進程中計時轉換與 Markdown 輸出"""
+        from src.config import settings
+        from src.services.ocr.direct_converter import get_direct_converter
+        from src.services.ocr.sheet_converter import is_spreadsheet, list_sheets, sheet_to_markdown
+
+        async def in_executor(function: Callable[[], Any]) -> None:
+            await asyncio.get_running_loop().run_in_executor(None, function)
+
+        direct_converter = get_direct_converter(case.path)
+        if direct_converter:
+            # 直接解析一次產生 Markdown，沒有獨立的輸出階段
+            convert = await _measure(self.repeat, lambda: in_executor(lambda: direct_converter(case.path)))
+            return {'convert': convert}
+
+        if is_spreadsheet(case.path):
+            def convert_sheets() -> None:
+                for sheet in list_sheets(case.path):
+                    sheet_to_markdown(case.path, sheet, max_rows=settings.SHEET_MAX_ROWS or None)
+            return {'convert': await _measure(self.repeat, lambda: in_executor(convert_sheets))}
+
+        return await self._docling_stages(case)
+
+    async def _docling_stages(self, case: Case) -> Dict[str, Dict[str, Any]]:
+        """分別計時 docling 的 converter.convert 與 export_to_markdown"""
+        from src.config import settings
+        from src.services.ocr.pdf_utils import detect_text_pages
+
+        do_ocr = True
+        if case.mime_type == 'application/pdf' and settings.PDF_TEXT_FAST_PATH:
+            do_ocr = not all(detect_text_pages(case.path, settings.PDF_TEXT_MIN_CHARS))
+
+        try:
+            from src.services.ocr.worker import get_converter
+
+            # 模型載入不計入轉換時間
+            converter = get_converter(do_ocr)
+        except Exception as e:
+            error = {'error': f"{type(e).__name__}: {e}"}
+            return {'convert': error, 'export': error}
+
+        convert_runs, export_runs = [], []
+        try:
+            for _ in range(self.repeat):
+                started = time.perf_counter()
+                result = converter.convert(str(case.path))
+                convert_runs.append(time.perf_counter() - started)
+
+                started = time.perf_counter()
+                result.document.export_to_markdown()
+                export_runs.append(time.perf_counter() - started)
+        except Exception as e:
+            error = {'error': f"{type(e).__name__}: {e}"}
+            return {'convert': error, 'export': error}
+        return {'convert': _summarize(convert_runs), 'export': _summarize(export_runs)}
+
+    async def _service(self, case: Case, content_hash: str) -> None:
+        """經由 OCR 服務完整處理文件"""
+        from src.services.ocr.result_cache import ResultCache
+
+        service = await self._get_service()
+        # 每次使用空的結果快取，確保實際執行轉換
+        service.cache = ResultCache(Path(tempfile.mkdtemp(dir=self.work_dir, prefix='cache_')))
+        success, message, _ = await service.process_document(case.path, content_hash=content_hash)
+        if not success:
+            raise RuntimeError(message)
+
+    async def _get_service(self):
+        """建立 OCR 服務並等待工作進程就緒，啟動時間不計入處理時間"""
+        if self.ocr_service is None:
+            from src.services.ocr.ocr_service import OCRService
+
+            self.ocr_service = OCRService(max_workers=1)
+            await self.ocr_service.start()
+            while not self.ocr_service.is_ready and self.ocr_service.pool._failed_workers == 0:
+                await asyncio.sleep(0.1)
+        return self.ocr_service
+
+    async def close(self) -> None:
+        """關閉 OCR 服務"""
+        if self.ocr_service is not None:
+            await self.ocr_service.shutdown()
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    比較本次結果與基準，印出各階段中位數的變化
+
+    Args:
+        results: 本次結果
+        baseline: 基準結果
+        threshold: 視為退步的變慢比例，例如 0.15 表示慢 15% 以上
+
+    Returns:
+        List[str]: 退步的「文件/階段」列表
+    """
+    regressions = []
+    print(f"\n{'文件':<22}{'階段':<16}{'基準 (ms)':>12}{'本次 (ms)':>12}{'變化':>10}")
+    for case_id, case in results['cases'].items():
+        base_case = baseline.get('cases', {}).get(case_id)
+        if base_case is None:
+            continue
+        for stage, current in case['stages'].items():
+            base = base_case['stages'].get(stage, {})
+            if 'median' not in current or 'median' not in base:
+                continue
+            ratio = current['median'] / base['median'] if base['median'] else 1.0
+            # 變化小於 1 毫秒時視為量測誤差
+            regressed = ratio > 1 + threshold and current['median'] - base['median'] > 0.001
+            mark = '  退步' if regressed else ''
+            print(
+                f"{case_id:<22}{stage:<16}{base['median'] * 1000:>12.1f}"
+                f"{current['median'] * 1000:>12.1f}{(ratio - 1) * 100:>+9.1f}%{mark}"
+            )
+            if regressed:
+                regressions.append(f"{case_id}/{stage}")
+    return regressions
+
+
+def _git_commit() -> Optional[str]:
+    """取得目前的 git commit，非 git 工作目錄時返回 None"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=BENCHMARK_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """解析命令列參數"""
+    parser = argparse.ArgumentParser(description="文件處理各階段的基準測試")
+    parser.add_argument('--kinds', default=','.join(FORMATS), help="測試的格式，以逗號分隔")
+    parser.add_argument('--sizes', default=','.join(SIZES), help="測試的大小，以逗號分隔")
+    parser.add_argument('--repeat', type=int, default=3, help="每個階段重複執行的次數（預設 3）")
+    parser.add_argument('--no-service', action='store_true', help="不測試經由 OCR 服務的完整處理")
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH, help="比較用的基準結果文件")
+    parser.add_argument('--save-baseline', action='store_true', help="將本次結果存為新的基準")
+    parser.add_argument('--threshold', type=float, default=0.15, help="視為退步的變慢比例（預設 0.15）")
+    parser.add_argument('--fail-on-regression', action='store_true', help="有退步時以非零狀態碼結束")
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """執行基準測試並返回結果"""
+    cases = build_corpus(args.kinds.split(','), args.sizes.split(','))
+    results: Dict[str, Any] = {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+        },
+        'cases': {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix='benchmark_') as work_dir:
+        benchmark = Benchmark(args.repeat, Path(work_dir), service=not args.no_service)
+        try:
+            for case in cases:
+                print(f"測試 {case.case_id} ({case.path.name})")
+                results['cases'][case.case_id] = case_result = await benchmark.run_case(case)
+                for stage in STAGES:
+                    result = case_result['stages'].get(stage)
+                    if result is None:
+                        continue
+                    if 'error' in result:
+                        print(f"  {stage:<16}失敗: {result['error']}")
+                    else:
+                        print(f"  {stage:<16}{result['median'] * 1000:10.1f} ms")
+        finally:
+            await benchmark.close()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令列入口"""
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(name)s - %(message)s')
+    results = asyncio.run(run(args))
+
+    RESULT_DIR.mkdir(parents=True, exist_ok=True)
+    output_path = RESULT_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output_path.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding='utf-8')
+    shutil.copyfile(output_path, RESULT_DIR / 'latest.json')
+    print(f"\n結果已保存到: {output_path}")
+
+    regressions = []
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+        print(f"與基準比較（{baseline['meta'].get('created')}, commit {baseline['meta'].get('commit')}）")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} 個階段退步超過 {args.threshold:.0%}: {', '.join(regressions)}")
+    if args.save_baseline:
+        shutil.copyfile(output_path, args.baseline)
+        print(f"已更新基準: {args.baseline}")
+
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""
+下載路由模組
+
+此模組提供以 HTTP 串流下載處理結果的路由，支援 Range 請求與 gzip 壓縮，
+多個結果可合併為邊產生邊傳送的 ZIP 下載。
+"""
+import re
+import time
+import zipfile
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+
+from src.services.result_store import result_store
+
+CHUNK_SIZE = 64 * 1024
+
+_RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+router = APIRouter()
+
+
+def _content_disposition(filename: str) -> str:
+    """產生同時相容 ASCII 與 UTF-8 檔名的 Content-Disposition"""
+    fallback = filename.encode('ascii', 'ignore').decode('ascii').replace('"', '') or 'download'
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename)}"
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    解析單一區段的 Range 標頭
+
+    Args:
+        header: Range 標頭內容
+        size: 內容總大小
+
+    Returns:
+        Optional[Tuple[int, int]]: (起始位置, 結束位置)，皆包含在內；無法滿足時返回 None
+
+    Raises:
+        ValueError: 標頭格式不支援（例如多區段），應忽略並返回完整內容
+    """
+    match = _RANGE_PATTERN.match(header.strip())
+    if not match:
+        raise ValueError(header)
+    start, end = match.groups()
+    if not start and not end:
+        raise ValueError(header)
+
+    if not start:
+        # bytes=-N 表示最後 N 個位元組
+        length = int(end)
+        if length == 0:
+            return None
+        return max(0, size - length), size - 1
+
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        return None
+    return start, end
+
+
+def _iter_file(path: Path, start: int = 0, length: Optional[int] = None) -> Iterator[bytes]:
+    """分塊讀取文件內容"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = length
+        while remaining is None or remaining > 0:
+            chunk = f.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+
+
+def _iter_gzip(path: Path) -> Iterator[bytes]:
+    """分塊讀取並以 gzip 壓縮文件內容"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in _iter_file(path):
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class _ZipStream:
+    """只寫入的 ZIP 輸出緩衝區，每寫完一段即由產生器取出傳送"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _zip_member_names(members: List[Dict[str, Any]]) -> List[str]:
+    """產生不重複的 ZIP 成員名稱"""
+    names = []
+    used = set()
+    for member in members:
+        stem, dot, suffix = member['filename'].rpartition('.')
+        name = member['filename']
+        counter = 2
+        while name in used:
+            name = f"{stem} ({counter}){dot}{suffix}" if dot else f"{member['filename']} ({counter})"
+            counter += 1
+        used.add(name)
+        names.append(name)
+    return names
+
+
+def _iter_zip(members: List[Dict[str, Any]]) -> Iterator[bytes]:
+    """
+    逐一讀取結果文件並壓縮為 ZIP 串流
+
+    輸出不可回頭修改，各成員的大小與 CRC 寫在資料描述區中，
+    記憶體用量只與讀取區塊大小有關。
+    """
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for member, name in zip(members, _zip_member_names(members)):
+            info = zipfile.ZipInfo(name, date_time=time.localtime(member['created'])[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.file_size = member['path'].stat().st_size
+            with archive.open(info, 'w') as dest:
+                for chunk in _iter_file(member['path']):
+                    dest.write(chunk)
+                    data = stream.drain()
+                    if data:
+                        yield data
+            yield stream.drain()
+    yield stream.drain()
+
+
+@router.get('/download/bundle/{bundle_id}')
+def download_bundle(bundle_id: str) -> Response:
+    """
+    以 ZIP 串流下載多個處理結果
+
+    Args:
+        bundle_id: 下載包識別碼
+
+    Returns:
+        Response: 串流回應
+    """
+    bundle = result_store.get_bundle(bundle_id)
+    if bundle is None or not bundle['members']:
+        raise HTTPException(status_code=404, detail="結果不存在或已過期")
+
+    headers = {'Content-Disposition': _content_disposition(bundle['filename'])}
+    return StreamingResponse(_iter_zip(bundle['members']), media_type='application/zip', headers=headers)
+
+
+@router.get('/download/{result_id}')
+def download_result(result_id: str, request: Request) -> Response:
+    """
+    下載處理結果
+
+    Args:
+        result_id: 結果識別碼
+        request: HTTP 請求
+
+    Returns:
+        Response: 串流回應
+    """
+    entry = result_store.get(result_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="結果不存在或已過期")
+
+    path = entry['path']
+    size = path.stat().st_size
+    media_type = entry['media_type']
+    if media_type.startswith('text/'):
+        media_type = f"{media_type}; charset=utf-8"
+    headers = {
+        'Content-Disposition': _content_disposition(entry['filename']),
+        'Accept-Ranges': 'bytes',
+        'Vary': 'Accept-Encoding',
+    }
+
+    range_header = request.headers.get('range')
+    if range_header:
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            pass
+        else:
+            if byte_range is None:
+                return Response(
+                    status_code=416,
+                    headers={'Content-Range': f"bytes */{size}"}
+                )
+            start, end = byte_range
+            headers['Content-Range'] = f"bytes {start}-{end}/{size}"
+            headers['Content-Length'] = str(end - start + 1)
+            return StreamingResponse(
+                _iter_file(path, start, end - start + 1),
+                status_code=206,
+                media_type=media_type,
+                headers=headers
+            )
+
+    if 'gzip' in request.headers.get('accept-encoding', ''):
+        headers['Content-Encoding'] = 'gzip'
+        return StreamingResponse(_iter_gzip(path), media_type=media_type, headers=headers)
+
+    headers['Content-Length'] = str(size)
+    return StreamingResponse(_iter_file(path), media_type=media_type, headers=headers)
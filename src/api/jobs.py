@@ -0,0 +1,215 @@
+"""
+轉換任務 API 路由模組
+
+此模組提供以 JSON 提交與查詢轉換任務的 REST API，與網頁界面共用 OCR 工作進程池與結果快取：
+
+- POST /api/jobs?filename=文件名：請求內容為文件本身，以串流寫入磁碟，返回任務識別碼
+- GET /api/jobs/{job_id}：查詢狀態與頁面進度，trace_url 為該任務的追蹤檢視頁面
+- GET /api/jobs/{job_id}/result?format=markdown|json：以串流取得轉換結果
+- GET /api/jobs/{job_id}/profile?format=json|text：取得效能分析報告（提交時加上 profile=true 或被抽樣的任務）
+- DELETE /api/jobs/{job_id}：取消任務
+"""
+import codecs
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+
+from src.api.download import _content_disposition, _iter_file
+from src.config import settings
+from src.services.job_manager import STATUS_SUCCEEDED, job_manager
+from src.services.metrics import BYTES_INGESTED_TOTAL
+from src.services.profiling import report_path
+from src.services.result_store import result_store
+from src.services.tracing import tracer
+from src.utils.file_utils import sanitize_filename, write_async_stream
+
+router = APIRouter(prefix='/api/jobs')
+
+# 副檔名對應的 MIME 類型
+_SUFFIX_TYPES = {suffix: mime_type for mime_type, suffix in settings.FILE_EXTENSIONS.items()}
+
+
+def _job_response(job: Dict[str, Any]) -> Dict[str, Any]:
+    """將任務資訊轉為 API 回應"""
+    body = {key: value for key, value in job.items() if key != 'result_id'}
+    body['status_url'] = f"/api/jobs/{job['job_id']}"
+    body['trace_url'] = f"/traces/{job['job_id']}"
+    if job['status'] == STATUS_SUCCEEDED:
+        body['result_url'] = f"/api/jobs/{job['job_id']}/result"
+    if job['profiled']:
+        body['profile_url'] = f"/api/jobs/{job['job_id']}/profile"
+    return body
+
+
+@router.post('', status_code=202)
+async def create_job(request: Request, filename: str, profile: bool = False) -> JSONResponse:
+    """
+    提交文件進行轉換
+
+    請求內容直接為文件的二進位資料，邊接收邊寫入磁碟，不在記憶體中緩衝整個文件。
+
+    Args:
+        request: HTTP 請求
+        filename: 原始文件名，用於判斷文件類型
+        profile: 是否以 cProfile 與 tracemalloc 分析本次轉換
+
+    Returns:
+        JSONResponse: 任務資訊
+    """
+    suffix = Path(filename).suffix.lower()
+    if suffix not in _SUFFIX_TYPES:
+        raise HTTPException(status_code=415, detail="不支援的文件類型")
+    content_length = request.headers.get('content-length')
+    if content_length and content_length.isdigit() and int(content_length) > settings.MAX_FILE_SIZE:
+        raise HTTPException(status_code=413, detail=f"檔案大小超過限制 (最大 {settings.MAX_FILE_SIZE/1_000_000}MB)")
+
+    job_id, upload_dir = job_manager.new_job_dir()
+    file_path = upload_dir / (sanitize_filename(filename) or f"upload{suffix}")
+    try:
+        # 上傳在任務建立前完成，以任務識別碼作為追蹤識別碼記錄
+        with tracer.span('ingest', trace_id=job_id, filename=filename) as span:
+            size, content_hash = await write_async_stream(request.stream(), file_path)
+            span.set(bytes=size)
+    except ValueError as e:
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        raise HTTPException(status_code=413, detail=str(e))
+    except BaseException:
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        raise
+    if size == 0:
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        raise HTTPException(status_code=400, detail="未上傳文件內容")
+    BYTES_INGESTED_TOTAL.inc(_SUFFIX_TYPES[suffix], amount=size)
+
+    client_host = request.client.host if request.client else None
+    job = await job_manager.submit(
+        job_id,
+        file_path,
+        filename,
+        content_hash=content_hash,
+        client_id=f"api:{client_host}" if client_host else None,
+        profile=profile
+    )
+    return JSONResponse(
+        _job_response(job),
+        status_code=202,
+        headers={'Location': f"/api/jobs/{job_id}"}
+    )
+
+
+@router.get('/{job_id}')
+def get_job(job_id: str) -> Dict[str, Any]:
+    """
+    查詢任務狀態
+
+    status 在工作進程開始轉換前為 queued，開始後為 running；PDF 的 pages_done 隨已完成的頁面更新。
+
+    Args:
+        job_id: 任務識別碼
+
+    Returns:
+        dict: 任務資訊，包含 status、progress、pages_done、total_pages 等欄位
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="任務不存在或已過期")
+    return _job_response(job)
+
+
+@router.delete('/{job_id}')
+async def cancel_job(job_id: str) -> Dict[str, Any]:
+    """
+    取消任務
+
+    Args:
+        job_id: 任務識別碼
+
+    Returns:
+        dict: 任務資訊
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="任務不存在或已過期")
+    await job_manager.cancel(job_id)
+    return _job_response(job)
+
+
+def _iter_json_result(job: Dict[str, Any], path: Path) -> Iterator[bytes]:
+    """
+    以串流輸出包含 Markdown 的 JSON 物件
+
+    Markdown 分塊讀取並逐塊轉義為 JSON 字串內容，不需將整份結果載入記憶體。
+    """
+    head = {key: job[key] for key in ('job_id', 'filename', 'message', 'total_pages')}
+    yield (json.dumps(head, ensure_ascii=False)[:-1] + ', "markdown": "').encode('utf-8')
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    for chunk in _iter_file(path):
+        text = decoder.decode(chunk)
+        if text:
+            yield json.dumps(text, ensure_ascii=False)[1:-1].encode('utf-8')
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield json.dumps(tail, ensure_ascii=False)[1:-1].encode('utf-8')
+    yield b'"}'
+
+
+@router.get('/{job_id}/result')
+def get_job_result(job_id: str, format: str = 'markdown') -> Response:
+    """
+    以串流取得轉換結果
+
+    Args:
+        job_id: 任務識別碼
+        format: 輸出格式，markdown 或 json
+
+    Returns:
+        Response: 串流回應
+    """
+    if format not in ('markdown', 'json'):
+        raise HTTPException(status_code=400, detail="format 必須為 markdown 或 json")
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="任務不存在或已過期")
+    if job['status'] != STATUS_SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"任務尚未完成（{job['status']}）")
+    entry = result_store.get(job['result_id'])
+    if entry is None:
+        raise HTTPException(status_code=404, detail="結果不存在或已過期")
+
+    path = entry['path']
+    if format == 'json':
+        return StreamingResponse(_iter_json_result(job, path), media_type='application/json')
+    headers = {
+        'Content-Disposition': _content_disposition(entry['filename']),
+        'Content-Length': str(path.stat().st_size),
+    }
+    return StreamingResponse(_iter_file(path), media_type='text/markdown; charset=utf-8', headers=headers)
+
+
+@router.get('/{job_id}/profile')
+def get_job_profile(job_id: str, format: str = 'json') -> FileResponse:
+    """
+    取得任務的效能分析報告
+
+    Args:
+        job_id: 任務識別碼
+        format: 輸出格式，json 或 text
+
+    Returns:
+        FileResponse: 報告文件
+    """
+    if format not in ('json', 'text'):
+        raise HTTPException(status_code=400, detail="format 必須為 json 或 text")
+    if not job_id.isalnum():
+        raise HTTPException(status_code=404, detail="效能分析報告不存在")
+    path = report_path(job_id)
+    if format == 'text':
+        path = path.with_name('report.txt')
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="效能分析報告不存在或已過期")
+    media_type = 'application/json' if format == 'json' else 'text/plain; charset=utf-8'
+    return FileResponse(path, media_type=media_type)
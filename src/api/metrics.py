@@ -0,0 +1,37 @@
+"""
+指標路由模組
+
+此模組以 Prometheus 文字格式提供各處理階段的耗時、吞吐量與工作進程池狀態。
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.services.metrics import (
+    CACHE_HITS,
+    CACHE_MISSES,
+    QUEUE_DEPTH,
+    WORKERS_ACTIVE,
+    WORKERS_READY,
+    registry,
+)
+from src.services.ocr.ocr_service import ocr_service
+
+router = APIRouter()
+
+# 即時狀態在輸出時才讀取
+QUEUE_DEPTH.set_function(lambda: ocr_service.pool.queue_depth)
+WORKERS_ACTIVE.set_function(lambda: ocr_service.pool.busy_workers)
+WORKERS_READY.set_function(lambda: ocr_service.pool.ready_workers)
+CACHE_HITS.set_function(lambda: ocr_service.cache.hits)
+CACHE_MISSES.set_function(lambda: ocr_service.cache.misses)
+
+
+@router.get('/metrics', response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """
+    輸出所有指標
+
+    Returns:
+        PlainTextResponse: Prometheus 文字格式的指標
+    """
+    return PlainTextResponse(registry.render(), media_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,38 @@
+"""
+預覽路由模組
+
+此模組提供由渲染快取取得 PDF 頁面圖片的路由。
+"""
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response
+
+from src.services.preview.pdf_render_cache import pdf_render_cache
+
+router = APIRouter()
+
+
+@router.get('/preview/pdf/{doc_hash}/{page_num}.png')
+async def pdf_page_image(doc_hash: str, page_num: int, zoom: float = 1.0) -> Response:
+    """
+    取得 PDF 頁面圖片
+
+    Args:
+        doc_hash: 文件內容雜湊
+        page_num: 頁碼（從 0 起算）
+        zoom: 縮放比例
+
+    Returns:
+        Response: PNG 圖片
+    """
+    if not 0.1 <= zoom <= 4.0:
+        raise HTTPException(status_code=400, detail="縮放比例超出範圍")
+    try:
+        data = await pdf_render_cache.render(doc_hash, page_num, zoom)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="頁面不存在")
+    # 內容由文件雜湊決定，可由瀏覽器長期快取
+    return Response(
+        content=data,
+        media_type='image/png',
+        headers={'Cache-Control': 'private, max-age=86400, immutable'}
+    )
@@ -9,8 +9,18 @@ from pathlib import Path
 
 from nicegui import app, ui
 
+from src.api.download import router as download_router
+from src.api.jobs import router as jobs_router
+from src.api.metrics import router as metrics_router
+from src.api.preview import router as preview_router
 from src.config import settings
-from src.ui.main_ui import MainUI
+from src.services.job_manager import job_manager
+from src.services.loop_monitor import loop_monitor
+from src.services.ocr.ocr_service import ocr_service
+from src.services.profiling import cleanup_profiles
+from src.services.result_store import result_store
+from src.services.tracing import tracer
+from src.ui import admin_dashboard, main_ui, trace_viewer  # noqa: F401  註冊主頁面、/admin 營運儀表板與 /traces/{trace_id} 追蹤檢視頁面
 from src.utils.file_utils import clear_upload_directory
 
 # 配置日誌
@@ -25,13 +35,31 @@ logger = logging.getLogger(__name__)
 
 
 # 初始化應用
-main_ui = MainUI()
-app.on_startup(main_ui.init_ui)
+# 清空上傳目錄（僅在伺服器啟動時執行，避免 OCR 工作進程載入本模組時誤刪文件）
+app.on_startup(clear_upload_directory)
+# 清除過期的下載結果
+app.on_startup(result_store.cleanup)
+# 清除過期的效能分析報告
+app.on_startup(cleanup_profiles)
+# 監測事件循環延遲並記錄造成阻塞的處理函數
+app.on_startup(loop_monitor.start)
+# 啟動 OCR 工作進程池並預先載入模型
+app.on_startup(ocr_service.start)
+# 先取消 API 任務，再關閉工作進程池
+app.on_shutdown(job_manager.shutdown)
+app.on_shutdown(ocr_service.shutdown)
+# 寫入尚未寫入的追蹤區段
+app.on_shutdown(tracer.shutdown)
+app.on_shutdown(loop_monitor.stop)
+
+# 添加下載、預覽、任務 API 與指標路由
+app.include_router(download_router)
+app.include_router(preview_router)
+app.include_router(jobs_router)
+app.include_router(metrics_router)
 
 # 添加靜態文件目錄
 app.add_static_files('/temp_uploads', str(settings.UPLOAD_DIR))
-# 清空上傳目錄
-clear_upload_directory()
 
 if __name__ in ["__main__", "__mp_main__"]:
     ui.run(
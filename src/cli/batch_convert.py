@@ -0,0 +1,317 @@
+"""
+批次轉換命令列工具
+
+此模組走訪輸入目錄，以 OCR 服務的工作進程池並行轉換所有支援的文件，
+將 Markdown 寫入與輸入目錄結構相同的輸出目錄。已完成的文件記錄於清單中，
+中斷後重新執行會略過已完成的文件。
+
+使用方式:
+    python -m src.cli.batch_convert 輸入目錄 輸出目錄 [--workers N] [--manifest 清單路徑]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.config import settings
+from src.services.ocr.ocr_service import OCRService
+from src.services.ocr.pdf_utils import count_pages
+from src.utils.file_utils import hash_file
+
+logger = logging.getLogger(__name__)
+
+# 支援轉換的副檔名
+SUPPORTED_SUFFIXES = set(settings.FILE_EXTENSIONS.values())
+
+
+class Manifest:
+    """
+    已完成文件的清單
+
+    每完成一份文件即附加一行 JSON 並立即寫入磁碟，中斷時最多遺失最後一行；
+    讀取時忽略不完整的行。
+    """
+
+    def __init__(self, path: Path):
+        """
+        載入清單
+
+        Args:
+            path: 清單文件路徑
+        """
+        self.path = Path(path)
+        self.entries: Dict[str, dict] = {}
+        self.hashes = set()
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.entries[entry['source']] = entry
+                    self.hashes.add(entry['hash'])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def is_unchanged(self, source: str, stat: os.stat_result) -> bool:
+        """文件大小與修改時間是否與清單記錄相同，相同時不需重新計算雜湊"""
+        entry = self.entries.get(source)
+        return entry is not None and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime
+
+    def add(self, entry: dict) -> None:
+        """記錄已完成的文件"""
+        self.entries[entry['source']] = entry
+        self.hashes.add(entry['hash'])
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def close(self) -> None:
+        """關閉清單文件"""
+        self._file.close()
+
+
+def walk_inputs(input_dir: Path, output_dir: Path) -> Iterator[Tuple[Path, Path]]:
+    """
+    走訪輸入目錄，產生 (輸入文件, 輸出文件) 配對
+
+    同一目錄下主檔名相同的文件（例如 a.pdf 與 a.docx）保留原副檔名以避免輸出互相覆蓋。
+
+    Args:
+        input_dir: 輸入目錄
+        output_dir: 輸出目錄
+
+    Yields:
+        Tuple[Path, Path]: (輸入文件, 輸出 Markdown 路徑)
+    """
+    output_dir = output_dir.resolve()
+    for root, dirs, files in os.walk(input_dir):
+        root_path = Path(root)
+        # 輸出目錄位於輸入目錄之下時不走訪
+        dirs[:] = sorted(d for d in dirs if (root_path / d).resolve() != output_dir)
+        names = sorted(name for name in files if Path(name).suffix.lower() in SUPPORTED_SUFFIXES)
+        stems = Counter(Path(name).stem for name in names)
+        for name in names:
+            source = root_path / name
+            relative = source.relative_to(input_dir)
+            target_name = f"{relative.stem}.md" if stems[relative.stem] == 1 else f"{relative.name}.md"
+            yield source, output_dir / relative.parent / target_name
+
+
+def _page_count(file_path: Path) -> int:
+    """計算吞吐量用的頁數，非 PDF 文件以一頁計"""
+    if file_path.suffix.lower() != '.pdf':
+        return 1
+    try:
+        return count_pages(file_path)
+    except Exception:
+        return 1
+
+
+def _write_output(target: Path, content: str) -> None:
+    """以暫存檔寫入輸出，避免中斷時留下不完整的文件"""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(target.name + '.part')
+    tmp_path.write_text(content, encoding='utf-8')
+    os.replace(tmp_path, target)
+
+
+class BatchConverter:
+    """批次轉換執行器"""
+
+    def __init__(self, input_dir: Path, output_dir: Path, manifest: Manifest, service: OCRService, batch_size: int):
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.manifest = manifest
+        self.service = service
+        self.batch_size = max(1, batch_size)
+        self.stats = Counter()
+        self.total = 0
+        self._chunks_lock = asyncio.Lock()
+
+    async def run(self, concurrency: int) -> None:
+        """
+        執行批次轉換
+
+        Args:
+            concurrency: 同時送入 OCR 服務的批次數量
+        """
+        pairs = list(walk_inputs(self.input_dir, self.output_dir))
+        self.total = len(pairs)
+        print(f"找到 {self.total} 份文件")
+
+        chunks = self._pending_chunks(pairs)
+        consumers = [asyncio.ensure_future(self._consume(chunks)) for _ in range(max(1, concurrency))]
+        try:
+            await asyncio.gather(*consumers)
+        finally:
+            # 中斷時先停止所有批次，再由呼叫端關閉 OCR 服務
+            for consumer in consumers:
+                consumer.cancel()
+            await asyncio.gather(*consumers, return_exceptions=True)
+
+    def _pending_chunks(self, pairs: List[Tuple[Path, Path]]) -> Iterator[List[Tuple[Path, Path, str, os.stat_result]]]:
+        """略過清單中已完成的文件，將其餘文件分組"""
+        chunk = []
+        for source, target in pairs:
+            key = str(source.relative_to(self.input_dir))
+            try:
+                stat = source.stat()
+                if self.manifest.is_unchanged(key, stat) and target.exists():
+                    self.stats['skipped'] += 1
+                    continue
+                content_hash = hash_file(source)
+            except OSError as e:
+                # 掃描後被刪除或無法讀取的文件
+                self.stats['failed'] += 1
+                print(f"[失敗] {key}: {e}", file=sys.stderr)
+                continue
+            if content_hash in self.manifest.hashes and target.exists():
+                self.stats['skipped'] += 1
+                continue
+            chunk.append((source, target, content_hash, stat))
+            if len(chunk) >= self.batch_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    async def _consume(self, chunks: Iterator) -> None:
+        """從共用的迭代器取出批次並交由 OCR 服務處理"""
+        loop = asyncio.get_running_loop()
+        while True:
+            # 雜湊在執行緒中計算，不阻塞其他批次的結果處理；產生器同時只能由一個執行緒推進
+            async with self._chunks_lock:
+                chunk = await loop.run_in_executor(None, next, chunks, None)
+            if chunk is None:
+                return
+            items = {source: (target, content_hash, stat) for source, target, content_hash, stat in chunk}
+            try:
+                await self._convert_chunk(items)
+            except Exception as e:
+                # 單一批次出錯時，該批次中尚未完成的文件記為失敗，其他批次繼續執行
+                for source in items:
+                    self.stats['failed'] += 1
+                    print(f"[失敗] {source.relative_to(self.input_dir)}: {e}", file=sys.stderr)
+
+    async def _convert_chunk(self, items: Dict[Path, Tuple[Path, str, os.stat_result]]) -> None:
+        """
+        轉換一個批次並寫入輸出，已處理的文件會從 items 中移除
+
+        Args:
+            items: 來源文件 -> (輸出路徑, 內容雜湊, 文件狀態)
+        """
+        loop = asyncio.get_running_loop()
+        async for source, success, message, content, _ in self.service.process_batch(
+            list(items),
+            content_hashes=[content_hash for _, content_hash, _ in items.values()]
+        ):
+            target, content_hash, stat = items.pop(source)
+            relative = source.relative_to(self.input_dir)
+            if not success:
+                self.stats['failed'] += 1
+                print(f"[失敗] {relative}: {message}", file=sys.stderr)
+                continue
+
+            pages = await loop.run_in_executor(None, _page_count, source)
+            try:
+                await loop.run_in_executor(None, _write_output, target, content)
+            except OSError as e:
+                self.stats['failed'] += 1
+                print(f"[失敗] {relative}: {e}", file=sys.stderr)
+                continue
+            self.manifest.add({
+                'source': str(relative),
+                'output': str(target.relative_to(self.output_dir)),
+                'hash': content_hash,
+                'size': stat.st_size,
+                'mtime': stat.st_mtime,
+                'pages': pages,
+            })
+            self.stats['converted'] += 1
+            self.stats['pages'] += pages
+            done = self.stats['converted'] + self.stats['failed'] + self.stats['skipped']
+            print(f"[{done}/{self.total}] {relative}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """解析命令列參數"""
+    parser = argparse.ArgumentParser(description="批次將目錄中的文件轉換為 Markdown")
+    parser.add_argument('input_dir', type=Path, help="輸入目錄")
+    parser.add_argument('output_dir', type=Path, help="輸出目錄，保持與輸入目錄相同的結構")
+    parser.add_argument(
+        '--workers', type=int, default=settings.OCR_MAX_WORKERS,
+        help=f"工作進程數量（預設 {settings.OCR_MAX_WORKERS}）"
+    )
+    parser.add_argument(
+        '--batch-size', type=int, default=settings.OCR_BATCH_SIZE,
+        help=f"每批送入 OCR 服務的文件數量（預設 {settings.OCR_BATCH_SIZE}）"
+    )
+    parser.add_argument(
+        '--manifest', type=Path, default=None,
+        help="已完成文件清單的路徑（預設為輸出目錄下的 .manifest.jsonl）"
+    )
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> Counter:
+    """
+    執行批次轉換並印出吞吐量
+
+    Args:
+        args: 命令列參數
+
+    Returns:
+        Counter: 統計結果
+    """
+    input_dir = args.input_dir.resolve()
+    output_dir = args.output_dir.resolve()
+    manifest = Manifest(args.manifest or output_dir / '.manifest.jsonl')
+    service = OCRService(max_workers=args.workers)
+    converter = BatchConverter(input_dir, output_dir, manifest, service, args.batch_size)
+
+    started = time.perf_counter()
+    try:
+        # 多一個批次在途，讓雜湊計算與轉換重疊
+        await converter.run(concurrency=service.pool.max_workers + 1)
+    finally:
+        await service.shutdown()
+        manifest.close()
+        elapsed = time.perf_counter() - started
+        stats = converter.stats
+        print(
+            f"完成 {stats['converted']} 份、略過 {stats['skipped']} 份、失敗 {stats['failed']} 份，"
+            f"共 {stats['pages']} 頁，耗時 {elapsed:.1f} 秒"
+        )
+        if elapsed > 0:
+            print(f"吞吐量: {stats['pages'] / elapsed:.2f} 頁/秒，{stats['converted'] / elapsed:.2f} 份/秒")
+    return converter.stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令列入口"""
+    args = parse_args(argv)
+    if not args.input_dir.is_dir():
+        print(f"輸入目錄不存在: {args.input_dir}", file=sys.stderr)
+        return 2
+
+    logging.basicConfig(
+        level=logging.WARNING,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    try:
+        stats = asyncio.run(run(args))
+    except KeyboardInterrupt:
+        print("已中斷，重新執行相同命令即可從中斷處繼續", file=sys.stderr)
+        return 130
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,15 +3,21 @@
 
 此模組包含應用程式的全局配置參數和設置。
 """
+import os
 from pathlib import Path
 
 # 基礎路徑設置
 BASE_DIR = Path(__file__).parent.parent.parent
 UPLOAD_DIR = BASE_DIR / "temp_uploads"
 STATIC_DIR = BASE_DIR / "src" / "static"
+CACHE_DIR = BASE_DIR / "cache"
+RESULT_DIR = BASE_DIR / "results"
+TRACE_DIR = BASE_DIR / "traces"
 
 # 文件大小限制
 MAX_FILE_SIZE = 200_000_000  # 200MB
+# 上傳文件寫入磁碟時每次讀取的區塊大小
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
 
 # 支援的文件類型
 SUPPORTED_IMAGE_TYPES = [
@@ -35,6 +41,13 @@ SUPPORTED_FILE_TYPES = [
     'text/csv',
 ]
 
+# 以試算表轉換器處理的文件類型
+SPREADSHEET_FILE_TYPES = [
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'application/vnd.ms-excel',
+    'text/csv',
+]
+
 # 文件擴展名映射
 FILE_EXTENSIONS = {
     'application/pdf': '.pdf',
@@ -49,6 +62,74 @@ FILE_EXTENSIONS = {
     'text/csv': '.csv',
 }
 
+# OCR 工作進程池設置
+# 每個工作進程各自載入一份 DocumentConverter，請依機器記憶體調整
+OCR_MAX_WORKERS = int(os.getenv('OCR_MAX_WORKERS', max(1, min(4, (os.cpu_count() or 2) // 2))))
+# 最多可排隊等待的轉換任務數量（大型 PDF 的每個頁面區段各算一個任務）
+OCR_QUEUE_MAX_SIZE = int(os.getenv('OCR_QUEUE_MAX_SIZE', 500))
+# 單一文件的轉換時間上限（秒），由開始執行起算並包含所有頁面區段，超過即取消並終止執行中的工作進程；0 表示不限制
+OCR_JOB_TIMEOUT = float(os.getenv('OCR_JOB_TIMEOUT', 1800))
+# 批次轉換時每個工作進程任務一次處理的文件數量
+OCR_BATCH_SIZE = int(os.getenv('OCR_BATCH_SIZE', 8))
+
+# 大型 PDF 分頁並行轉換設置
+PDF_PAGE_PARALLEL = os.getenv('PDF_PAGE_PARALLEL', '1') == '1'
+PDF_SPLIT_MIN_PAGES = int(os.getenv('PDF_SPLIT_MIN_PAGES', 20))  # 頁數達到此值才拆分
+PDF_PAGES_PER_CHUNK = int(os.getenv('PDF_PAGES_PER_CHUNK', 10))
+# 不拆分的 PDF 在工作進程中每轉換此頁數回報一次進度與已完成的內容，0 表示整份一次轉換
+PDF_PROGRESS_PAGES = int(os.getenv('PDF_PROGRESS_PAGES', 4))
+
+# PDF 文字層快速路徑：已有文字層的頁面不執行 OCR
+PDF_TEXT_FAST_PATH = os.getenv('PDF_TEXT_FAST_PATH', '1') == '1'
+PDF_TEXT_MIN_CHARS = int(os.getenv('PDF_TEXT_MIN_CHARS', 20))  # 每頁至少有此字元數才視為有文字層
+
+# 試算表轉換設置
+SHEET_MAX_ROWS = int(os.getenv('SHEET_MAX_ROWS', 10_000))  # 每個工作表最多輸出的資料列數，0 表示不限制
+SHEET_CHUNK_ROWS = int(os.getenv('SHEET_CHUNK_ROWS', 5_000))  # 每次讀取的列數，決定記憶體用量
+
+# PDF 預覽渲染快取設置
+PDF_RENDER_CACHE_MAX_BYTES = int(os.getenv('PDF_RENDER_CACHE_MAX_BYTES', 256_000_000))  # 256MB
+PDF_PREFETCH_PAGES = int(os.getenv('PDF_PREFETCH_PAGES', 2))  # 預先渲染前後各幾頁
+
+# CSV 預覽索引每隔幾行記錄一次位元組位移
+CSV_INDEX_STRIDE = int(os.getenv('CSV_INDEX_STRIDE', 1000))
+
+# 轉換結果快取設置
+RESULT_CACHE_MAX_BYTES = int(os.getenv('RESULT_CACHE_MAX_BYTES', 1_000_000_000))  # 1GB
+RESULT_CACHE_MAX_AGE = int(os.getenv('RESULT_CACHE_MAX_AGE', 30 * 24 * 3600))  # 30 天
+
+# 下載結果保存時間
+RESULT_STORE_MAX_AGE = int(os.getenv('RESULT_STORE_MAX_AGE', 24 * 3600))  # 1 天
+
+# 任務追蹤設置：各任務的階段耗時以 JSON Lines 寫入 TRACE_DIR，檔案超過大小上限時輪替
+TRACE_ENABLED = os.getenv('TRACE_ENABLED', '1') == '1'
+TRACE_MAX_BYTES = int(os.getenv('TRACE_MAX_BYTES', 20_000_000))  # 20MB
+TRACE_BACKUP_COUNT = int(os.getenv('TRACE_BACKUP_COUNT', 5))
+
+# 轉換任務效能分析設置：抽樣的任務在工作進程中以 cProfile 與 tracemalloc 分析，報告保存於 PROFILE_DIR
+PROFILE_DIR = TRACE_DIR / "profiles"
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))  # 0 表示只分析明確要求的任務，1 表示全部分析
+PROFILE_TOP_N = int(os.getenv('PROFILE_TOP_N', 30))  # 報告列出的函數與記憶體配置位置數量
+PROFILE_MAX_AGE = int(os.getenv('PROFILE_MAX_AGE', 7 * 24 * 3600))  # 7 天
+
+# 營運儀表板設置
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')  # 未設定時 /admin 一律拒絕存取
+# 未設定 ADMIN_TOKEN 時允許由本機開啟 /admin；經由反向代理時所有請求都來自本機，不可開啟
+ADMIN_ALLOW_LOCALHOST = os.getenv('ADMIN_ALLOW_LOCALHOST', '0') == '1'
+DASHBOARD_INTERVAL = float(os.getenv('DASHBOARD_INTERVAL', 2))  # 儀表板更新間隔（秒）
+DASHBOARD_UPLOAD_SCAN_INTERVAL = float(os.getenv('DASHBOARD_UPLOAD_SCAN_INTERVAL', 30))  # 上傳目錄大小的統計間隔（秒）
+DASHBOARD_LATENCY_WINDOW = int(os.getenv('DASHBOARD_LATENCY_WINDOW', 3600))  # 各格式延遲的統計範圍（秒）
+
+# 事件循環延遲監測設置
+LOOP_MONITOR_ENABLED = os.getenv('LOOP_MONITOR_ENABLED', '1') == '1'
+LOOP_MONITOR_INTERVAL = float(os.getenv('LOOP_MONITOR_INTERVAL', 0.1))  # 量測延遲的間隔（秒）
+LOOP_STALL_THRESHOLD = float(os.getenv('LOOP_STALL_THRESHOLD', 0.25))  # 延遲超過此值即記錄執行中的處理函數（秒）
+LOOP_STALL_REPORT_INTERVAL = float(os.getenv('LOOP_STALL_REPORT_INTERVAL', 300))  # 在日誌中彙整最嚴重阻塞來源的間隔（秒）
+
 # 確保上傳目錄存在
 UPLOAD_DIR.mkdir(exist_ok=True, parents=True)
 STATIC_DIR.mkdir(exist_ok=True, parents=True)
+CACHE_DIR.mkdir(exist_ok=True, parents=True)
+RESULT_DIR.mkdir(exist_ok=True, parents=True)
+TRACE_DIR.mkdir(exist_ok=True, parents=True)
+PROFILE_DIR.mkdir(exist_ok=True, parents=True)
@@ -0,0 +1,216 @@
+"""
+營運儀表板資料模組
+
+此模組定期彙整工作進程池、結果快取、近期文件延遲、事件循環阻塞來源與上傳目錄的狀態，供營運儀表板頁面顯示。
+只在有儀表板頁面讀取時才取樣，所有頁面共用同一份快照，開啟多個頁面不會增加取樣的成本；
+工作進程記憶體、快取統計與上傳目錄大小在執行緒中讀取，不佔用事件循環。
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from src.config import settings
+from src.services.loop_monitor import loop_monitor
+from src.services.metrics import RECENT_DOCUMENTS
+from src.services.ocr.ocr_service import ocr_service
+
+logger = logging.getLogger(__name__)
+
+_FORMAT_NAMES = {mime_type: suffix.lstrip('.').upper() for mime_type, suffix in settings.FILE_EXTENSIONS.items()}
+
+
+def process_rss(pid: int) -> Optional[int]:
+    """
+    讀取進程的常駐記憶體大小
+
+    Args:
+        pid: 進程識別碼
+
+    Returns:
+        Optional[int]: 位元組數，無法讀取（非 Linux 或進程已結束）時返回 None
+    """
+    try:
+        with open(f"/proc/{pid}/status", encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+def directory_size(path: Path) -> Tuple[int, int]:
+    """
+    統計目錄中的文件數量與總大小（阻塞，應在執行緒中調用）
+
+    Returns:
+        Tuple[文件數量, 總位元組數]
+    """
+    files = total = 0
+    for root, _, names in os.walk(path):
+        for name in names:
+            try:
+                total += os.stat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+            files += 1
+    return files, total
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    """取得已排序數列的百分位數"""
+    return values[min(len(values) - 1, round(fraction * (len(values) - 1)))]
+
+
+def summarize_latencies(
+    records: Iterable[Tuple[float, str, str, float]],
+    window: float = settings.DASHBOARD_LATENCY_WINDOW
+) -> List[Dict[str, Any]]:
+    """
+    依格式統計近期文件的處理耗時
+
+    命中快取的文件只計入數量，不列入耗時統計。
+
+    Args:
+        records: (完成時間, MIME 類型, 結果, 耗時秒數)
+        window: 統計範圍（秒）
+
+    Returns:
+        List[dict]: 各格式的 format、count、failures、cached、p50、p90、max，依數量排序
+    """
+    since = time.time() - window
+    groups: Dict[str, Dict[str, Any]] = {}
+    for finished, mime_type, status, seconds in records:
+        if finished < since:
+            continue
+        group = groups.setdefault(mime_type, {
+            'format': _FORMAT_NAMES.get(mime_type, mime_type),
+            'count': 0,
+            'failures': 0,
+            'cached': 0,
+            'latencies': [],
+        })
+        group['count'] += 1
+        if status == 'cached':
+            group['cached'] += 1
+        elif status == 'success':
+            group['latencies'].append(seconds)
+        else:
+            group['failures'] += 1
+
+    rows = []
+    for group in groups.values():
+        latencies = sorted(group.pop('latencies'))
+        group.update(
+            p50=_percentile(latencies, 0.5) if latencies else None,
+            p90=_percentile(latencies, 0.9) if latencies else None,
+            max=latencies[-1] if latencies else None,
+        )
+        rows.append(group)
+    return sorted(rows, key=lambda row: row['count'], reverse=True)
+
+
+class DashboardSampler:
+    """營運儀表板的共用取樣器"""
+
+    def __init__(
+        self,
+        interval: float = settings.DASHBOARD_INTERVAL,
+        upload_scan_interval: float = settings.DASHBOARD_UPLOAD_SCAN_INTERVAL,
+        history: int = 30
+    ):
+        """
+        初始化取樣器
+
+        Args:
+            interval: 取樣間隔（秒）
+            upload_scan_interval: 上傳目錄大小的統計間隔（秒）
+            history: 計算工作進程平均使用率的取樣數量
+        """
+        self.interval = interval
+        self.upload_scan_interval = upload_scan_interval
+        self.snapshot: Dict[str, Any] = {}
+        self._utilisation: Deque[float] = deque(maxlen=history)
+        self._upload: Tuple[int, int] = (0, 0)
+        self._upload_scanned: Optional[float] = None
+        self._last_read = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def latest(self) -> Dict[str, Any]:
+        """
+        取得最新的快照，沒有進行中的取樣時開始取樣
+
+        Returns:
+            dict: 快照，第一次取樣完成前為空字典
+        """
+        self._last_read = time.monotonic()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return self.snapshot
+
+    async def current(self) -> Dict[str, Any]:
+        """取得快照，尚未取樣時立即取樣一次"""
+        snapshot = self.latest()
+        if not snapshot:
+            snapshot = self.snapshot = await self._collect()
+        return snapshot
+
+    async def _run(self) -> None:
+        """定期取樣，超過三個間隔沒有頁面讀取時停止"""
+        while time.monotonic() - self._last_read < 3 * self.interval:
+            try:
+                self.snapshot = await self._collect()
+            except Exception as e:
+                logger.warning(f"營運儀表板取樣失敗: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    async def _collect(self) -> Dict[str, Any]:
+        """取樣一次"""
+        pool = ocr_service.pool
+        workers = pool.worker_states()
+        utilisation = pool.busy_workers / pool.max_workers
+        self._utilisation.append(utilisation)
+
+        loop = asyncio.get_running_loop()
+        system = await loop.run_in_executor(None, self._collect_blocking, [worker['pid'] for worker in workers])
+        for worker in workers:
+            worker['rss_bytes'] = system['rss'].get(worker['pid'])
+
+        upload_files, upload_bytes = self._upload
+        return {
+            'time': time.time(),
+            'queue_depth': pool.queue_depth,
+            'max_queue_size': pool.max_queue_size,
+            'workers': workers,
+            'max_workers': pool.max_workers,
+            'busy_workers': pool.busy_workers,
+            'ready_workers': pool.ready_workers,
+            'utilisation': utilisation,
+            'utilisation_avg': sum(self._utilisation) / len(self._utilisation),
+            'cache': system['cache'],
+            'latencies': summarize_latencies(list(RECENT_DOCUMENTS)),
+            'loop_stalls': loop_monitor.worst(5),
+            'main_rss_bytes': system['main_rss'],
+            'upload_files': upload_files,
+            'upload_bytes': upload_bytes,
+        }
+
+    def _collect_blocking(self, pids: List[Optional[int]]) -> Dict[str, Any]:
+        """讀取需要磁碟或資料庫存取的狀態（在執行緒中執行）"""
+        now = time.monotonic()
+        if self._upload_scanned is None or now - self._upload_scanned >= self.upload_scan_interval:
+            self._upload = directory_size(settings.UPLOAD_DIR)
+            self._upload_scanned = now
+        return {
+            'rss': {pid: process_rss(pid) for pid in pids if pid},
+            'main_rss': process_rss(os.getpid()),
+            'cache': ocr_service.cache.stats(),
+        }
+
+
+# 創建全局取樣器實例
+dashboard_sampler = DashboardSampler()
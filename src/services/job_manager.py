@@ -0,0 +1,214 @@
+"""
+轉換任務管理模組
+
+此模組管理由 API 提交的非同步轉換任務：任務在背景交由 OCR 服務處理，
+狀態與進度保存在記憶體中供查詢，完成的結果保存於結果存放區。
+"""
+import asyncio
+import logging
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from src.config import settings
+from src.services.ocr.ocr_service import ocr_service
+from src.services.ocr.pdf_utils import count_pages
+from src.services.profiling import report_path
+from src.services.result_store import result_store
+from src.services.tracing import tracer
+from src.utils.file_utils import markdown_filename
+
+logger = logging.getLogger(__name__)
+
+# 任務狀態
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_SUCCEEDED = 'succeeded'
+STATUS_FAILED = 'failed'
+STATUS_CANCELLED = 'cancelled'
+
+FINISHED_STATUSES = {STATUS_SUCCEEDED, STATUS_FAILED, STATUS_CANCELLED}
+
+
+class JobManager:
+    """背景轉換任務管理器"""
+
+    def __init__(self, max_age: int = settings.RESULT_STORE_MAX_AGE):
+        """
+        初始化任務管理器
+
+        Args:
+            max_age: 已結束任務的保留時間（秒）
+        """
+        self.max_age = max_age
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def new_job_dir(self) -> Tuple[str, Path]:
+        """
+        建立新任務的識別碼與上傳目錄
+
+        Returns:
+            Tuple[str, Path]: (任務識別碼, 上傳目錄)
+        """
+        job_id = uuid.uuid4().hex
+        upload_dir = settings.UPLOAD_DIR / f"api_{job_id}"
+        upload_dir.mkdir(parents=True, exist_ok=True)
+        return job_id, upload_dir
+
+    async def submit(
+        self,
+        job_id: str,
+        file_path: Path,
+        filename: str,
+        content_hash: Optional[str] = None,
+        client_id: Optional[str] = None,
+        profile: bool = False
+    ) -> Dict[str, Any]:
+        """
+        提交已保存的文件進行轉換，立即返回任務資訊
+
+        Args:
+            job_id: 任務識別碼（由 new_job_dir 取得）
+            file_path: 已保存的文件路徑
+            filename: 原始文件名
+            content_hash: 文件內容的 SHA-256
+            client_id: 提交請求的客戶端，用於公平排程
+            profile: 是否進行效能分析；未要求時仍依抽樣比例決定
+
+        Returns:
+            dict: 任務資訊
+        """
+        self._expire()
+        total_pages = None
+        if file_path.suffix.lower() == '.pdf':
+            try:
+                with tracer.span('count_pages', trace_id=job_id):
+                    total_pages = await asyncio.get_running_loop().run_in_executor(None, count_pages, file_path)
+            except Exception as e:
+                logger.warning(f"無法取得 PDF 頁數: {file_path}: {e}")
+
+        job = {
+            'job_id': job_id,
+            'filename': filename,
+            'status': STATUS_QUEUED,
+            'progress': 0,
+            'message': '',
+            'pages_done': 0,
+            'total_pages': total_pages,
+            'result_id': None,
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'profiled': False,
+        }
+        self.jobs[job_id] = job
+        self._tasks[job_id] = asyncio.create_task(self._run(job, file_path, content_hash, client_id, profile))
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        取得任務資訊
+
+        Args:
+            job_id: 任務識別碼
+
+        Returns:
+            Optional[dict]: 任務資訊，不存在時返回 None
+        """
+        return self.jobs.get(job_id)
+
+    async def cancel(self, job_id: str) -> bool:
+        """
+        取消任務
+
+        Args:
+            job_id: 任務識別碼
+
+        Returns:
+            bool: 任務是否仍在進行並已取消
+        """
+        task = self._tasks.get(job_id)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return True
+
+    async def shutdown(self) -> None:
+        """取消所有進行中的任務"""
+        for job_id in list(self._tasks):
+            await self.cancel(job_id)
+
+    async def _run(
+        self,
+        job: Dict[str, Any],
+        file_path: Path,
+        content_hash: Optional[str],
+        client_id: Optional[str],
+        profile: bool = False
+    ) -> None:
+        """在背景執行轉換並更新任務狀態"""
+        job_id = job['job_id']
+
+        async def progress_callback(progress: int, message: str) -> None:
+            job['progress'] = progress
+            job['message'] = message
+
+        def start_callback() -> None:
+            # 工作進程取得任務時即為執行中
+            job['status'] = STATUS_RUNNING
+            job['started_at'] = time.time()
+
+        async def page_callback(content: str, pages_done: int, total_pages: int) -> None:
+            job['pages_done'] = pages_done
+            job['total_pages'] = total_pages
+
+        # 任務識別碼即為追蹤識別碼
+        with tracer.span('job', trace_id=job_id, filename=job['filename']) as span:
+            try:
+                success, message, content = await ocr_service.process_document(
+                    file_path,
+                    progress_callback=progress_callback,
+                    job_id=job_id,
+                    content_hash=content_hash,
+                    page_callback=page_callback,
+                    client_id=client_id,
+                    profile=True if profile else None,
+                    start_callback=start_callback
+                )
+                if success:
+                    with tracer.span('store_result'):
+                        job['result_id'] = await asyncio.get_running_loop().run_in_executor(
+                            None, result_store.put, content, markdown_filename(job['filename'])
+                        )
+                    job.update(status=STATUS_SUCCEEDED, progress=100, message=message)
+                    if job['total_pages'] is not None:
+                        job['pages_done'] = job['total_pages']
+                else:
+                    job.update(status=STATUS_FAILED, message=message)
+            except asyncio.CancelledError:
+                job.update(status=STATUS_CANCELLED, message="任務已取消")
+            except Exception as e:
+                logger.error(f"API 轉換任務出錯: {str(e)}", exc_info=True)
+                job.update(status=STATUS_FAILED, message=f"OCR 處理出錯: {str(e)}")
+            finally:
+                job['finished_at'] = time.time()
+                span.set(status=job['status'], total_pages=job['total_pages'])
+                job['profiled'] = report_path(job_id).exists()
+                self._tasks.pop(job_id, None)
+                # 上傳的原始文件只供本次轉換使用
+                shutil.rmtree(file_path.parent, ignore_errors=True)
+
+    def _expire(self) -> None:
+        """移除超過保留時間的已結束任務"""
+        deadline = time.time() - self.max_age
+        for job_id, job in list(self.jobs.items()):
+            if job['status'] in FINISHED_STATUSES and job['finished_at'] < deadline:
+                del self.jobs[job_id]
+
+
+# 創建全局任務管理實例
+job_manager = JobManager()
@@ -0,0 +1,196 @@
+"""
+事件循環延遲監測模組
+
+此模組持續量測事件循環的回應延遲：事件循環中的心跳每隔固定間隔醒來一次，
+實際醒來時間與預期時間的差即為延遲。另有一個監看執行緒，在心跳逾時超過門檻時
+以 sys._current_frames() 取得事件循環執行緒的呼叫堆疊，找出正在執行的專案程式碼；
+心跳恢復後將這次阻塞的時間記在該處理函數名下，寫入日誌與指標，並定期彙整最嚴重的阻塞來源。
+
+阻塞發生在持有 GIL 的 C 擴充函數中時，監看執行緒要等該呼叫返回才能取得堆疊，
+此時記錄的是呼叫它的 Python 函數；若處理函數已經返回，則記為事件循環內部。
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from types import FrameType
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config import settings
+from src.services.metrics import LOOP_LAG_SECONDS, LOOP_STALL_SECONDS_TOTAL, LOOP_STALLS_TOTAL
+
+logger = logging.getLogger(__name__)
+
+_PROJECT_DIR = str(settings.BASE_DIR / 'src')
+_UNKNOWN_HANDLER = '(事件循環內部)'
+
+
+def describe_frame(frame: Optional[FrameType], limit: int = 12) -> Tuple[str, str, str]:
+    """
+    由呼叫堆疊找出正在執行的處理函數
+
+    優先取最內層的專案程式碼（不含本模組），沒有時取最內層的框架。
+
+    Args:
+        frame: 事件循環執行緒目前的框架
+        limit: 保留的堆疊層數
+
+    Returns:
+        Tuple[處理函數（模組路徑:限定名稱）, 所在位置（文件:行號）, 呼叫堆疊文字]
+    """
+    if frame is None:
+        return _UNKNOWN_HANDLER, '', ''
+    stack = ''.join(traceback.format_stack(frame, limit=limit))
+    current = frame
+    while current is not None:
+        filename = current.f_code.co_filename
+        if filename.startswith(_PROJECT_DIR) and filename != __file__:
+            break
+        current = current.f_back
+    if current is None:
+        if 'asyncio' in frame.f_code.co_filename or 'selectors' in frame.f_code.co_filename:
+            return _UNKNOWN_HANDLER, '', stack
+        current = frame
+    code = current.f_code
+    try:
+        module = Path(code.co_filename).relative_to(settings.BASE_DIR).as_posix()
+    except ValueError:
+        module = Path(code.co_filename).name
+    name = getattr(code, 'co_qualname', code.co_name)
+    return f"{module}:{name}", f"{module}:{current.f_lineno}", stack
+
+
+class LoopMonitor:
+    """事件循環延遲監測器"""
+
+    def __init__(
+        self,
+        interval: float = settings.LOOP_MONITOR_INTERVAL,
+        threshold: float = settings.LOOP_STALL_THRESHOLD,
+        report_interval: float = settings.LOOP_STALL_REPORT_INTERVAL
+    ):
+        """
+        初始化監測器
+
+        Args:
+            interval: 心跳間隔（秒）
+            threshold: 記錄阻塞來源的延遲門檻（秒）
+            report_interval: 在日誌中彙整最嚴重阻塞來源的間隔（秒）
+        """
+        self.interval = interval
+        self.threshold = threshold
+        self.report_interval = report_interval
+        # 處理函數 -> 阻塞次數、總秒數、最長秒數、最近一次的位置、堆疊與時間
+        self.offenders: Dict[str, Dict[str, Any]] = {}
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        # 心跳預期醒來的時間（time.monotonic()），由監看執行緒讀取
+        self._due: Optional[float] = None
+        # 監看執行緒取得的堆疊：(對應的預期醒來時間, 處理函數, 位置, 堆疊)
+        self._capture: Optional[Tuple[float, str, str, str]] = None
+        self._stalls_since_report = 0
+        self._last_report = time.monotonic()
+
+    async def start(self) -> None:
+        """在目前的事件循環中開始監測"""
+        if not settings.LOOP_MONITOR_ENABLED or self._heartbeat is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._heartbeat = asyncio.create_task(self._run_heartbeat())
+        self._watchdog = threading.Thread(target=self._run_watchdog, name='loop-watchdog', daemon=True)
+        self._watchdog.start()
+        logger.info(f"事件循環延遲監測已啟動（門檻 {self.threshold:g} 秒）")
+
+    async def stop(self) -> None:
+        """停止監測並在日誌中彙整阻塞來源"""
+        if self._heartbeat is None:
+            return
+        self._stop.set()
+        self._heartbeat.cancel()
+        await asyncio.gather(self._heartbeat, return_exceptions=True)
+        self._heartbeat = None
+        self._due = None
+        self._log_summary()
+
+    def worst(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        取得總阻塞時間最長的處理函數
+
+        Args:
+            limit: 數量上限
+
+        Returns:
+            List[dict]: 各處理函數的 handler、count、total_seconds、max_seconds、location、stack、last_seen
+        """
+        rows = [{'handler': handler, **stats} for handler, stats in list(self.offenders.items())]
+        rows.sort(key=lambda row: row['total_seconds'], reverse=True)
+        return rows[:limit]
+
+    async def _run_heartbeat(self) -> None:
+        """定期醒來並量測延遲"""
+        while True:
+            due = time.monotonic() + self.interval
+            self._due = due
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - due)
+            LOOP_LAG_SECONDS.observe(lag)
+            if lag >= self.threshold:
+                capture = self._capture
+                if capture is not None and capture[0] == due:
+                    self._record_stall(lag, *capture[1:])
+                else:
+                    self._record_stall(lag, _UNKNOWN_HANDLER, '', '')
+            if self._stalls_since_report and time.monotonic() - self._last_report >= self.report_interval:
+                self._log_summary()
+
+    def _run_watchdog(self) -> None:
+        """監看執行緒：心跳逾時超過門檻時取得事件循環執行緒的堆疊，每次阻塞只取一次"""
+        check_interval = max(self.threshold / 4, 0.01)
+        while not self._stop.wait(check_interval):
+            due = self._due
+            if due is None or time.monotonic() - due < self.threshold:
+                continue
+            if self._capture is not None and self._capture[0] == due:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            try:
+                self._capture = (due, *describe_frame(frame))
+            finally:
+                del frame
+
+    def _record_stall(self, lag: float, handler: str, location: str, stack: str) -> None:
+        """記錄一次阻塞"""
+        LOOP_STALLS_TOTAL.inc(handler)
+        LOOP_STALL_SECONDS_TOTAL.inc(handler, amount=lag)
+        stats = self.offenders.setdefault(handler, {'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+        stats['count'] += 1
+        stats['total_seconds'] += lag
+        stats['max_seconds'] = max(stats['max_seconds'], lag)
+        stats.update(location=location, stack=stack, last_seen=time.time())
+        self._stalls_since_report += 1
+        logger.warning(f"事件循環阻塞 {lag:.3f} 秒，執行中: {handler}" + (f" ({location})" if location else ""))
+        if stack:
+            logger.debug(f"事件循環阻塞時的呼叫堆疊:\n{stack}")
+
+    def _log_summary(self) -> None:
+        """在日誌中彙整總阻塞時間最長的處理函數"""
+        self._last_report = time.monotonic()
+        self._stalls_since_report = 0
+        rows = self.worst(5)
+        if not rows:
+            return
+        lines = '\n'.join(
+            f"  {row['total_seconds']:8.2f} 秒 / {row['count']} 次（最長 {row['max_seconds']:.2f} 秒）  {row['handler']}"
+            for row in rows
+        )
+        logger.warning(f"事件循環阻塞最嚴重的處理函數:\n{lines}")
+
+
+# 創建全局監測器實例
+loop_monitor = LoopMonitor()
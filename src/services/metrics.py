@@ -0,0 +1,271 @@
+"""
+指標收集模組
+
+此模組提供輕量的計數器、量測值與直方圖，並以 Prometheus 文字格式輸出。
+記錄指標只是在字典中累加數值；直方圖只記錄落在哪個區間，累計分佈在輸出時才計算。
+佇列長度等即時狀態以回調函數在輸出時讀取，不在處理路徑中更新。
+"""
+import bisect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.config import settings
+
+# 延遲時間直方圖的區間上限（秒），涵蓋毫秒級的預覽到數十分鐘的大型文件
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0
+)
+
+_SUFFIX_MIME_TYPES = {suffix: mime_type for mime_type, suffix in settings.FILE_EXTENSIONS.items()}
+
+
+def mime_type_for(file_path: Path) -> str:
+    """依副檔名取得 MIME 類型，作為指標的標籤值"""
+    return _SUFFIX_MIME_TYPES.get(Path(file_path).suffix.lower(), 'other')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    """產生 {name="value",...} 形式的標籤"""
+    pairs = [
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    """輸出數值，整數不帶小數點"""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    """指標基類"""
+
+    type_name = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        """輸出 Prometheus 文字格式"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """只增不減的計數器"""
+
+    type_name = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """
+        增加計數
+
+        Args:
+            *labels: 依 labelnames 順序的標籤值
+            amount: 增加的數量
+        """
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        """取得目前的計數"""
+        return self._values.get(labels, 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}" for labels, value in values]
+
+
+class Gauge(_Metric):
+    """輸出時才由回調函數讀取的即時量測值"""
+
+    type_name = 'gauge'
+
+    def __init__(self, name: str, documentation: str, function: Optional[Callable[[], float]] = None):
+        super().__init__(name, documentation)
+        self._function = function
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """設定讀取量測值的函數"""
+        self._function = function
+
+    def _samples(self) -> List[str]:
+        if self._function is None:
+            return []
+        return [f"{self.name} {_format_value(self._function())}"]
+
+
+class FunctionCounter(Gauge):
+    """輸出時才由回調函數讀取的計數器，回調函數返回的數值必須只增不減（進程重啟時歸零）"""
+
+    type_name = 'counter'
+
+
+class Histogram(_Metric):
+    """固定區間的直方圖"""
+
+    type_name = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 每組標籤：[各區間的次數（最後一個為 +Inf）, 總和]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        記錄一次量測值
+
+        Args:
+            value: 量測值
+            *labels: 依 labelnames 順序的標籤值
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        """計時 with 區塊並記錄耗時（秒）"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def snapshot(self, *labels: str) -> Tuple[List[int], float]:
+        """
+        取得指定標籤的各區間次數與總和
+
+        Returns:
+            Tuple[各區間的次數（最後一個為 +Inf）, 總和]
+        """
+        with self._lock:
+            entry = self._values.get(labels)
+            return (list(entry[0]), entry[1]) if entry else ([0] * (len(self.buckets) + 1), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+        lines = []
+        for labels, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else _format_value(bound)
+                bucket_labels = _format_labels(self.labelnames, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class Registry:
+    """指標登記處"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        """登記指標，同名指標只保留第一個"""
+        return self._metrics.setdefault(metric.name, metric)
+
+    def render(self) -> str:
+        """以 Prometheus 文字格式輸出所有指標"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+# 各處理階段的耗時：upload（整個上傳處理）、save、preview、queue_wait、convert、export、process（整份文件）
+STAGE_SECONDS: Histogram = registry.register(Histogram(
+    'docassist_stage_duration_seconds',
+    "Duration of each document processing stage in seconds.",
+    ('stage',)
+))
+PREVIEW_SECONDS: Histogram = registry.register(Histogram(
+    'docassist_preview_duration_seconds',
+    "Duration of FilePreview.show per preview handler in seconds.",
+    ('handler',)
+))
+DOCUMENTS_TOTAL: Counter = registry.register(Counter(
+    'docassist_documents_processed_total',
+    "Documents processed by MIME type and outcome (success, cached, failure, cancelled).",
+    ('mime_type', 'status')
+))
+BYTES_INGESTED_TOTAL: Counter = registry.register(Counter(
+    'docassist_bytes_ingested_total',
+    "Bytes of uploaded documents written to disk by MIME type.",
+    ('mime_type',)
+))
+QUEUE_DEPTH: Gauge = registry.register(Gauge(
+    'docassist_ocr_queue_depth',
+    "Conversion jobs waiting for a worker process."
+))
+WORKERS_ACTIVE: Gauge = registry.register(Gauge(
+    'docassist_ocr_workers_active',
+    "Worker processes currently running a conversion job."
+))
+WORKERS_READY: Gauge = registry.register(Gauge(
+    'docassist_ocr_workers_ready',
+    "Worker processes with models loaded and able to accept jobs."
+))
+CACHE_HITS: FunctionCounter = registry.register(FunctionCounter(
+    'docassist_result_cache_hits_total',
+    "Result cache hits since the server started."
+))
+CACHE_MISSES: FunctionCounter = registry.register(FunctionCounter(
+    'docassist_result_cache_misses_total',
+    "Result cache misses since the server started."
+))
+LOOP_LAG_SECONDS: Histogram = registry.register(Histogram(
+    'docassist_event_loop_lag_seconds',
+    "Delay between when the event loop monitor was due to wake up and when it ran.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+))
+LOOP_STALLS_TOTAL: Counter = registry.register(Counter(
+    'docassist_event_loop_stalls_total',
+    "Event loop stalls above the threshold by the handler that was running.",
+    ('handler',)
+))
+LOOP_STALL_SECONDS_TOTAL: Counter = registry.register(Counter(
+    'docassist_event_loop_stall_seconds_total',
+    "Total event loop stall time above the threshold by the handler that was running.",
+    ('handler',)
+))
+
+# 最近處理完成的文件 (完成時間, MIME 類型, 結果, 耗時秒數)，供營運儀表板計算各格式的近期延遲
+RECENT_DOCUMENTS: Deque[Tuple[float, str, str, float]] = deque(maxlen=500)
@@ -0,0 +1,309 @@
+"""
+直接轉換模組
+
+此模組以既有的解析套件（python-docx、python-pptx、BeautifulSoup）將不需要 OCR 的文件
+直接轉換為 Markdown，省去載入 docling 模型與版面分析的時間。
+不支援的格式返回 None，由 docling 處理。
+"""
+import re
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Sequence
+
+# 轉換邏輯有變動時遞增，使舊的快取結果失效
+DIRECT_CONVERTER_VERSION = 1
+
+_HEADING_STYLE = re.compile(r'^Heading (\d)$')
+
+
+def markdown_table(rows: Sequence[Sequence[str]]) -> str:
+    """
+    將資料列轉為 Markdown 表格，第一列作為標題列
+
+    Args:
+        rows: 資料列
+
+    Returns:
+        str: Markdown 表格
+    """
+    if not rows:
+        return ''
+    width = max(len(row) for row in rows)
+
+    def format_row(row: Sequence[str]) -> str:
+        cells = [escape_table_cell(cell) for cell in row] + [''] * (width - len(row))
+        return '| ' + ' | '.join(cells) + ' |'
+
+    lines = [format_row(rows[0]), '| ' + ' | '.join(['---'] * width) + ' |']
+    lines.extend(format_row(row) for row in rows[1:])
+    return '\n'.join(lines)
+
+
+def escape_table_cell(value) -> str:
+    """轉義表格儲存格中的管線符號並將換行改為空白"""
+    # value != value 用於辨識 NaN
+    text = '' if value is None or value != value else str(value)
+    return text.replace('|', '\\|').replace('\r', ' ').replace('\n', ' ').strip()
+
+
+def _join_blocks(blocks: Iterable[str]) -> str:
+    """以空行連接非空白的區塊"""
+    return '\n\n'.join(block for block in blocks if block and block.strip()) + '\n'
+
+
+def docx_to_markdown(file_path: Path) -> str:
+    """
+    將 Word 文件轉換為 Markdown，依文件順序保留標題、清單、段落與表格
+
+    Args:
+        file_path: DOCX 文件路徑
+
+    Returns:
+        str: Markdown 內容
+    """
+    from docx import Document
+    from docx.table import Table
+    from docx.text.paragraph import Paragraph
+
+    document = Document(file_path)
+    blocks = []
+    for element in document.element.body.iterchildren():
+        tag = element.tag.rsplit('}', 1)[-1]
+        if tag == 'p':
+            blocks.append(_docx_paragraph(Paragraph(element, document)))
+        elif tag == 'tbl':
+            table = Table(element, document)
+            rows = [[cell.text for cell in row.cells] for row in table.rows]
+            blocks.append(markdown_table(rows))
+    return _join_blocks(blocks)
+
+
+def _docx_paragraph(paragraph) -> str:
+    """將單一段落轉為 Markdown"""
+    text = ''.join(
+        f"**{run.text.strip()}**" if run.bold and run.text.strip() else run.text
+        for run in paragraph.runs
+    ).strip()
+    if not text:
+        return ''
+
+    style = paragraph.style.name if paragraph.style is not None else ''
+    heading = _HEADING_STYLE.match(style)
+    if heading:
+        return f"{'#' * int(heading.group(1))} {paragraph.text.strip()}"
+    if style == 'Title':
+        return f"# {paragraph.text.strip()}"
+    if style.startswith('List Number'):
+        return f"1. {text}"
+    if style.startswith('List'):
+        return f"- {text}"
+    return text
+
+
+def pptx_to_markdown(file_path: Path) -> str:
+    """
+    將 PowerPoint 簡報轉換為 Markdown，每張投影片一個章節
+
+    Args:
+        file_path: PPTX 文件路徑
+
+    Returns:
+        str: Markdown 內容
+    """
+    from pptx import Presentation
+
+    presentation = Presentation(file_path)
+    blocks = []
+    for index, slide in enumerate(presentation.slides, 1):
+        title_shape = slide.shapes.title
+        title = title_shape.text.strip() if title_shape is not None and title_shape.has_text_frame else ''
+        title_id = title_shape.shape_id if title_shape is not None else None
+        blocks.append(f"## {title or f'投影片 {index}'}")
+
+        for shape in slide.shapes:
+            if shape.shape_id == title_id:
+                continue
+            if shape.has_text_frame:
+                lines = [
+                    f"{'  ' * paragraph.level}- {paragraph.text.strip()}"
+                    for paragraph in shape.text_frame.paragraphs
+                    if paragraph.text.strip()
+                ]
+                blocks.append('\n'.join(lines))
+            elif getattr(shape, 'has_table', False) and shape.has_table:
+                rows = [[cell.text for cell in row.cells] for row in shape.table.rows]
+                blocks.append(markdown_table(rows))
+
+        if slide.has_notes_slide:
+            notes = slide.notes_slide.notes_text_frame.text.strip()
+            if notes:
+                blocks.append('\n'.join(f"> {line}" for line in notes.splitlines()))
+    return _join_blocks(blocks)
+
+
+def html_to_markdown(file_path: Path) -> str:
+    """
+    將 HTML 文件轉換為 Markdown
+
+    Args:
+        file_path: HTML 文件路徑
+
+    Returns:
+        str: Markdown 內容
+    """
+    from bs4 import BeautifulSoup
+
+    with open(file_path, 'rb') as f:
+        soup = BeautifulSoup(f, 'html.parser')
+    for element in soup(['script', 'style', 'noscript', 'template', 'head']):
+        element.decompose()
+
+    root = soup.body or soup
+    return _join_blocks(_html_blocks(root))
+
+
+_BLOCK_TAGS = {
+    'p', 'div', 'section', 'article', 'main', 'header', 'footer', 'aside', 'nav',
+    'blockquote', 'pre', 'ul', 'ol', 'table', 'figure', 'hr',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+}
+
+
+def _html_blocks(element) -> List[str]:
+    """將區塊層級的元素依序轉為 Markdown 區塊"""
+    from bs4 import Comment, Doctype, NavigableString, Tag
+
+    blocks = []
+    inline = []
+
+    def flush_inline() -> None:
+        text = ' '.join(''.join(inline).split())
+        if text:
+            blocks.append(text)
+        inline.clear()
+
+    for child in element.children:
+        if isinstance(child, (Comment, Doctype)):
+            continue
+        if isinstance(child, NavigableString):
+            inline.append(str(child))
+            continue
+        if not isinstance(child, Tag):
+            continue
+        name = child.name
+        if name not in _BLOCK_TAGS:
+            inline.append(_html_inline(child))
+            continue
+
+        flush_inline()
+        if name in ('h1', 'h2', 'h3', 'h4', 'h5', 'h6'):
+            blocks.append(f"{'#' * int(name[1])} {_html_text(child)}")
+        elif name == 'p':
+            blocks.append(_html_text(child))
+        elif name in ('ul', 'ol'):
+            blocks.append(_html_list(child))
+        elif name == 'pre':
+            blocks.append(f"```\n{child.get_text().strip(chr(10))}\n```")
+        elif name == 'blockquote':
+            quoted = _join_blocks(_html_blocks(child)).strip()
+            blocks.append('\n'.join(f"> {line}" if line else '>' for line in quoted.splitlines()))
+        elif name == 'table':
+            rows = [
+                [_html_text(cell) for cell in row.find_all(['th', 'td'])]
+                for row in child.find_all('tr')
+            ]
+            blocks.append(markdown_table([row for row in rows if row]))
+        elif name == 'hr':
+            blocks.append('---')
+        else:
+            blocks.extend(_html_blocks(child))
+    flush_inline()
+    return blocks
+
+
+def _html_text(element) -> str:
+    """取得元素內的行內 Markdown 文字"""
+    return ' '.join(_html_inline(element).split())
+
+
+def _html_inline(element) -> str:
+    """將行內元素轉為 Markdown"""
+    from bs4 import Comment, NavigableString, Tag
+
+    if isinstance(element, Comment):
+        return ''
+    if isinstance(element, NavigableString):
+        return str(element)
+    if not isinstance(element, Tag):
+        return ''
+
+    name = element.name
+    if name == 'br':
+        return '\n'
+    if name == 'img':
+        return f"![{element.get('alt', '')}]({element.get('src', '')})"
+
+    text = ''.join(_html_inline(child) for child in element.children)
+    stripped = text.strip()
+    if not stripped:
+        return text
+    if name in ('strong', 'b'):
+        return f" **{stripped}** "
+    if name in ('em', 'i'):
+        return f" *{stripped}* "
+    if name == 'code':
+        return f"`{stripped}`"
+    if name == 'a' and element.get('href'):
+        return f"[{stripped}]({element['href']})"
+    return text
+
+
+def _html_list(element, depth: int = 0) -> str:
+    """將清單轉為 Markdown，保留巢狀層級"""
+    lines = []
+    ordered = element.name == 'ol'
+    for index, item in enumerate(element.find_all('li', recursive=False), 1):
+        nested = [child for child in item.find_all(['ul', 'ol'], recursive=False)]
+        for child in nested:
+            child.extract()
+        marker = f"{index}." if ordered else '-'
+        lines.append(f"{'  ' * depth}{marker} {_html_text(item)}")
+        lines.extend(_html_list(child, depth + 1) for child in nested)
+    return '\n'.join(lines)
+
+
+def markdown_passthrough(file_path: Path) -> str:
+    """
+    Markdown 文件直接返回原文
+
+    Args:
+        file_path: Markdown 文件路徑
+
+    Returns:
+        str: Markdown 內容
+    """
+    with open(file_path, 'r', encoding='utf-8-sig', errors='replace') as f:
+        return f.read()
+
+
+# 副檔名對應的直接轉換函數
+DIRECT_CONVERTERS = {
+    '.docx': docx_to_markdown,
+    '.pptx': pptx_to_markdown,
+    '.html': html_to_markdown,
+    '.htm': html_to_markdown,
+    '.md': markdown_passthrough,
+    '.markdown': markdown_passthrough,
+}
+
+
+def get_direct_converter(file_path: Path) -> Optional[Callable[[Path], str]]:
+    """
+    取得文件對應的直接轉換函數
+
+    Args:
+        file_path: 文件路徑
+
+    Returns:
+        直接轉換函數，不支援的格式返回 None
+    """
+    return DIRECT_CONVERTERS.get(Path(file_path).suffix.lower())
@@ -5,123 +5,710 @@ OCR 服務模組
 """
 import asyncio
 import logging
+import time
+from importlib import metadata
 from pathlib import Path
-from typing import Optional, Callable, Dict, Any, Tuple
+from typing import Optional, AsyncIterator, Awaitable, Callable, Dict, Any, List, Sequence, Tuple
 
-from docling.document_converter import DocumentConverter
+from src.config import settings
+from src.services.metrics import DOCUMENTS_TOTAL, RECENT_DOCUMENTS, STAGE_SECONDS, mime_type_for
+from src.services.ocr.direct_converter import DIRECT_CONVERTER_VERSION, get_direct_converter
+from src.services.ocr.pdf_utils import count_pages, detect_text_pages, format_page_numbers, plan_page_segments
+from src.services.ocr.result_cache import ResultCache
+from src.services.ocr.sheet_converter import is_spreadsheet, list_sheets
+from src.services.ocr.scheduler import PRIORITY_BULK, PRIORITY_INTERACTIVE, QueueFullError
+from src.services.ocr.worker_pool import JobTimeoutError, WorkerPool
+from src.services.profiling import ProfileSession, profile_job
+from src.services.tracing import Span, tracer
+from src.utils.file_utils import hash_file
 
 logger = logging.getLogger(__name__)
 
+# 命中結果快取時的結果訊息
+_CACHED_MESSAGE = "OCR 處理成功（快取）"
+
 class OCRService:
     """OCR 服務類，處理文檔的 OCR 轉換"""
-    
-    def __init__(self):
-        self.converter = DocumentConverter()
-        self.is_processing = False
-        self.current_task = None
-    
+
+    def __init__(
+        self,
+        max_workers: int = settings.OCR_MAX_WORKERS,
+        max_queue_size: int = settings.OCR_QUEUE_MAX_SIZE,
+        job_timeout: float = settings.OCR_JOB_TIMEOUT
+    ):
+        """
+        初始化 OCR 服務
+
+        Args:
+            max_workers: 同時進行轉換的工作進程數量
+            max_queue_size: 最多可排隊等待的轉換任務數量
+            job_timeout: 單一文件的轉換時間上限（秒），包含所有頁面區段與工作表，0 表示不限制
+        """
+        self.job_timeout = job_timeout or None
+        self.pool = WorkerPool(max_workers, max_queue_size, self.job_timeout)
+        self.cache = ResultCache()
+        self.active_jobs: Dict[str, asyncio.Future] = {}
+
+    async def start(self) -> None:
+        """啟動工作進程池，各工作進程在背景預先載入轉換模型，不阻塞伺服器啟動"""
+        self.pool.start()
+
+    @property
+    def is_ready(self) -> bool:
+        """是否已有載入完成的工作進程可處理文件"""
+        return self.pool.ready_workers > 0
+
+    @property
+    def status_text(self) -> str:
+        """供界面顯示的 OCR 服務狀態"""
+        if not self.pool.started:
+            return "OCR 服務未啟動"
+        ready = self.pool.ready_workers
+        if ready == 0:
+            return "OCR 模型載入中..."
+        return f"OCR 就緒 ({ready}/{self.pool.max_workers} 個工作進程)"
+
+    async def shutdown(self) -> None:
+        """關閉工作進程池"""
+        logger.info(f"結果快取統計: {self.cache.stats()}")
+        await self.pool.shutdown()
+
+    def pipeline_options(self) -> Dict[str, Any]:
+        """
+        取得會影響轉換結果的處理參數，作為快取鍵的一部分
+
+        Returns:
+            dict: 處理參數
+        """
+        try:
+            docling_version = metadata.version('docling')
+        except metadata.PackageNotFoundError:
+            docling_version = None
+        return {
+            'converter': 'docling',
+            'docling_version': docling_version,
+            'direct_converter_version': DIRECT_CONVERTER_VERSION,
+            'sheet_max_rows': settings.SHEET_MAX_ROWS,
+            'pdf_pages_per_chunk': settings.PDF_PAGES_PER_CHUNK if settings.PDF_PAGE_PARALLEL else None,
+            'pdf_progress_pages': settings.PDF_PROGRESS_PAGES or None,
+            'pdf_text_min_chars': settings.PDF_TEXT_MIN_CHARS if settings.PDF_TEXT_FAST_PATH else None,
+        }
+
     async def process_document(
-        self, 
-        file_path: Path, 
-        progress_callback: Optional[Callable[[int, str], None]] = None
+        self,
+        file_path: Path,
+        progress_callback: Optional[Callable[[int, str], None]] = None,
+        job_id: Optional[str] = None,
+        content_hash: Optional[str] = None,
+        page_callback: Optional[Callable[[str, int, int], Awaitable[None]]] = None,
+        client_id: Optional[str] = None,
+        priority: int = PRIORITY_INTERACTIVE,
+        profile: Optional[bool] = None,
+        start_callback: Optional[Callable[[], None]] = None
     ) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
         """
         處理文檔並執行 OCR
-        
+
+        多個請求會在工作進程池中並行處理，超出工作進程數量的請求依優先順序排隊，
+        同一優先順序內各客戶端輪流執行。相同內容與處理參數的文件直接返回快取結果。
+        DOCX、PPTX、HTML 與 Markdown 直接解析，試算表的各工作表並行轉換為表格，不經過 docling；
+        PDF 中已有文字層的頁面直接使用文字層，只有純圖片頁面執行 OCR，
+        各頁的處理方式記錄於結果訊息中。
+        需要效能分析的任務（明確要求或依 settings.PROFILE_SAMPLE_RATE 抽樣）在工作進程中
+        以 cProfile 與 tracemalloc 分析，報告保存於 settings.PROFILE_DIR/<任務識別碼>/。
+
         Args:
             file_path: 要處理的文件路徑
             progress_callback: 進度回調函數，接收 (進度百分比, 狀態訊息)
-            
+            job_id: 任務識別碼，用於取消處理
+            content_hash: 文件內容的 SHA-256，未提供時自動計算
+            page_callback: 頁面結果回調函數，PDF 依頁序逐段接收
+                (Markdown 片段, 已完成頁數, 總頁數)；片段可能為空字串（該段沒有文字）
+            client_id: 提交請求的客戶端識別碼，用於客戶端之間的公平排程
+            priority: 優先順序，互動式單一文件優先於批次任務
+            profile: 是否進行效能分析，None 表示依抽樣比例決定
+            start_callback: 工作進程開始轉換本文件時的回調函數（只調用一次，在事件循環中調用）
+
         Returns:
             Tuple[是否成功, 結果訊息, 處理結果]
         """
-        if self.is_processing:
-            return False, "已有處理任務正在進行中", None
-            
-        self.is_processing = True
-        
-        try:
-            # 更新進度
-            if progress_callback:
-                await progress_callback(10, "正在初始化...")
-            
-            # 檢查文件是否存在
-            if not file_path.exists():
-                return False, f"文件不存在: {file_path}", None
-            
-            # 更新進度
-            if progress_callback:
-                await progress_callback(30, "正在處理文件...")
-            
+        with tracer.span('process', file=file_path.name) as span, \
+                profile_job(job_id or span.trace_id, profile) as profile_session:
+            started = time.perf_counter()
+            status = 'failure'
             try:
-                # 執行轉換（在執行器中運行同步代碼）
-                logger.info(f"開始處理文件: {file_path}")
-                
-                # 使用 run_in_executor 執行同步的 convert 方法
-                result = await asyncio.get_event_loop().run_in_executor(
-                    None, 
-                    lambda: self.converter.convert(str(file_path))
-                )
-                
-                logger.info(f"文件處理完成: {file_path}")
-                
-                # 檢查結果是否有效
-                if not result or not hasattr(result, 'document'):
-                    return False, "OCR 處理失敗，未返回有效結果", None
-                
                 # 更新進度
                 if progress_callback:
-                    await progress_callback(90, "正在生成 Markdown...")
-                
-                # 導出為 Markdown 格式
-                markdown_content = await asyncio.get_event_loop().run_in_executor(
-                    None, 
-                    lambda: result.document.export_to_markdown()
-                )
-                
+                    await progress_callback(10, "正在初始化...")
+
+                # 檢查文件是否存在
+                if not file_path.exists():
+                    return False, f"文件不存在: {file_path}", None
+
+                # 查詢結果快取
+                loop = asyncio.get_running_loop()
+                if content_hash is None:
+                    with tracer.span('hash'):
+                        content_hash = await loop.run_in_executor(None, hash_file, file_path)
+                cache_key = self.cache.make_key(content_hash, self.pipeline_options())
+                with tracer.span('cache_lookup') as lookup:
+                    cached = await loop.run_in_executor(None, self.cache.get, cache_key)
+                    lookup.set(hit=cached is not None)
+                if cached is not None:
+                    logger.info(f"命中結果快取: {file_path}")
+                    if progress_callback:
+                        await progress_callback(100, "處理完成（快取）")
+                    status = 'cached'
+                    return True, _CACHED_MESSAGE, cached
+
                 # 更新進度
                 if progress_callback:
-                    await progress_callback(100, "處理完成")
-                
-                return True, "OCR 處理成功", markdown_content
-                
+                    if self.is_ready:
+                        await progress_callback(30, "正在等待處理...")
+                    else:
+                        await progress_callback(30, "OCR 模型載入中，請稍候...")
+
+                try:
+                    # 交由工作進程池執行轉換
+                    logger.info(f"開始處理文件: {file_path}")
+
+                    submit_options = {
+                        'client_id': client_id,
+                        'priority': priority,
+                        'job_id': job_id,
+                        'on_start': start_callback,
+                    }
+                    task = asyncio.ensure_future(
+                        self._convert_with_deadline(file_path, submit_options, progress_callback, page_callback)
+                    )
+                    if job_id:
+                        self.active_jobs[job_id] = task
+                    markdown_content, summary = await task
+
+                    logger.info(f"文件處理完成: {file_path}" + (f"（{summary}）" if summary else ""))
+
+                    with tracer.span('cache_store'):
+                        await self._cache_put(cache_key, markdown_content)
+
+                    # 更新進度
+                    if progress_callback:
+                        await progress_callback(100, "處理完成")
+
+                    message = f"OCR 處理成功：{summary}" if summary else "OCR 處理成功"
+                    status = 'success'
+                    return True, message, markdown_content
+
+                except asyncio.CancelledError:
+                    logger.info(f"OCR 處理已取消: {file_path}")
+                    raise
+                except QueueFullError as e:
+                    logger.warning(f"處理佇列已滿，拒絕文件: {file_path}")
+                    if progress_callback:
+                        await progress_callback(0, str(e))
+                    return False, str(e), None
+                except Exception as e:
+                    logger.error(f"處理文件時發生錯誤: {str(e)}", exc_info=True)
+                    if progress_callback:
+                        await progress_callback(0, f"處理出錯: {str(e)}")
+                    return False, f"OCR 處理出錯: {str(e)}", None
+
+            except asyncio.CancelledError:
+                status = 'cancelled'
+                raise
             except Exception as e:
-                logger.error(f"處理文件時發生錯誤: {str(e)}", exc_info=True)
-                if progress_callback:
-                    await progress_callback(0, f"處理出錯: {str(e)}")
+                logger.error(f"OCR 處理出錯: {str(e)}", exc_info=True)
                 return False, f"OCR 處理出錯: {str(e)}", None
-            
-        except Exception as e:
-            logger.error(f"OCR 處理出錯: {str(e)}", exc_info=True)
-            return False, f"OCR 處理出錯: {str(e)}", None
-            
+
+            finally:
+                if job_id:
+                    self.active_jobs.pop(job_id, None)
+                elapsed = time.perf_counter() - started
+                DOCUMENTS_TOTAL.inc(mime_type_for(file_path), status)
+                RECENT_DOCUMENTS.append((time.time(), mime_type_for(file_path), status, elapsed))
+                span.set(result=status)
+                STAGE_SECONDS.observe(elapsed, 'process')
+                if profile_session is not None:
+                    await self._save_profile(profile_session, span, file_path, status)
+
+    async def process_batch(
+        self,
+        file_paths: Sequence[Path],
+        job_id: Optional[str] = None,
+        client_id: Optional[str] = None,
+        priority: int = PRIORITY_BULK,
+        content_hashes: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[Tuple[Path, bool, str, Optional[str], bool]]:
+        """
+        批次處理多份文件，每份文件完成時立即產出結果
+
+        需要 docling 的文件依是否執行 OCR 分組，每 settings.OCR_BATCH_SIZE 份合為一個
+        工作進程任務，以 docling 的多文件轉換讓模型推論跨文件批次執行；快取命中、
+        可直接解析的格式以及需要分段的 PDF 則各自處理。
+
+        Args:
+            file_paths: 文件路徑列表
+            job_id: 任務識別碼，用於取消整個批次
+            client_id: 提交請求的客戶端識別碼
+            priority: 優先順序，預設為批次任務
+            content_hashes: 各文件內容的 SHA-256，未提供時自動計算
+
+        Yields:
+            Tuple[文件路徑, 是否成功, 結果訊息, Markdown 內容, 是否命中快取]
+        """
+        paths = [Path(path) for path in file_paths]
+        results: asyncio.Queue = asyncio.Queue()
+        submit_options = {'client_id': client_id, 'priority': priority, 'job_id': job_id}
+        hashes = list(content_hashes) if content_hashes is not None else [None] * len(paths)
+
+        async def run_batch() -> None:
+            # 整個批次為一個追蹤，批次任務的識別碼作為追蹤識別碼
+            with tracer.span('batch', trace_id=job_id, documents=len(paths)) as span:
+                logger.info(f"批次處理追蹤識別碼: {span.trace_id}")
+                await self._run_batch(paths, hashes, results, submit_options)
+
+        driver = asyncio.ensure_future(run_batch())
+        if job_id:
+            self.active_jobs[job_id] = driver
+
+        try:
+            remaining = len(paths)
+            while remaining:
+                if results.empty() and driver.done():
+                    break
+                getter = asyncio.ensure_future(results.get())
+                await asyncio.wait({getter, driver}, return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    continue
+                remaining -= 1
+                path, success, message, content, cached = result = getter.result()
+                DOCUMENTS_TOTAL.inc(
+                    mime_type_for(path),
+                    ('cached' if cached else 'success') if success else 'failure'
+                )
+                yield result
+            if driver.done() and not driver.cancelled():
+                driver.result()
         finally:
-            self.is_processing = False
-    
-    async def cancel_processing(self) -> None:
-        """取消正在進行的處理任務"""
-        if self.is_processing and self.current_task:
-            self.current_task.cancel()
+            driver.cancel()
+            if job_id:
+                self.active_jobs.pop(job_id, None)
+
+    async def _run_batch(
+        self,
+        paths: List[Path],
+        hashes: List[Optional[str]],
+        results: asyncio.Queue,
+        submit_options: Dict[str, Any]
+    ) -> None:
+        """
+        執行批次處理，將每份文件的結果放入佇列
+
+        Args:
+            paths: 文件路徑列表
+            hashes: 各文件內容的 SHA-256，None 表示需要計算
+            results: 結果佇列
+            submit_options: 提交至工作進程池的排程參數
+        """
+        loop = asyncio.get_running_loop()
+        options = self.pipeline_options()
+        batches: Dict[bool, List[Tuple[Path, str]]] = {True: [], False: []}
+        individual: List[Tuple[Path, str]] = []
+
+        for path, content_hash in zip(paths, hashes):
+            if not path.exists():
+                results.put_nowait((path, False, f"文件不存在: {path}", None, False))
+                continue
+            try:
+                if content_hash is None:
+                    with tracer.span('hash', file=path.name):
+                        content_hash = await loop.run_in_executor(None, hash_file, path)
+                cache_key = self.cache.make_key(content_hash, options)
+                with tracer.span('cache_lookup', file=path.name) as lookup:
+                    cached = await loop.run_in_executor(None, self.cache.get, cache_key)
+                    lookup.set(hit=cached is not None)
+                if cached is not None:
+                    results.put_nowait((path, True, _CACHED_MESSAGE, cached, True))
+                    continue
+                if get_direct_converter(path) or is_spreadsheet(path):
+                    individual.append((path, cache_key))
+                    continue
+                segments, _ = await self._plan_segments(path)
+            except Exception as e:
+                # 無法讀取的文件（例如損壞的 PDF）只影響該文件，批次中的其他文件繼續處理
+                logger.error(f"批次處理文件時發生錯誤: {path}: {e}")
+                results.put_nowait((path, False, f"OCR 處理出錯: {e}", None, False))
+                continue
+            if len(segments) > 1:
+                # 混合頁面或大型 PDF 仍需分段處理
+                individual.append((path, cache_key))
+            else:
+                batches[segments[0][2] if segments else True].append((path, cache_key))
+
+        async def convert_one(path: Path, cache_key: str) -> None:
             try:
-                await self.current_task
+                with tracer.span('process', file=path.name):
+                    markdown, summary = await self._convert_with_deadline(path, submit_options)
             except asyncio.CancelledError:
-                logger.info("OCR 處理已取消")
-            self.is_processing = False
-    
-    async def _run_in_executor(self, func, *args, **kwargs):
-        """在執行器中運行同步函數"""
+                raise
+            except Exception as e:
+                logger.error(f"批次處理文件時發生錯誤: {path}: {e}")
+                results.put_nowait((path, False, f"OCR 處理出錯: {str(e)}", None, False))
+                return
+            await self._cache_put(cache_key, markdown)
+            message = f"OCR 處理成功：{summary}" if summary else "OCR 處理成功"
+            results.put_nowait((path, True, message, markdown, False))
+
+        async def convert_group(items: List[Tuple[Path, str]], do_ocr: bool) -> None:
+            reported = set()
+
+            def on_event(event: tuple) -> None:
+                kind, *payload = event
+                if kind != 'document':
+                    return
+                index, success, content = payload
+                path, cache_key = items[index]
+                reported.add(index)
+                if success:
+                    asyncio.ensure_future(self._cache_put(cache_key, content))
+                    results.put_nowait((path, True, "OCR 處理成功", content, False))
+                else:
+                    results.put_nowait((path, False, f"OCR 處理出錯: {content}", None, False))
+
+            try:
+                with tracer.span('convert_group', documents=len(items), do_ocr=do_ocr):
+                    await self.pool.submit(
+                        'convert_batch',
+                        on_event=on_event,
+                        file_paths=[str(path) for path, _ in items],
+                        do_ocr=do_ocr,
+                        **submit_options
+                    )
+                error = "未返回轉換結果"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"批次轉換失敗: {e}")
+                error = str(e)
+            for index, (path, _) in enumerate(items):
+                if index not in reported:
+                    results.put_nowait((path, False, f"OCR 處理出錯: {error}", None, False))
+
+        batch_size = max(1, settings.OCR_BATCH_SIZE)
+        tasks = [asyncio.ensure_future(convert_one(*item)) for item in individual]
+        for do_ocr, items in batches.items():
+            for start in range(0, len(items), batch_size):
+                tasks.append(asyncio.ensure_future(convert_group(items[start:start + batch_size], do_ocr)))
+        logger.info(f"批次處理 {len(paths)} 份文件，共 {len(tasks)} 個轉換任務")
+
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def _save_profile(self, session: ProfileSession, span: Span, file_path: Path, status: str) -> None:
+        """保存效能分析報告，失敗不影響本次結果"""
+        try:
+            path = await asyncio.get_running_loop().run_in_executor(
+                None, lambda: session.save(file=file_path.name, status=status)
+            )
+        except Exception as e:
+            logger.warning(f"保存效能分析報告失敗: {str(e)}")
+            return
+        if path:
+            logger.info(f"效能分析報告已保存: {path}")
+            span.set(profile=str(path))
+
+    async def _cache_put(self, cache_key: str, markdown: str) -> None:
+        """寫入結果快取，失敗不影響本次結果"""
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.cache.put, cache_key, markdown)
+        except Exception as e:
+            logger.warning(f"寫入結果快取失敗: {str(e)}")
+
+    async def _convert_with_deadline(
+        self,
+        file_path: Path,
+        submit_options: Dict[str, Any],
+        progress_callback: Optional[Callable[[int, str], None]] = None,
+        page_callback: Optional[Callable[[str, int, int], Awaitable[None]]] = None
+    ) -> Tuple[str, Optional[str]]:
+        """
+        轉換文件並限制整份文件的轉換時間
+
+        時間上限由文件的第一個工作進程任務開始執行時起算，不含排隊等待的時間；
+        超過時取消所有頁面區段，執行中的工作進程隨之終止。submit_options 中的 on_start
+        只在第一個任務開始時調用一次。參數與返回值同 _convert。
+
+        Raises:
+            JobTimeoutError: 轉換時間超過 self.job_timeout
+        """
         loop = asyncio.get_running_loop()
+        start_callback = submit_options.get('on_start')
+        started = False
+        timer: Optional[asyncio.TimerHandle] = None
+        timed_out = False
+
+        def on_start() -> None:
+            nonlocal started, timer
+            if started:
+                return
+            started = True
+            if self.job_timeout:
+                timer = loop.call_later(self.job_timeout, expire)
+            if start_callback:
+                start_callback()
+
+        def expire() -> None:
+            nonlocal timed_out
+            timed_out = True
+            task.cancel()
+
+        task = asyncio.ensure_future(
+            self._convert(file_path, {**submit_options, 'on_start': on_start}, progress_callback, page_callback)
+        )
         try:
-            # 如果是協程，直接等待
-            if asyncio.iscoroutinefunction(func):
-                return await func(*args, **kwargs)
-            # 如果是同步函數，使用執行器運行
-            self.current_task = loop.run_in_executor(None, lambda: func(*args, **kwargs))
-            return await self.current_task
+            return await task
         except asyncio.CancelledError:
-            if hasattr(self, 'current_task') and self.current_task:
-                self.current_task.cancel()
+            if not timed_out:
+                raise
+            logger.warning(f"文件轉換超過 {self.job_timeout:g} 秒上限: {file_path}")
+            raise JobTimeoutError(f"處理時間超過 {self.job_timeout:g} 秒上限") from None
+        finally:
+            if timer is not None:
+                timer.cancel()
+            # 外部取消時一併取消轉換
+            task.cancel()
+
+    async def _convert(
+        self,
+        file_path: Path,
+        submit_options: Dict[str, Any],
+        progress_callback: Optional[Callable[[int, str], None]] = None,
+        page_callback: Optional[Callable[[str, int, int], Awaitable[None]]] = None
+    ) -> Tuple[str, Optional[str]]:
+        """
+        在工作進程池中轉換文件
+
+        PDF 依各頁是否有文字層分為需要與不需要 OCR 的區段，大型 PDF 再拆分為
+        較小的頁面區段，各區段並行轉換後依頁序合併。
+
+        Args:
+            file_path: 要處理的文件路徑
+            submit_options: 提交至工作進程池的排程參數
+            progress_callback: 進度回調函數
+            page_callback: 頁面結果回調函數，依頁序接收已完成的區段
+
+        Returns:
+            Tuple[Markdown 內容, 各頁處理方式摘要]
+        """
+        def on_position(position: int) -> None:
+            if progress_callback:
+                message = "即將開始處理..." if position == 0 else f"排隊中，前方還有 {position} 個任務"
+                asyncio.ensure_future(progress_callback(30, message))
+
+        if get_direct_converter(file_path):
+            try:
+                # 直接解析同樣在工作進程中執行，不佔用主進程的 GIL
+                markdown = await self.pool.submit(
+                    'direct',
+                    on_position=on_position,
+                    file_path=str(file_path),
+                    **submit_options
+                )
+                return markdown, f"直接解析 {file_path.suffix.lstrip('.').upper()}，未執行 OCR"
+            except (asyncio.CancelledError, QueueFullError, JobTimeoutError):
+                raise
+            except Exception as e:
+                # 直接解析失敗時退回 docling
+                logger.warning(f"直接解析失敗，改用 docling 處理: {file_path}: {e}")
+
+        if is_spreadsheet(file_path):
+            try:
+                return await self._convert_spreadsheet(file_path, submit_options, progress_callback)
+            except (asyncio.CancelledError, QueueFullError, JobTimeoutError):
+                raise
+            except Exception as e:
+                logger.warning(f"試算表轉換失敗，改用 docling 處理: {file_path}: {e}")
+
+        segments, summary = await self._plan_segments(file_path)
+
+        if len(segments) <= 1:
+            def on_event(event: tuple) -> None:
+                kind, *payload = event
+                if kind == 'progress':
+                    if progress_callback:
+                        asyncio.ensure_future(progress_callback(*payload))
+                elif kind == 'pages':
+                    # 工作進程逐段轉換 PDF 時回報的頁數進度與已完成的內容
+                    pages_done, total_pages, markdown = payload
+                    if progress_callback:
+                        asyncio.ensure_future(progress_callback(
+                            int(100 * pages_done / total_pages),
+                            f"已完成 {pages_done} / {total_pages} 頁"
+                        ))
+                    if page_callback:
+                        asyncio.ensure_future(page_callback(markdown, pages_done, total_pages))
+
+            markdown = await self.pool.submit(
+                'convert',
+                on_event=on_event,
+                on_position=on_position,
+                file_path=str(file_path),
+                do_ocr=segments[0][2] if segments else True,
+                **submit_options
+            )
+            return markdown, summary
+
+        logger.info(f"拆分為 {len(segments)} 個頁面區段並行處理: {file_path}")
+        total_pages = segments[-1][1]
+        parts: List[Optional[str]] = [None] * len(segments)
+        pages_done = 0
+        next_part = 0
+
+        async def convert_range(index: int, start: int, end: int, do_ocr: bool) -> None:
+            nonlocal pages_done, next_part
+            with tracer.span('segment', pages=f"{start + 1}-{end}", do_ocr=do_ocr):
+                markdown = await self.pool.submit(
+                    'convert',
+                    # 以第一個區段的排隊位置代表整份文件
+                    on_position=on_position if index == 0 else None,
+                    file_path=str(file_path),
+                    page_range=(start, end),
+                    do_ocr=do_ocr,
+                    **submit_options
+                )
+            parts[index] = markdown.strip()
+            pages_done += end - start
+            if progress_callback:
+                await progress_callback(
+                    int(100 * pages_done / total_pages),
+                    f"已完成 {pages_done} / {total_pages} 頁"
+                )
+
+            # 依頁序送出已連續完成的區段
+            while next_part < len(parts) and parts[next_part] is not None:
+                part = parts[next_part]
+                next_part += 1
+                if page_callback:
+                    await page_callback(part, pages_done, total_pages)
+
+        tasks = [asyncio.ensure_future(convert_range(i, *segment)) for i, segment in enumerate(segments)]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # 任一區段失敗或任務被取消時，一併取消其餘區段
+            for task in tasks:
+                task.cancel()
             raise
+        return '\n\n'.join(part for part in parts if part), summary
+
+    async def _convert_spreadsheet(
+        self,
+        file_path: Path,
+        submit_options: Dict[str, Any],
+        progress_callback: Optional[Callable[[int, str], None]] = None
+    ) -> Tuple[str, str]:
+        """
+        將試算表的各工作表分派至工作進程池並行轉換，依原順序合併
+
+        Args:
+            file_path: 試算表路徑
+            submit_options: 提交至工作進程池的排程參數
+            progress_callback: 進度回調函數
+
+        Returns:
+            Tuple[Markdown 內容, 處理摘要]
+        """
+        loop = asyncio.get_running_loop()
+        sheet_names = await loop.run_in_executor(None, list_sheets, file_path)
+        done = 0
+
+        async def convert_sheet(sheet_name: Optional[str]) -> str:
+            nonlocal done
+            markdown = await self.pool.submit(
+                'sheet',
+                file_path=str(file_path),
+                sheet_name=sheet_name,
+                max_rows=settings.SHEET_MAX_ROWS or None,
+                chunk_rows=settings.SHEET_CHUNK_ROWS,
+                **submit_options
+            )
+            done += 1
+            if progress_callback:
+                await progress_callback(
+                    30 + int(60 * done / len(sheet_names)),
+                    f"已完成 {done} / {len(sheet_names)} 個工作表"
+                )
+            return markdown.strip()
+
+        tasks = [asyncio.ensure_future(convert_sheet(name)) for name in sheet_names]
+        try:
+            parts = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        return '\n\n'.join(parts) + '\n', f"直接解析 {len(sheet_names)} 個工作表，未執行 OCR"
+
+    async def _plan_segments(self, file_path: Path) -> Tuple[List[Tuple[int, int, bool]], Optional[str]]:
+        """
+        規劃 PDF 的頁面區段，不需拆分時返回單一區段或空列表
+
+        Args:
+            file_path: 文件路徑
+
+        Returns:
+            Tuple[區段列表 (起始頁, 結束頁, 是否需要 OCR), 各頁處理方式摘要]
+        """
+        if file_path.suffix.lower() != '.pdf':
+            return [], None
+        if not settings.PDF_TEXT_FAST_PATH and not settings.PDF_PAGE_PARALLEL:
+            return [], None
+
+        loop = asyncio.get_running_loop()
+        with tracer.span('plan_pages') as span:
+            if settings.PDF_TEXT_FAST_PATH:
+                text_pages = await loop.run_in_executor(
+                    None, detect_text_pages, file_path, settings.PDF_TEXT_MIN_CHARS
+                )
+            else:
+                text_pages = [False] * await loop.run_in_executor(None, count_pages, file_path)
+
+            split = settings.PDF_PAGE_PARALLEL and len(text_pages) >= settings.PDF_SPLIT_MIN_PAGES
+            segments = plan_page_segments(text_pages, settings.PDF_PAGES_PER_CHUNK if split else None)
+            span.set(pages=len(text_pages), text_pages=sum(text_pages), segments=len(segments))
+
+        summary = None
+        if settings.PDF_TEXT_FAST_PATH:
+            text = [i + 1 for i, has_text in enumerate(text_pages) if has_text]
+            scanned = [i + 1 for i, has_text in enumerate(text_pages) if not has_text]
+            summary = '；'.join(
+                f"{label}：第 {format_page_numbers(pages)} 頁"
+                for label, pages in (("使用文字層", text), ("執行 OCR", scanned))
+                if pages
+            )
+            logger.info(f"PDF 文字層檢查 {file_path.name}: {summary}")
+        return segments, summary
+
+    async def cancel_processing(self, job_id: str) -> None:
+        """
+        取消正在進行的處理任務
+
+        執行中的轉換會連同工作進程一併終止，排隊中的頁面區段會從佇列移除。
+
+        Args:
+            job_id: 要取消的任務識別碼
+        """
+        task = self.active_jobs.get(job_id)
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                logger.info("OCR 處理已取消")
 
 # 創建全局 OCR 服務實例
 ocr_service = OCRService()
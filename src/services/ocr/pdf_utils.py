@@ -0,0 +1,127 @@
+"""
+PDF 工具模組
+
+此模組使用 PyMuPDF 計算 PDF 頁數、檢查各頁文字層、規劃頁面區段並擷取指定頁面。
+"""
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+
+def count_pages(file_path: Path) -> int:
+    """
+    取得 PDF 頁數
+
+    Args:
+        file_path: PDF 文件路徑
+
+    Returns:
+        int: 頁數
+    """
+    import fitz  # PyMuPDF
+
+    with fitz.open(file_path) as doc:
+        return doc.page_count
+
+
+def detect_text_pages(file_path: Path, min_chars: int) -> List[bool]:
+    """
+    檢查每一頁是否已有可擷取的文字層
+
+    Args:
+        file_path: PDF 文件路徑
+        min_chars: 視為有文字層所需的最少字元數（不含空白）
+
+    Returns:
+        List[bool]: 每頁是否有文字層
+    """
+    import fitz  # PyMuPDF
+
+    with fitz.open(file_path) as doc:
+        return [len(''.join(page.get_text('text').split())) >= min_chars for page in doc]
+
+
+def plan_page_ranges(page_count: int, pages_per_chunk: int) -> List[Tuple[int, int]]:
+    """
+    將頁面切分為連續的區段
+
+    Args:
+        page_count: 總頁數
+        pages_per_chunk: 每個區段的頁數
+
+    Returns:
+        List[Tuple[int, int]]: 區段列表，每項為 (起始頁, 結束頁)，從 0 起算且不含結束頁
+    """
+    pages_per_chunk = max(1, pages_per_chunk)
+    return [
+        (start, min(start + pages_per_chunk, page_count))
+        for start in range(0, page_count, pages_per_chunk)
+    ]
+
+
+def plan_page_segments(
+    text_pages: List[bool],
+    pages_per_chunk: Optional[int] = None
+) -> List[Tuple[int, int, bool]]:
+    """
+    將連續且處理方式相同的頁面分為一組，必要時再依頁數上限切分
+
+    Args:
+        text_pages: 每頁是否有文字層
+        pages_per_chunk: 每個區段的頁數上限，None 表示不切分
+
+    Returns:
+        List[Tuple[int, int, bool]]: 區段列表，每項為 (起始頁, 結束頁, 是否需要 OCR)，
+            從 0 起算且不含結束頁
+    """
+    segments = []
+    start = 0
+    for index in range(1, len(text_pages) + 1):
+        if index < len(text_pages) and text_pages[index] == text_pages[start]:
+            continue
+        do_ocr = not text_pages[start]
+        length = index - start
+        for range_start, range_end in plan_page_ranges(length, pages_per_chunk or length):
+            segments.append((start + range_start, start + range_end, do_ocr))
+        start = index
+    return segments
+
+
+def format_page_numbers(pages: List[int]) -> str:
+    """
+    將頁碼列表格式化為易讀的區間文字，例如 [1, 2, 3, 7] -> "1-3、7"
+
+    Args:
+        pages: 頁碼列表（從 1 起算，已排序）
+
+    Returns:
+        str: 區間文字
+    """
+    ranges = []
+    for page in pages:
+        if ranges and page == ranges[-1][1] + 1:
+            ranges[-1][1] = page
+        else:
+            ranges.append([page, page])
+    return '、'.join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
+
+
+def extract_pages(file_path: Path, start: int, end: int, output_dir: Path) -> Path:
+    """
+    將指定頁面區段另存為新的 PDF
+
+    Args:
+        file_path: 來源 PDF 路徑
+        start: 起始頁（從 0 起算）
+        end: 結束頁（不含）
+        output_dir: 輸出目錄
+
+    Returns:
+        Path: 新 PDF 的路徑
+    """
+    import fitz  # PyMuPDF
+
+    output_path = Path(output_dir) / f"{Path(file_path).stem}_p{start + 1}-{end}.pdf"
+    with fitz.open(file_path) as src, fitz.open() as dst:
+        dst.insert_pdf(src, from_page=start, to_page=end - 1)
+        dst.save(output_path)
+    return output_path
@@ -0,0 +1,184 @@
+"""
+轉換結果快取模組
+
+此模組以文件內容雜湊與處理參數為鍵，將轉換後的 Markdown 持久化到磁碟，
+並依總大小與存放時間進行 LRU 淘汰。
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """以內容定址的轉換結果快取"""
+
+    def __init__(
+        self,
+        cache_dir: Path = settings.CACHE_DIR,
+        max_bytes: int = settings.RESULT_CACHE_MAX_BYTES,
+        max_age: int = settings.RESULT_CACHE_MAX_AGE
+    ):
+        """
+        初始化結果快取
+
+        Args:
+            cache_dir: 快取目錄
+            max_bytes: 快取內容總大小上限（位元組）
+            max_age: 快取項目最長保存時間（秒）
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.cache_dir.mkdir(exist_ok=True, parents=True)
+        self._db = sqlite3.connect(
+            str(self.cache_dir / 'index.sqlite3'),
+            check_same_thread=False
+        )
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'key TEXT PRIMARY KEY, size INTEGER NOT NULL, '
+            'created REAL NOT NULL, accessed REAL NOT NULL)'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS idx_accessed ON entries (accessed)')
+        self._db.commit()
+
+    @staticmethod
+    def make_key(content_hash: str, options: Dict[str, Any]) -> str:
+        """
+        由文件內容雜湊與處理參數產生快取鍵
+
+        Args:
+            content_hash: 文件內容的 SHA-256
+            options: 影響轉換結果的處理參數
+
+        Returns:
+            str: 快取鍵
+        """
+        options_json = json.dumps(options, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(f"{content_hash}:{options_json}".encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.md"
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        讀取快取內容
+
+        Args:
+            key: 快取鍵
+
+        Returns:
+            Optional[str]: 快取的 Markdown，未命中時返回 None
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                'SELECT created FROM entries WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or now - row[0] > self.max_age:
+                self.misses += 1
+                return None
+            try:
+                content = self._entry_path(key).read_text(encoding='utf-8')
+            except OSError:
+                # 索引與檔案不一致，視為未命中並移除索引
+                self._db.execute('DELETE FROM entries WHERE key = ?', (key,))
+                self._db.commit()
+                self.misses += 1
+                return None
+            self._db.execute('UPDATE entries SET accessed = ? WHERE key = ?', (now, key))
+            self._db.commit()
+            self.hits += 1
+        return content
+
+    def put(self, key: str, content: str) -> None:
+        """
+        寫入快取內容，必要時淘汰舊項目
+
+        Args:
+            key: 快取鍵
+            content: Markdown 內容
+        """
+        data = content.encode('utf-8')
+        if len(data) > self.max_bytes:
+            return
+
+        path = self._entry_path(key)
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO entries (key, size, created, accessed) VALUES (?, ?, ?, ?)',
+                (key, len(data), now, now)
+            )
+            self._db.commit()
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """淘汰過期項目，並依最近使用時間淘汰超出容量的項目"""
+        expired = self._db.execute(
+            'SELECT key FROM entries WHERE created < ?', (now - self.max_age,)
+        ).fetchall()
+        removed = [key for (key,) in expired]
+
+        total = self._db.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM entries WHERE created >= ?',
+            (now - self.max_age,)
+        ).fetchone()[0]
+        if total > self.max_bytes:
+            for key, size in self._db.execute(
+                'SELECT key, size FROM entries WHERE created >= ? ORDER BY accessed',
+                (now - self.max_age,)
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                removed.append(key)
+                total -= size
+
+        for key in removed:
+            try:
+                self._entry_path(key).unlink()
+            except OSError:
+                pass
+        if removed:
+            self._db.executemany('DELETE FROM entries WHERE key = ?', [(key,) for key in removed])
+            self._db.commit()
+            logger.info(f"結果快取已淘汰 {len(removed)} 個項目")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        取得快取統計資料
+
+        Returns:
+            dict: 命中次數、未命中次數、命中率、項目數與總大小
+        """
+        with self._lock:
+            entries, total_bytes = self._db.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries'
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'total_bytes': total_bytes,
+        }
@@ -0,0 +1,179 @@
+"""
+OCR 任務排程模組
+
+此模組提供有容量上限的任務佇列：高優先順序（互動式單一文件）的任務先於批次任務執行，
+同一優先順序內以輪詢方式在各客戶端之間分派，避免單一使用者大量上傳時其他人長時間等待。
+"""
+import asyncio
+import itertools
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+# 優先順序，數值越小越先執行
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+
+
+class QueueFullError(RuntimeError):
+    """任務佇列已滿"""
+
+
+class Job:
+    """排隊中的工作進程任務"""
+
+    __slots__ = (
+        'task', 'kwargs', 'handle_event', 'future',
+        'client_id', 'priority', 'job_id', 'on_position', 'on_start', 'position', 'submitted', 'span',
+    )
+
+    def __init__(
+        self,
+        task: str,
+        kwargs: Dict[str, Any],
+        handle_event: Callable[[tuple], None],
+        future: asyncio.Future,
+        client_id: Optional[str] = None,
+        priority: int = PRIORITY_INTERACTIVE,
+        job_id: Optional[str] = None,
+        on_position: Optional[Callable[[int], None]] = None,
+        span: Optional[Any] = None,
+        on_start: Optional[Callable[[], None]] = None
+    ):
+        self.task = task
+        self.kwargs = kwargs
+        self.handle_event = handle_event
+        self.future = future
+        self.client_id = client_id
+        self.priority = priority
+        self.job_id = job_id
+        self.on_position = on_position
+        self.on_start = on_start
+        self.position: Optional[int] = None
+        self.submitted = time.perf_counter()
+        # 追蹤區段：排隊時為提交任務時的區段，執行時為工作進程的執行區段
+        self.span = span
+
+
+class JobScheduler:
+    """具優先順序與客戶端公平性的任務佇列"""
+
+    def __init__(self, max_size: int):
+        """
+        初始化任務佇列
+
+        Args:
+            max_size: 佇列中最多可等待的任務數量
+        """
+        self.max_size = max_size
+        # 每個優先順序各有一個客戶端輪詢環：客戶端 -> 該客戶端的任務佇列
+        self._rings: Dict[int, "OrderedDict[Any, Deque[Job]]"] = {}
+        self._size = 0
+        self._anonymous = itertools.count()
+        self._not_empty = asyncio.Event()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def put(self, job: Job) -> None:
+        """
+        將任務加入佇列
+
+        Args:
+            job: 任務
+
+        Raises:
+            QueueFullError: 佇列已滿
+        """
+        if self._size >= self.max_size:
+            raise QueueFullError("處理佇列已滿，請稍後再試")
+
+        # 未指定客戶端的任務各自獨立參與輪詢
+        client_key = job.client_id if job.client_id is not None else ('anonymous', next(self._anonymous))
+        ring = self._rings.setdefault(job.priority, OrderedDict())
+        ring.setdefault(client_key, deque()).append(job)
+        self._size += 1
+        self._not_empty.set()
+        self._notify_positions()
+
+    async def get(self) -> Job:
+        """
+        取出下一個應執行的任務，佇列為空時等待
+
+        Returns:
+            Job: 任務
+        """
+        while True:
+            while self._size == 0:
+                self._not_empty.clear()
+                await self._not_empty.wait()
+
+            job = self._pop_next()
+            self._notify_positions()
+            if not job.future.done():
+                return job
+
+    def remove(self, job: Job) -> bool:
+        """
+        從佇列移除尚未執行的任務
+
+        Args:
+            job: 任務
+
+        Returns:
+            bool: 任務是否仍在佇列中並已移除
+        """
+        ring = self._rings.get(job.priority, {})
+        for client_key, jobs in ring.items():
+            if job in jobs:
+                jobs.remove(job)
+                if not jobs:
+                    del ring[client_key]
+                self._size -= 1
+                self._notify_positions()
+                return True
+        return False
+
+    def jobs_for(self, job_id: str) -> list:
+        """取得指定任務識別碼下所有排隊中的任務"""
+        return [
+            job
+            for ring in self._rings.values()
+            for jobs in ring.values()
+            for job in jobs
+            if job.job_id == job_id
+        ]
+
+    def _pop_next(self) -> Job:
+        """依優先順序與輪詢順序取出任務"""
+        for priority in sorted(self._rings):
+            ring = self._rings[priority]
+            if not ring:
+                continue
+            client_key, jobs = next(iter(ring.items()))
+            job = jobs.popleft()
+            # 輪到的客戶端移至環尾，仍有任務時等待下一輪
+            del ring[client_key]
+            if jobs:
+                ring[client_key] = jobs
+            self._size -= 1
+            return job
+        raise IndexError("佇列為空")
+
+    def _notify_positions(self) -> None:
+        """重新計算排隊位置，並通知位置有變化的任務"""
+        ahead = 0
+        for priority in sorted(self._rings):
+            ring = self._rings[priority]
+            lengths = [len(jobs) for jobs in ring.values()]
+            for ring_index, jobs in enumerate(ring.values()):
+                for round_index, job in enumerate(jobs):
+                    if job.on_position is None:
+                        continue
+                    # 在此任務之前的輪次中各客戶端取出的任務，加上同一輪中排在前面的客戶端
+                    position = ahead + sum(min(length, round_index) for length in lengths)
+                    position += sum(1 for length in lengths[:ring_index] if length > round_index)
+                    if position != job.position:
+                        job.position = position
+                        job.on_position(position)
+            ahead += sum(lengths)
@@ -0,0 +1,178 @@
+"""
+試算表轉換模組
+
+此模組將 CSV 與 Excel 工作表轉換為 Markdown 表格：資料以固定列數的 DataFrame 區塊讀取，
+各欄以向量化字串運算組成表格列，記憶體用量由區塊大小決定而不隨工作表大小增長。
+"""
+import itertools
+import re
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from src.config import settings
+from src.services.ocr.direct_converter import escape_table_cell
+
+# 支援的試算表副檔名
+SPREADSHEET_SUFFIXES = {settings.FILE_EXTENSIONS[mime_type] for mime_type in settings.SPREADSHEET_FILE_TYPES}
+
+# 組成表格時暫用的儲存格與資料列分隔字元
+_CELL_SEP = '\x1f'
+_ROW_SEP = '\x1e'
+_NEWLINES = re.compile(r'[\r\n]+')
+
+
+def is_spreadsheet(file_path: Path) -> bool:
+    """檢查文件是否為支援的試算表格式"""
+    return Path(file_path).suffix.lower() in SPREADSHEET_SUFFIXES
+
+
+def list_sheets(file_path: Path) -> List[Optional[str]]:
+    """
+    取得試算表中的工作表名稱
+
+    Args:
+        file_path: 試算表路徑
+
+    Returns:
+        List[Optional[str]]: 工作表名稱列表，CSV 只有一個名稱為 None 的工作表
+    """
+    file_path = Path(file_path)
+    suffix = file_path.suffix.lower()
+    if suffix == '.csv':
+        return [None]
+    if suffix == '.xls':
+        import pandas as pd
+
+        with pd.ExcelFile(file_path) as xl:
+            return list(xl.sheet_names)
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def sheet_to_markdown(
+    file_path: Path,
+    sheet_name: Optional[str] = None,
+    max_rows: Optional[int] = None,
+    chunk_rows: int = settings.SHEET_CHUNK_ROWS
+) -> str:
+    """
+    將單一工作表轉換為 Markdown 表格
+
+    Args:
+        file_path: 試算表路徑
+        sheet_name: 工作表名稱，CSV 為 None
+        max_rows: 最多輸出的資料列數，None 表示不限制
+        chunk_rows: 每個區塊讀取的列數
+
+    Returns:
+        str: Markdown 內容
+    """
+    header, chunks = _read_chunks(Path(file_path), sheet_name, max(1, chunk_rows))
+    lines = []
+    if sheet_name is not None:
+        lines.append(f"## {sheet_name}\n")
+    if header is None:
+        lines.append("（空白工作表）")
+        return '\n'.join(lines) + '\n'
+
+    width = len(header)
+    lines.append('| ' + ' | '.join(escape_table_cell(value) for value in header) + ' |')
+    lines.append('| ' + ' | '.join(['---'] * width) + ' |')
+
+    written = 0
+    truncated = False
+    for chunk in chunks:
+        if max_rows is not None and written + len(chunk) > max_rows:
+            chunk = chunk.iloc[:max_rows - written]
+            truncated = True
+        if len(chunk):
+            lines.append(_render_rows(chunk, width))
+            written += len(chunk)
+        if truncated:
+            break
+
+    if truncated:
+        lines.append(f"\n_（僅顯示前 {max_rows} 列）_")
+    return '\n'.join(lines) + '\n'
+
+
+def _read_chunks(file_path: Path, sheet_name: Optional[str], chunk_rows: int) -> Tuple[Optional[list], Iterator]:
+    """
+    以區塊讀取工作表
+
+    Returns:
+        Tuple[標題列, DataFrame 區塊迭代器]，空白工作表的標題列為 None
+    """
+    import pandas as pd
+
+    suffix = file_path.suffix.lower()
+    if suffix == '.csv':
+        try:
+            # 以字串讀取，保留原始的數字格式與前導零
+            reader = pd.read_csv(
+                file_path,
+                dtype=str,
+                keep_default_na=False,
+                chunksize=chunk_rows,
+                encoding='utf-8-sig',
+                encoding_errors='replace',
+            )
+            first = next(reader)
+        except (StopIteration, pd.errors.EmptyDataError):
+            return None, iter(())
+        return list(first.columns), itertools.chain([first], reader)
+
+    if suffix == '.xls':
+        # .xls 無法串流讀取，整張工作表載入後再分塊輸出
+        frame = pd.read_excel(file_path, sheet_name=sheet_name, header=None, dtype=object)
+        if frame.empty:
+            return None, iter(())
+        header = list(frame.iloc[0])
+        body = frame.iloc[1:]
+        return header, (body.iloc[start:start + chunk_rows] for start in range(0, len(body), chunk_rows))
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    rows = workbook[sheet_name].iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        workbook.close()
+        return None, iter(())
+
+    def chunks() -> Iterator:
+        try:
+            while True:
+                batch = list(itertools.islice(rows, chunk_rows))
+                if not batch:
+                    break
+                yield pd.DataFrame(batch, dtype=object)
+        finally:
+            workbook.close()
+
+    return list(header), chunks()
+
+
+def _render_rows(chunk, width: int) -> str:
+    """以向量化字串運算將區塊轉為 Markdown 表格列"""
+    columns = []
+    for index in range(width):
+        if index >= chunk.shape[1]:
+            columns.append('')
+            continue
+        column = chunk.iloc[:, index]
+        columns.append(column.where(column.notna(), '').astype(str))
+
+    line = columns[0]
+    for column in columns[1:]:
+        line = line + _CELL_SEP + column
+
+    # 先以控制字元分隔儲存格與資料列，整個區塊一次完成轉義，避免逐格處理
+    text = _NEWLINES.sub(' ', _ROW_SEP.join(line.tolist()).replace('|', '\\|'))
+    return '| ' + text.replace(_CELL_SEP, ' | ').replace(_ROW_SEP, ' |\n| ') + ' |'
@@ -0,0 +1,348 @@
+"""
+OCR 工作進程模組
+
+此模組在獨立的工作進程中執行，每個進程啟動時載入一次 DocumentConverter，
+之後重複使用該轉換器處理主進程派發的任務。已有文字層的 PDF 頁面改用不執行 OCR 的轉換器，
+該轉換器在第一次需要時才建立。
+"""
+import logging
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.config import settings
+from src.services.ocr.direct_converter import get_direct_converter
+from src.services.ocr.pdf_utils import count_pages, extract_pages
+from src.services.ocr.sheet_converter import sheet_to_markdown
+from src.services.profiling import collect_profile
+
+logger = logging.getLogger(__name__)
+
+# 每個工作進程獨立持有的轉換器，依是否執行 OCR 區分
+_converters: Dict[bool, Any] = {}
+
+
+def get_converter(do_ocr: bool = True):
+    """
+    取得（必要時建立）本進程的 DocumentConverter
+
+    Args:
+        do_ocr: PDF 是否執行 OCR，False 時直接使用文件本身的文字層
+    """
+    if do_ocr not in _converters:
+        from docling.datamodel.base_models import InputFormat
+        from docling.datamodel.pipeline_options import PdfPipelineOptions
+        from docling.document_converter import DocumentConverter, PdfFormatOption
+
+        if settings.TRACE_ENABLED:
+            # 記錄 docling 各處理階段的耗時，供任務追蹤使用
+            from docling.datamodel.settings import settings as docling_settings
+            docling_settings.debug.profile_pipeline_timings = True
+
+        pipeline_options = PdfPipelineOptions(do_ocr=do_ocr)
+        converter = DocumentConverter(
+            format_options={InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)}
+        )
+        # 預先初始化 PDF 處理管線，讓模型在啟動時就載入完成
+        converter.initialize_pipeline(InputFormat.PDF)
+        _converters[do_ocr] = converter
+    return _converters[do_ocr]
+
+
+@contextmanager
+def _span(emit: Callable[..., None], name: str, **attrs: Any) -> Iterator[None]:
+    """
+    計時 with 區塊，以 ('span', 名稱, 開始時間, 耗時, 屬性) 事件回報主進程
+
+    開始時間使用 Unix 時間，讓主進程能與自己記錄的區段對齊。
+    """
+    start = time.time()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        emit('span', name, start, time.perf_counter() - started, attrs)
+
+
+def _emit_docling_timings(emit: Callable[..., None], result: Any) -> None:
+    """
+    將 docling 記錄的各處理階段耗時回報為區段
+
+    同一階段在各頁面重複執行，合併為一個由最早開始到最晚結束的區段，
+    並附上執行次數與各次耗時的總和。
+    """
+    for stage, item in (getattr(result, 'timings', None) or {}).items():
+        starts = getattr(item, 'start_timestamps', None) or []
+        times = getattr(item, 'times', None) or []
+        if not starts or not times:
+            continue
+        # docling 以不含時區的 UTC 時間記錄開始時間
+        begins = [
+            (moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)).timestamp()
+            for moment in starts
+        ]
+        start = min(begins)
+        end = max(begin + seconds for begin, seconds in zip(begins, times))
+        emit('span', f"docling.{stage}", start, end - start, {
+            'count': len(times),
+            'total_seconds': round(sum(times), 4),
+        })
+
+
+def convert_document(
+    file_path: str,
+    emit: Callable[..., None],
+    page_range: Optional[Tuple[int, int]] = None,
+    do_ocr: bool = True
+) -> str:
+    """
+    將文件轉換為 Markdown
+
+    未指定頁面區段的 PDF 每完成 settings.PDF_PROGRESS_PAGES 頁回報
+    ('pages', 已完成頁數, 總頁數, Markdown 片段)。
+
+    Args:
+        file_path: 要處理的文件路徑
+        emit: 向主進程回報事件的函數
+        page_range: 只轉換 PDF 的指定頁面區段 (起始頁, 結束頁)，從 0 起算且不含結束頁
+        do_ocr: PDF 是否執行 OCR
+
+    Returns:
+        str: Markdown 內容
+    """
+    if page_range is not None:
+        with tempfile.TemporaryDirectory(prefix='ocr_pages_') as tmp_dir:
+            with _span(emit, 'page_split', pages=f"{page_range[0] + 1}-{page_range[1]}"):
+                chunk_path = extract_pages(Path(file_path), *page_range, Path(tmp_dir))
+            return _convert(str(chunk_path), emit, do_ocr)
+    if settings.PDF_PROGRESS_PAGES > 0 and Path(file_path).suffix.lower() == '.pdf':
+        return _convert_by_pages(file_path, emit, do_ocr, settings.PDF_PROGRESS_PAGES)
+    return _convert(file_path, emit, do_ocr)
+
+
+def _convert_by_pages(file_path: str, emit: Callable[..., None], do_ocr: bool, step: int) -> str:
+    """
+    以 docling 的頁面範圍依序轉換 PDF，每完成一段即回報頁數進度與該段內容
+
+    轉換器與模型已載入，分段只增加每段的文件開啟成本；每段頁數不小於 docling 的
+    頁面批次大小時，模型推論的批次效率不受影響。
+    """
+    try:
+        total_pages = count_pages(Path(file_path))
+    except Exception as e:
+        logger.warning(f"無法取得 PDF 頁數，整份一次轉換: {file_path}: {e}")
+        return _convert(file_path, emit, do_ocr)
+
+    parts = []
+    for start in range(0, total_pages, step):
+        end = min(start + step, total_pages)
+        markdown = _convert(file_path, emit, do_ocr, pages=(start, end)).strip()
+        parts.append(markdown)
+        emit('pages', end, total_pages, markdown)
+    return '\n\n'.join(part for part in parts if part)
+
+
+def _convert(
+    file_path: str,
+    emit: Callable[..., None],
+    do_ocr: bool = True,
+    pages: Optional[Tuple[int, int]] = None
+) -> str:
+    """執行轉換並導出 Markdown，pages 為只轉換的頁面區段（從 0 起算且不含結束頁）"""
+    options = {}
+    attrs: Dict[str, Any] = {'do_ocr': do_ocr}
+    if pages is None:
+        emit('progress', 40, "正在處理文件..." if do_ocr else "正在擷取文字層...")
+    else:
+        # docling 的頁面範圍從 1 起算且包含結束頁
+        options['page_range'] = (pages[0] + 1, pages[1])
+        attrs['pages'] = f"{pages[0] + 1}-{pages[1]}"
+    with _span(emit, 'convert', **attrs):
+        result = get_converter(do_ocr).convert(file_path, **options)
+
+    # 檢查結果是否有效
+    if not result or not hasattr(result, 'document'):
+        raise ValueError("OCR 處理失敗，未返回有效結果")
+    _emit_docling_timings(emit, result)
+
+    if pages is None:
+        emit('progress', 90, "正在生成 Markdown...")
+    with _span(emit, 'export'):
+        markdown = result.document.export_to_markdown()
+    return markdown
+
+
+def convert_documents(file_paths: List[str], emit: Callable[..., None], do_ocr: bool = True) -> int:
+    """
+    以 docling 的多文件轉換一次處理多份文件，讓版面與 OCR 模型的推論跨文件批次執行
+
+    每份文件完成時立即回報 ('document', 索引, 是否成功, Markdown 內容或錯誤訊息)；
+    兩份文件完成之間的時間記為該文件的轉換區段。
+
+    Args:
+        file_paths: 文件路徑列表
+        emit: 向主進程回報事件的函數
+        do_ocr: PDF 是否執行 OCR
+
+    Returns:
+        int: 成功轉換的文件數量
+    """
+    from docling.datamodel.base_models import ConversionStatus
+    from docling.datamodel.settings import settings as docling_settings
+
+    # 讓整批文件的頁面一起進入模型；此為進程全域設定，轉換結束後還原，避免影響之後的單一文件轉換
+    # （convert_all 為延遲執行的產生器，需在整個迭代過程中保持）
+    original_batch_size = docling_settings.perf.doc_batch_size
+    docling_settings.perf.doc_batch_size = max(original_batch_size, len(file_paths))
+    try:
+        index_of = {str(Path(path).resolve()): index for index, path in enumerate(file_paths)}
+        converted = 0
+        results = get_converter(do_ocr).convert_all(file_paths, raises_on_error=False)
+        start = time.time()
+        started = time.perf_counter()
+        for position, result in enumerate(results):
+            index = index_of.get(str(Path(result.input.file).resolve()), position)
+            emit('span', 'convert', start, time.perf_counter() - started, {
+                'do_ocr': do_ocr,
+                'document': Path(file_paths[index]).name,
+            })
+            _emit_docling_timings(emit, result)
+            if result.status in (ConversionStatus.SUCCESS, ConversionStatus.PARTIAL_SUCCESS):
+                with _span(emit, 'export', document=Path(file_paths[index]).name):
+                    markdown = result.document.export_to_markdown()
+                emit('document', index, True, markdown)
+                converted += 1
+            else:
+                errors = '; '.join(error.error_message for error in result.errors) or str(result.status)
+                emit('document', index, False, errors)
+            start = time.time()
+            started = time.perf_counter()
+    finally:
+        docling_settings.perf.doc_batch_size = original_batch_size
+    return converted
+
+
+def convert_sheet(file_path: str, emit: Callable[..., None], **kwargs) -> str:
+    """
+    將單一工作表轉換為 Markdown 表格
+
+    Args:
+        file_path: 試算表路徑
+        emit: 向主進程回報事件的函數
+        **kwargs: 傳遞給 sheet_to_markdown 的參數
+
+    Returns:
+        str: Markdown 內容
+    """
+    with _span(emit, 'convert', sheet=kwargs.get('sheet_name')):
+        markdown = sheet_to_markdown(Path(file_path), **kwargs)
+    return markdown
+
+
+def convert_direct(file_path: str, emit: Callable[..., None]) -> str:
+    """
+    以 python-docx、python-pptx 或 BeautifulSoup 直接將文件轉換為 Markdown
+
+    Args:
+        file_path: 文件路徑
+        emit: 向主進程回報事件的函數
+
+    Returns:
+        str: Markdown 內容
+    """
+    converter = get_direct_converter(Path(file_path))
+    if converter is None:
+        raise ValueError(f"不支援直接解析的格式: {Path(file_path).suffix}")
+    with _span(emit, 'convert', converter='direct'):
+        markdown = converter(Path(file_path))
+    return markdown
+
+
+# 工作進程可執行的任務
+TASKS: Dict[str, Callable[..., Any]] = {
+    'convert': convert_document,
+    'convert_batch': convert_documents,
+    'sheet': convert_sheet,
+    'direct': convert_direct,
+}
+
+
+def _run_profiled(task_name: str, kwargs: Dict[str, Any], emit: Callable[..., None]) -> Any:
+    """
+    以 cProfile 與 tracemalloc 分析並執行任務，以 ('profile', 名稱, 報告) 事件回報結果
+
+    Args:
+        task_name: 任務名稱
+        kwargs: 任務參數
+        emit: 向主進程回報事件的函數
+
+    Returns:
+        任務結果
+    """
+    label = task_name
+    if kwargs.get('page_range'):
+        start, end = kwargs['page_range']
+        label = f"{task_name} 第 {start + 1}-{end} 頁"
+    elif kwargs.get('sheet_name'):
+        label = f"{task_name} {kwargs['sheet_name']}"
+    elif kwargs.get('file_paths'):
+        label = f"{task_name} {len(kwargs['file_paths'])} 份文件"
+
+    report: Dict[str, Any] = {}
+    try:
+        with collect_profile(report):
+            return TASKS[task_name](emit=emit, **kwargs)
+    finally:
+        emit('profile', label, report)
+
+
+def worker_main(conn, num_threads: Optional[int] = None) -> None:
+    """
+    工作進程入口
+
+    Args:
+        conn: 與主進程通訊的管道端點
+        num_threads: 每個進程可使用的計算執行緒數
+    """
+    if num_threads:
+        # 避免多個進程同時搶佔所有核心
+        os.environ.setdefault('OMP_NUM_THREADS', str(num_threads))
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    logging.getLogger('docling').setLevel(logging.WARNING)
+
+    try:
+        get_converter()
+    except Exception as e:
+        conn.send(('error', f"初始化轉換器失敗: {e}"))
+        return
+    conn.send(('ready', os.getpid()))
+
+    def emit(*event) -> None:
+        conn.send(('event', event))
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if message is None:
+            break
+
+        task_name, kwargs = message
+        try:
+            if kwargs.pop('profile', False):
+                result = _run_profiled(task_name, kwargs, emit)
+            else:
+                result = TASKS[task_name](emit=emit, **kwargs)
+            conn.send(('done', result))
+        except Exception as e:
+            logger.error(f"工作進程處理任務 {task_name} 時出錯: {e}", exc_info=True)
+            conn.send(('error', str(e)))
@@ -0,0 +1,376 @@
+"""
+OCR 工作進程池模組
+
+此模組管理一組預熱的工作進程，將轉換任務排隊並分派給空閒的進程。
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from src.services.metrics import STAGE_SECONDS
+from src.services.ocr.scheduler import PRIORITY_INTERACTIVE, Job, JobScheduler
+from src.services.ocr.worker import worker_main
+from src.services.profiling import current_session
+from src.services.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+# 工作進程回報的區段中同時記入階段耗時指標的名稱
+_STAGE_SPANS = {'convert', 'export'}
+
+
+class WorkerError(RuntimeError):
+    """工作進程執行任務失敗"""
+
+
+class JobTimeoutError(WorkerError):
+    """任務執行超過時間上限"""
+
+
+class _Worker:
+    """單一工作進程及其通訊管道"""
+
+    def __init__(self, index: int, context, num_threads: int):
+        self.index = index
+        self.context = context
+        self.num_threads = num_threads
+        self.process = None
+        self.conn = None
+        self.ready = False
+        self.pid: Optional[int] = None
+        # 目前執行的任務名稱與開始時間
+        self.task: Optional[str] = None
+        self.task_started: Optional[float] = None
+
+    def spawn(self) -> None:
+        """啟動工作進程並等待轉換器載入完成（阻塞）"""
+        parent_conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(
+            target=worker_main,
+            args=(child_conn, self.num_threads),
+            name=f"ocr-worker-{self.index}",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+        status, payload = self.conn.recv()
+        if status != 'ready':
+            raise WorkerError(payload)
+        self.ready = True
+        self.pid = payload
+        logger.info(f"OCR 工作進程 {self.index} 已就緒 (pid={payload})")
+
+    def kill(self) -> None:
+        """立即終止工作進程，不等待目前的任務完成"""
+        self.ready = False
+        if self.process is not None and self.process.is_alive():
+            self.process.kill()
+
+    def stop(self) -> None:
+        """停止工作進程"""
+        self.ready = False
+        if self.conn is not None:
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.conn.close()
+            self.conn = None
+        if self.process is not None:
+            self.process.join(timeout=5)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process = None
+        self.pid = None
+
+    def run(self, task: str, kwargs: Dict[str, Any], on_event: Callable[[tuple], None]) -> Any:
+        """
+        在工作進程中執行任務（阻塞，應在執行緒中調用）
+
+        Args:
+            task: 任務名稱
+            kwargs: 任務參數
+            on_event: 收到進度事件時的回調函數
+
+        Returns:
+            任務結果
+        """
+        self.conn.send((task, kwargs))
+        while True:
+            status, payload = self.conn.recv()
+            if status == 'event':
+                on_event(payload)
+            elif status == 'done':
+                return payload
+            else:
+                raise WorkerError(payload)
+
+
+class WorkerPool:
+    """預熱的 OCR 工作進程池"""
+
+    def __init__(self, max_workers: int, max_queue_size: int, job_timeout: Optional[float] = None):
+        """
+        初始化工作進程池
+
+        Args:
+            max_workers: 工作進程數量
+            max_queue_size: 最多可排隊等待的任務數量
+            job_timeout: 單一工作進程任務的執行時間上限（秒），None 表示不限制
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_queue_size = max_queue_size
+        self.job_timeout = job_timeout
+        self._context = multiprocessing.get_context('spawn')
+        self._workers: List[_Worker] = []
+        self._scheduler: Optional[JobScheduler] = None
+        self._dispatchers: List[asyncio.Task] = []
+        self._io_executor: Optional[ThreadPoolExecutor] = None
+        self._failed_workers = 0
+        self._busy_workers = 0
+
+    @property
+    def ready_workers(self) -> int:
+        """已載入模型並可接受任務的工作進程數量"""
+        return sum(1 for worker in self._workers if worker.ready)
+
+    @property
+    def busy_workers(self) -> int:
+        """正在執行任務的工作進程數量"""
+        return self._busy_workers
+
+    def worker_states(self) -> List[Dict[str, Any]]:
+        """
+        取得各工作進程的狀態
+
+        Returns:
+            List[dict]: 各工作進程的 index、pid、ready、task 與任務已執行的秒數 busy_seconds
+        """
+        now = time.monotonic()
+        return [
+            {
+                'index': worker.index,
+                'pid': worker.pid,
+                'ready': worker.ready,
+                'task': worker.task,
+                'busy_seconds': now - worker.task_started if worker.task_started is not None else None,
+            }
+            for worker in self._workers
+        ]
+
+    @property
+    def queue_depth(self) -> int:
+        """排隊等待中的任務數量"""
+        return len(self._scheduler) if self._scheduler is not None else 0
+
+    @property
+    def started(self) -> bool:
+        """工作進程池是否已啟動"""
+        return self._scheduler is not None
+
+    def start(self) -> None:
+        """啟動工作進程池，各工作進程在背景載入模型"""
+        if self.started:
+            return
+
+        num_threads = max(1, (os.cpu_count() or 1) // self.max_workers)
+        self._scheduler = JobScheduler(self.max_queue_size)
+        self._io_executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix='ocr-pool-io'
+        )
+        for index in range(self.max_workers):
+            worker = _Worker(index, self._context, num_threads)
+            self._workers.append(worker)
+            self._dispatchers.append(asyncio.create_task(self._dispatch(worker)))
+        logger.info(f"OCR 工作進程池啟動中，共 {self.max_workers} 個工作進程")
+
+    async def shutdown(self) -> None:
+        """關閉工作進程池"""
+        if not self.started:
+            return
+        for dispatcher in self._dispatchers:
+            dispatcher.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        for worker in self._workers:
+            worker.stop()
+        self._io_executor.shutdown(wait=False)
+        self._workers.clear()
+        self._dispatchers.clear()
+        self._failed_workers = 0
+        self._scheduler = None
+
+    async def submit(
+        self,
+        task: str,
+        on_event: Optional[Callable[[tuple], None]] = None,
+        client_id: Optional[str] = None,
+        priority: int = PRIORITY_INTERACTIVE,
+        job_id: Optional[str] = None,
+        on_position: Optional[Callable[[int], None]] = None,
+        on_start: Optional[Callable[[], None]] = None,
+        **kwargs
+    ) -> Any:
+        """
+        提交任務並等待結果，沒有空閒工作進程時排隊等待
+
+        任務執行中被取消或超過時間上限時，會直接終止執行該任務的工作進程並重新啟動，
+        立即釋放其佔用的 CPU 與記憶體。整份文件的時間上限由 OCRService 控制，
+        此處的上限只是未受文件時間上限控制的任務（例如批次轉換的文件群組）的保護。
+
+        Args:
+            task: 任務名稱
+            on_event: 收到進度事件時的回調函數（在事件循環中調用）
+            client_id: 提交任務的客戶端，同一優先順序內各客戶端輪流執行
+            priority: 優先順序
+            job_id: 所屬的處理任務識別碼
+            on_position: 排隊位置變化時的回調函數，接收前方等待的任務數量
+            on_start: 工作進程開始執行任務時的回調函數（在事件循環中調用）
+            **kwargs: 任務參數
+
+        Returns:
+            任務結果
+
+        Raises:
+            QueueFullError: 佇列已滿
+            JobTimeoutError: 任務執行超過時間上限
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # 所屬的任務需要效能分析時，由工作進程分析並回報
+        profile_session = current_session()
+        if profile_session is not None:
+            kwargs['profile'] = True
+
+        def handle_event(event: tuple) -> None:
+            # 工作進程回報的區段直接記錄，不需回到事件循環
+            if event[0] == 'span':
+                name, start, duration, attrs = event[1:]
+                if name in _STAGE_SPANS:
+                    STAGE_SECONDS.observe(duration, name)
+                tracer.record(job.span, name, start, duration, **attrs)
+            elif event[0] == 'profile':
+                if profile_session is not None:
+                    profile_session.add(*event[1:])
+            elif on_event:
+                loop.call_soon_threadsafe(on_event, event)
+
+        job = Job(
+            task, kwargs, handle_event, future, client_id, priority, job_id, on_position,
+            span=tracer.current_span(), on_start=on_start
+        )
+        self._scheduler.put(job)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            self._scheduler.remove(job)
+            raise
+
+    async def _dispatch(self, worker: _Worker) -> None:
+        """從佇列取出任務並交由指定的工作進程執行"""
+        loop = asyncio.get_running_loop()
+        try:
+            await self._spawn(worker)
+        except Exception as e:
+            logger.error(f"OCR 工作進程 {worker.index} 啟動失敗: {e}", exc_info=True)
+            await self._fail_pending(e)
+            return
+
+        while True:
+            job = await self._scheduler.get()
+            waited = time.perf_counter() - job.submitted
+            STAGE_SECONDS.observe(waited, 'queue_wait')
+            tracer.record(job.span, 'queue_wait', time.time() - waited, waited)
+            # 之後工作進程回報的區段記在執行區段之下
+            run_span = job.span = tracer.start_span(f"worker.{job.task}", job.span, worker=worker.index)
+            future = job.future
+            run = loop.run_in_executor(self._io_executor, worker.run, job.task, job.kwargs, job.handle_event)
+            self._busy_workers += 1
+            worker.task, worker.task_started = job.task, time.monotonic()
+            if job.on_start:
+                job.on_start()
+            try:
+                done, _ = await asyncio.wait(
+                    {run, future},
+                    timeout=self.job_timeout,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+            finally:
+                self._busy_workers -= 1
+                worker.task = worker.task_started = None
+            if run in done:
+                tracer.end_span(run_span, 'error' if run.cancelled() or run.exception() else 'ok')
+            else:
+                tracer.end_span(run_span, 'cancelled' if future.done() else 'timeout')
+
+            if run not in done:
+                # 任務已取消或逾時，終止工作進程以立即釋放資源
+                if future.done():
+                    logger.info(f"OCR 任務已取消，終止工作進程 {worker.index}")
+                else:
+                    logger.warning(f"OCR 任務超過 {self.job_timeout} 秒，終止工作進程 {worker.index}")
+                    future.set_exception(JobTimeoutError(f"處理時間超過 {self.job_timeout:g} 秒上限"))
+                worker.kill()
+                await asyncio.gather(run, return_exceptions=True)
+                if not await self._respawn(worker):
+                    return
+                continue
+
+            try:
+                result = run.result()
+            except (EOFError, OSError) as e:
+                # 工作進程異常終止，重新啟動以維持池的容量
+                logger.error(f"OCR 工作進程 {worker.index} 異常終止: {e}")
+                if not future.done():
+                    future.set_exception(WorkerError("工作進程異常終止"))
+                if not await self._respawn(worker):
+                    return
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+    async def _respawn(self, worker: _Worker) -> bool:
+        """
+        重新啟動工作進程
+
+        Returns:
+            bool: 是否成功重新啟動
+        """
+        worker.stop()
+        try:
+            await self._spawn(worker)
+        except Exception as e:
+            logger.error(f"OCR 工作進程 {worker.index} 重新啟動失敗: {e}")
+            await self._fail_pending(e)
+            return False
+        return True
+
+    async def _fail_pending(self, error: Exception) -> None:
+        """
+        工作進程無法啟動時的處理
+
+        仍有其他工作進程可用時直接退出，讓任務交由其他進程處理；
+        所有工作進程都無法啟動時，持續以錯誤回應排隊中的任務，避免請求無限等待。
+        """
+        self._failed_workers += 1
+        if self._failed_workers < len(self._workers):
+            return
+        while True:
+            job = await self._scheduler.get()
+            job.future.set_exception(WorkerError(f"工作進程無法啟動: {error}"))
+
+    async def _spawn(self, worker: _Worker) -> None:
+        """在執行緒中啟動工作進程，避免阻塞事件循環"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._io_executor, worker.spawn)
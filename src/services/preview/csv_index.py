@@ -0,0 +1,108 @@
+"""
+CSV 索引模組
+
+此模組以記憶體映射掃描換行符號快速計算 CSV 行數，並每隔固定行數記錄位元組位移，
+讀取任意頁面時直接跳至最近的位移，記憶體用量與延遲不隨文件大小增長。
+
+注意：索引以換行符號分行，引號內含換行的欄位會被視為多行。
+"""
+import csv
+import io
+import mmap
+from pathlib import Path
+from typing import List
+
+from src.config import settings
+
+# 每次掃描的位元組數
+_SCAN_CHUNK_SIZE = 16 * 1024 * 1024
+
+
+class CSVIndex:
+    """CSV 行位移索引"""
+
+    def __init__(self, file_path: Path, stride: int = settings.CSV_INDEX_STRIDE, encoding: str = 'utf-8'):
+        """
+        建立 CSV 索引
+
+        Args:
+            file_path: CSV 文件路徑
+            stride: 每隔幾行記錄一次位元組位移
+            encoding: 文件編碼
+        """
+        self.file_path = Path(file_path)
+        self.stride = max(1, stride)
+        self.encoding = encoding
+        self.line_count = 0
+        self._offsets: List[int] = []
+        self._build()
+
+    def _build(self) -> None:
+        """掃描文件，計算行數並記錄檢查點位移"""
+        import numpy as np
+
+        size = self.file_path.stat().st_size
+        self._offsets = [0]
+        if size == 0:
+            return
+
+        newlines = 0
+        with open(self.file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data = np.frombuffer(mm, dtype=np.uint8)
+            try:
+                for start in range(0, size, _SCAN_CHUNK_SIZE):
+                    positions = np.flatnonzero(data[start:start + _SCAN_CHUNK_SIZE] == 0x0A)
+                    if not len(positions):
+                        continue
+                    # 第 k 個換行符號之後是第 k+1 行的開頭；挑出行號為 stride 倍數者
+                    line_numbers = np.arange(newlines + 1, newlines + 1 + len(positions))
+                    checkpoints = positions[line_numbers % self.stride == 0] + start + 1
+                    self._offsets.extend(int(offset) for offset in checkpoints if offset < size)
+                    newlines += len(positions)
+                last_byte = data[size - 1]
+            finally:
+                del data
+
+        self.line_count = newlines + (0 if last_byte == 0x0A else 1)
+
+    @property
+    def row_count(self) -> int:
+        """資料列數（不含標題列）"""
+        return max(0, self.line_count - 1)
+
+    def header(self) -> List[str]:
+        """取得標題列"""
+        rows = self._read_lines(0, 1)
+        if rows and rows[0]:
+            rows[0][0] = rows[0][0].lstrip('﻿')
+        return rows[0] if rows else []
+
+    def read_rows(self, start: int, count: int) -> List[List[str]]:
+        """
+        讀取資料列區段
+
+        Args:
+            start: 起始資料列（從 0 起算，不含標題列）
+            count: 讀取列數
+
+        Returns:
+            List[List[str]]: 資料列
+        """
+        return self._read_lines(start + 1, count)
+
+    def _read_lines(self, start: int, count: int) -> List[List[str]]:
+        """從最近的檢查點跳至指定行並解析"""
+        if count <= 0 or start >= self.line_count:
+            return []
+        checkpoint = min(start // self.stride, len(self._offsets) - 1)
+        lines = []
+        with open(self.file_path, 'rb') as f:
+            f.seek(self._offsets[checkpoint])
+            for _ in range(start - checkpoint * self.stride):
+                f.readline()
+            for _ in range(count):
+                line = f.readline()
+                if not line:
+                    break
+                lines.append(line.decode(self.encoding, errors='replace'))
+        return list(csv.reader(io.StringIO(''.join(lines))))
@@ -0,0 +1,244 @@
+"""
+PDF 頁面渲染快取模組
+
+此模組在背景執行緒中渲染 PDF 頁面為 PNG，以 (文件雜湊, 頁碼, 縮放) 為鍵保存在
+有容量上限的記憶體快取中，並預先渲染相鄰頁面讓翻頁即時完成。
+登記的文件記錄其大小與修改時間，文件被替換或刪除後不再以原雜湊渲染，
+避免以長期快取的網址提供其他內容。
+"""
+import asyncio
+import itertools
+import logging
+import os
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 請求優先順序：使用者正在查看的頁面優先於預先渲染
+_PRIORITY_DEMAND = 0
+_PRIORITY_PREFETCH = 1
+
+# 渲染執行緒中同時保持開啟的文件數量
+_MAX_OPEN_DOCUMENTS = 4
+# 最多保留的已登記文件數量，超過時移除最久未使用的文件
+_MAX_DOCUMENTS = 256
+
+PageKey = Tuple[str, int, float]
+
+
+class _Document(NamedTuple):
+    """已登記的文件"""
+    path: Path
+    page_count: int
+    # 登記時的 (大小, 修改時間)，用於確認文件未被替換
+    signature: Tuple[int, int]
+
+
+def _signature(file_path: Path) -> Tuple[int, int]:
+    """取得文件的 (大小, 修改時間)"""
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+class PDFRenderCache:
+    """PDF 頁面渲染快取"""
+
+    def __init__(
+        self,
+        max_bytes: int = settings.PDF_RENDER_CACHE_MAX_BYTES,
+        prefetch_pages: int = settings.PDF_PREFETCH_PAGES
+    ):
+        """
+        初始化渲染快取
+
+        Args:
+            max_bytes: 快取 PNG 的總大小上限（位元組）
+            prefetch_pages: 預先渲染目前頁面前後各幾頁
+        """
+        self.max_bytes = max_bytes
+        self.prefetch_pages = prefetch_pages
+        self._pages: "OrderedDict[PageKey, bytes]" = OrderedDict()
+        self._total_bytes = 0
+        self._documents: "OrderedDict[str, _Document]" = OrderedDict()
+        self._pending: Dict[PageKey, Future] = {}
+        self._lock = threading.Lock()
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._counter = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+        # 僅由渲染執行緒存取（PyMuPDF 不支援多執行緒同時使用）
+        self._open_documents: "OrderedDict[str, object]" = OrderedDict()
+
+    def register(self, doc_hash: str, file_path: Path) -> int:
+        """
+        登記可供渲染的 PDF 文件（阻塞，應在執行緒中調用）
+
+        同一路徑先前登記的其他文件視為已被替換，一併移除。
+
+        Args:
+            doc_hash: 文件內容雜湊
+            file_path: 文件路徑
+
+        Returns:
+            int: 文件頁數
+        """
+        import fitz  # PyMuPDF
+
+        file_path = Path(file_path)
+        signature = _signature(file_path)
+        with self._lock:
+            entry = self._documents.get(doc_hash)
+            if entry is not None and entry.path == file_path and entry.signature == signature:
+                self._documents.move_to_end(doc_hash)
+                return entry.page_count
+        with fitz.open(file_path) as doc:
+            page_count = doc.page_count
+        with self._lock:
+            for other_hash, other in list(self._documents.items()):
+                if other.path == file_path and other_hash != doc_hash:
+                    self._forget(other_hash)
+            self._documents[doc_hash] = _Document(file_path, page_count, signature)
+            self._documents.move_to_end(doc_hash)
+            while len(self._documents) > _MAX_DOCUMENTS:
+                self._forget(next(iter(self._documents)))
+        return page_count
+
+    def page_count(self, doc_hash: str) -> Optional[int]:
+        """取得已登記文件的頁數，未登記時返回 None"""
+        with self._lock:
+            entry = self._documents.get(doc_hash)
+        return entry.page_count if entry else None
+
+    def _forget(self, doc_hash: str) -> None:
+        """移除已登記的文件及其快取頁面（需持有鎖）；渲染執行緒中開啟的文件在下次使用時關閉"""
+        self._documents.pop(doc_hash, None)
+        for key in [key for key in self._pages if key[0] == doc_hash]:
+            self._total_bytes -= len(self._pages.pop(key))
+
+    async def render(self, doc_hash: str, page_num: int, zoom: float = 1.0) -> bytes:
+        """
+        取得頁面 PNG，並在背景預先渲染相鄰頁面
+
+        Args:
+            doc_hash: 文件內容雜湊
+            page_num: 頁碼（從 0 起算）
+            zoom: 縮放比例
+
+        Returns:
+            bytes: PNG 內容
+
+        Raises:
+            KeyError: 文件未登記或頁碼超出範圍
+        """
+        page_count = self.page_count(doc_hash)
+        if page_count is None or not 0 <= page_num < page_count:
+            raise KeyError((doc_hash, page_num))
+
+        key = (doc_hash, page_num, zoom)
+        future = self._request(key, _PRIORITY_DEMAND)
+        for offset in range(1, self.prefetch_pages + 1):
+            for neighbour in (page_num + offset, page_num - offset):
+                if 0 <= neighbour < page_count:
+                    self._request((doc_hash, neighbour, zoom), _PRIORITY_PREFETCH)
+        return await asyncio.wrap_future(future)
+
+    def _request(self, key: PageKey, priority: int) -> Future:
+        """取得快取內容或排入渲染佇列"""
+        with self._lock:
+            data = self._pages.get(key)
+            if data is not None:
+                self._pages.move_to_end(key)
+                future = Future()
+                future.set_result(data)
+                return future
+            future = self._pending.get(key)
+            if future is None:
+                future = Future()
+                self._pending[key] = future
+                self._queue.put((priority, next(self._counter), key))
+            elif priority == _PRIORITY_DEMAND:
+                # 已排入預先渲染的頁面被實際請求時提升優先順序
+                self._queue.put((priority, next(self._counter), key))
+            self._ensure_thread()
+        return future
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='pdf-render', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        """渲染執行緒主循環"""
+        while True:
+            _, _, key = self._queue.get()
+            with self._lock:
+                future = self._pending.get(key)
+            if future is None:
+                # 已由較高優先順序的請求處理過
+                continue
+            try:
+                data = self._render_page(*key)
+            except Exception as e:
+                if not isinstance(e, KeyError):
+                    logger.error(f"渲染 PDF 頁面失敗 {key}: {e}")
+                with self._lock:
+                    self._pending.pop(key, None)
+                future.set_exception(e)
+                continue
+            with self._lock:
+                self._pending.pop(key, None)
+                self._store(key, data)
+            future.set_result(data)
+
+    def _render_page(self, doc_hash: str, page_num: int, zoom: float) -> bytes:
+        """在渲染執行緒中渲染單一頁面"""
+        import fitz  # PyMuPDF
+
+        with self._lock:
+            entry = self._documents.get(doc_hash)
+        doc = self._open_documents.get(doc_hash)
+        if entry is None:
+            # 文件已被替換或移除
+            if doc is not None:
+                self._open_documents.pop(doc_hash).close()
+            raise KeyError(doc_hash)
+        if doc is None:
+            # 重新開啟前確認文件仍是登記時的內容
+            try:
+                unchanged = _signature(entry.path) == entry.signature
+            except OSError:
+                unchanged = False
+            if not unchanged:
+                with self._lock:
+                    if self._documents.get(doc_hash) is entry:
+                        self._forget(doc_hash)
+                raise KeyError(doc_hash)
+            doc = fitz.open(entry.path)
+            self._open_documents[doc_hash] = doc
+            while len(self._open_documents) > _MAX_OPEN_DOCUMENTS:
+                _, old_doc = self._open_documents.popitem(last=False)
+                old_doc.close()
+        else:
+            self._open_documents.move_to_end(doc_hash)
+
+        page = doc.load_page(page_num)
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        return pix.tobytes('png')
+
+    def _store(self, key: PageKey, data: bytes) -> None:
+        """保存渲染結果並淘汰最久未使用的頁面（需持有鎖）"""
+        self._pages[key] = data
+        self._total_bytes += len(data)
+        while self._total_bytes > self.max_bytes and len(self._pages) > 1:
+            _, old_data = self._pages.popitem(last=False)
+            self._total_bytes -= len(old_data)
+
+
+# 創建全局渲染快取實例
+pdf_render_cache = PDFRenderCache()
@@ -0,0 +1,138 @@
+"""
+工作表讀取模組
+
+此模組以唯讀串流模式讀取 Excel 工作表，只取出目前頁面所需的資料列，
+總行數由工作表的尺寸資訊取得而不需解析整張工作表。
+"""
+import threading
+from pathlib import Path
+from typing import Any, List
+
+
+def _cell_text(value: Any) -> str:
+    """將儲存格內容轉為顯示用字串"""
+    return '' if value is None else str(value)
+
+
+class SheetReader:
+    """唯讀串流工作表讀取器"""
+
+    def __init__(self, file_path: Path):
+        """
+        初始化工作表讀取器
+
+        Args:
+            file_path: Excel 文件路徑
+        """
+        self.file_path = Path(file_path)
+        self._workbook = None
+        self._row_counts = {}
+        self._lock = threading.Lock()
+        # .xls 無法以 openpyxl 串流讀取，改用 pandas 依頁讀取
+        self._legacy = self.file_path.suffix.lower() == '.xls'
+
+    def _open(self):
+        if self._workbook is None:
+            from openpyxl import load_workbook
+
+            self._workbook = load_workbook(self.file_path, read_only=True, data_only=True)
+        return self._workbook
+
+    @property
+    def sheet_names(self) -> List[str]:
+        """工作表名稱列表"""
+        with self._lock:
+            if self._legacy:
+                import pandas as pd
+
+                with pd.ExcelFile(self.file_path) as xl:
+                    return list(xl.sheet_names)
+            return list(self._open().sheetnames)
+
+    def header(self, sheet_name: str) -> List[str]:
+        """
+        取得工作表的標題列
+
+        Args:
+            sheet_name: 工作表名稱
+
+        Returns:
+            List[str]: 標題列內容
+        """
+        rows = self._read(sheet_name, 0, 1)
+        return rows[0] if rows else []
+
+    def row_count(self, sheet_name: str) -> int:
+        """
+        取得工作表的資料列數（不含標題列）
+
+        優先使用工作表記錄的尺寸資訊，缺少時才以串流方式逐列計數。
+
+        Args:
+            sheet_name: 工作表名稱
+
+        Returns:
+            int: 資料列數
+        """
+        with self._lock:
+            if sheet_name in self._row_counts:
+                return self._row_counts[sheet_name]
+
+            if self._legacy:
+                import pandas as pd
+
+                total = len(pd.read_excel(self.file_path, sheet_name=sheet_name, usecols=[0], header=None))
+            else:
+                sheet = self._open()[sheet_name]
+                total = sheet.max_row
+                if total is None:
+                    # 缺少 <dimension> 記錄，只能逐列計數（不保留資料）
+                    total = sum(1 for _ in sheet.iter_rows(values_only=True))
+            count = max(0, total - 1)
+            self._row_counts[sheet_name] = count
+            return count
+
+    def read_rows(self, sheet_name: str, start: int, count: int) -> List[List[str]]:
+        """
+        讀取資料列區段
+
+        Args:
+            sheet_name: 工作表名稱
+            start: 起始資料列（從 0 起算，不含標題列）
+            count: 讀取列數
+
+        Returns:
+            List[List[str]]: 資料列
+        """
+        return self._read(sheet_name, start + 1, count)
+
+    def _read(self, sheet_name: str, start: int, count: int) -> List[List[str]]:
+        """讀取工作表中的實體列（從 0 起算，包含標題列）"""
+        if count <= 0:
+            return []
+        with self._lock:
+            if self._legacy:
+                import pandas as pd
+
+                df = pd.read_excel(
+                    self.file_path,
+                    sheet_name=sheet_name,
+                    header=None,
+                    skiprows=start,
+                    nrows=count,
+                )
+                df = df.astype(object).where(df.notna(), None)
+                return [[_cell_text(v) for v in row] for row in df.itertuples(index=False)]
+
+            sheet = self._open()[sheet_name]
+            return [
+                [_cell_text(v) for v in row]
+                for row in sheet.iter_rows(min_row=start + 1, max_row=start + count, values_only=True)
+            ]
+
+    def close(self) -> None:
+        """關閉工作簿"""
+        with self._lock:
+            if self._workbook is not None:
+                self._workbook.close()
+                self._workbook = None
@@ -0,0 +1,306 @@
+"""
+效能分析模組
+
+此模組以 cProfile 與一組 tracemalloc 快照分析單一轉換任務。所有格式的轉換都在工作進程中執行，
+分析也在工作進程內進行；每個工作進程一次只執行一個任務，兩次快照之間的記憶體配置即屬於該任務。
+同一進程中有多個分析重疊時，記憶體數據標記為整個進程的數據（memory_scope 為 process）。
+各工作進程任務的報告以事件回報主進程，整個任務結束後合併保存於 PROFILE_DIR/<任務識別碼>/：
+report.json 與 report.txt 列出耗時最多的函數與記憶體配置最多的位置，
+*.prof 為可由 pstats 或 snakeviz 開啟的原始資料。
+"""
+import cProfile
+import itertools
+import json
+import logging
+import marshal
+import pstats
+import random
+import shutil
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+_current_session: ContextVar[Optional['ProfileSession']] = ContextVar('profile_session', default=None)
+
+# 同一進程中可能有多個執行緒同時分析，tracemalloc 在最後一個分析結束時才停止
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_owned = False
+# 進行中的分析 -> 期間是否與其他分析重疊
+_active_profiles: Dict[int, bool] = {}
+_profile_ids = itertools.count()
+
+# 不列入記憶體配置報告的位置
+_ALLOCATION_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def should_profile(requested: Optional[bool] = None, sample_rate: float = settings.PROFILE_SAMPLE_RATE) -> bool:
+    """
+    決定是否分析本次任務
+
+    Args:
+        requested: 請求明確指定是否分析，None 表示依抽樣比例決定
+        sample_rate: 抽樣比例，0 到 1
+
+    Returns:
+        bool: 是否分析
+    """
+    if requested is not None:
+        return requested
+    return sample_rate > 0 and random.random() < sample_rate
+
+
+def _start_tracemalloc() -> int:
+    """
+    開始追蹤記憶體配置，沒有其他分析進行中時重設記憶體峰值
+
+    Returns:
+        int: 分析識別碼，結束時傳給 _stop_tracemalloc
+    """
+    global _tracemalloc_owned
+    with _tracemalloc_lock:
+        if not _active_profiles and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_owned = True
+        profile_id = next(_profile_ids)
+        overlapping = bool(_active_profiles)
+        for other in _active_profiles:
+            _active_profiles[other] = True
+        _active_profiles[profile_id] = overlapping
+        if not overlapping:
+            # 峰值為整個進程共用，其他分析進行中時重設會影響其結果
+            tracemalloc.reset_peak()
+        return profile_id
+
+
+def _stop_tracemalloc(profile_id: int) -> bool:
+    """
+    結束分析，最後一個分析結束時停止追蹤記憶體配置（由其他設定啟動的追蹤不停止）
+
+    Returns:
+        bool: 分析期間是否與其他分析重疊
+    """
+    global _tracemalloc_owned
+    with _tracemalloc_lock:
+        overlapping = _active_profiles.pop(profile_id)
+        if not _active_profiles and _tracemalloc_owned:
+            tracemalloc.stop()
+            _tracemalloc_owned = False
+        return overlapping
+
+
+def _top_functions(stats: Dict[tuple, tuple], top_n: int) -> Dict[str, List[Dict[str, Any]]]:
+    """依累計耗時與自身耗時列出前幾名的函數"""
+    rows = [
+        {
+            'function': pstats.func_std_string(func),
+            'calls': calls,
+            'primitive_calls': primitive_calls,
+            'self_seconds': round(self_time, 6),
+            'cumulative_seconds': round(cumulative_time, 6),
+        }
+        for func, (primitive_calls, calls, self_time, cumulative_time, _) in stats.items()
+    ]
+    return {
+        'cumulative': sorted(rows, key=lambda row: row['cumulative_seconds'], reverse=True)[:top_n],
+        'self': sorted(rows, key=lambda row: row['self_seconds'], reverse=True)[:top_n],
+    }
+
+
+def _top_allocations(
+    before: tracemalloc.Snapshot,
+    after: tracemalloc.Snapshot,
+    top_n: int
+) -> List[Dict[str, Any]]:
+    """列出兩次快照之間記憶體配置增加最多的位置"""
+    differences = after.filter_traces(_ALLOCATION_FILTERS).compare_to(
+        before.filter_traces(_ALLOCATION_FILTERS), 'lineno'
+    )
+    return [
+        {
+            'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            'size_diff': stat.size_diff,
+            'size': stat.size,
+            'count_diff': stat.count_diff,
+        }
+        for stat in differences[:top_n]
+    ]
+
+
+@contextmanager
+def collect_profile(report: Dict[str, Any], top_n: int = settings.PROFILE_TOP_N) -> Iterator[None]:
+    """
+    分析 with 區塊（只含目前執行緒）的 CPU 時間與記憶體配置
+
+    區塊結束時（包含發生例外）將結果寫入 report：wall_seconds、peak_traced_bytes、
+    functions、allocations、memory_scope，以及 marshal 序列化的 cProfile 原始資料 stats。
+    tracemalloc 追蹤整個進程，與其他分析重疊時 memory_scope 為 process，
+    記憶體峰值與配置差異包含其他執行緒的配置；否則為 task。
+
+    Args:
+        report: 接收結果的字典
+        top_n: 列出的函數與記憶體配置位置數量
+    """
+    profile_id = _start_tracemalloc()
+    before = tracemalloc.take_snapshot()
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        wall_seconds = time.perf_counter() - started
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        overlapping = _stop_tracemalloc(profile_id)
+        profiler.create_stats()
+        report.update(
+            wall_seconds=round(wall_seconds, 4),
+            peak_traced_bytes=peak,
+            memory_scope='process' if overlapping else 'task',
+            functions=_top_functions(profiler.stats, top_n),
+            allocations=_top_allocations(before, after, top_n),
+            stats=marshal.dumps(profiler.stats),
+        )
+
+
+def _format_bytes(size: int) -> str:
+    """格式化位元組數"""
+    return f"{size / 1_000_000:+.2f} MB" if abs(size) >= 1_000_000 else f"{size / 1000:+.1f} KB"
+
+
+def _format_text(summary: Dict[str, Any]) -> str:
+    """產生易讀的文字報告"""
+    lines = [f"任務 {summary['job_id']} 效能分析報告"]
+    lines.extend(f"{key}: {value}" for key, value in summary.items() if key not in ('job_id', 'reports'))
+    for index, report in enumerate(summary['reports']):
+        lines.append('')
+        lines.append(
+            f"== [{index:02d}] {report['label']}：{report['wall_seconds']:.2f} 秒，"
+            f"追蹤的記憶體峰值 {report['peak_traced_bytes'] / 1_000_000:.1f} MB"
+        )
+        if report.get('memory_scope') == 'process':
+            lines.append("（與其他分析重疊，記憶體數據為整個進程的數據）")
+        for order, title in (('cumulative', '累計耗時'), ('self', '自身耗時')):
+            lines.append(f"-- {title}最多的函數")
+            lines.append(f"{'cumulative':>12} {'self':>12} {'calls':>10}  function")
+            for row in report['functions'][order]:
+                lines.append(
+                    f"{row['cumulative_seconds']:12.4f} {row['self_seconds']:12.4f} {row['calls']:10d}  {row['function']}"
+                )
+        lines.append("-- 記憶體配置增加最多的位置")
+        lines.append(f"{'size_diff':>12} {'count_diff':>10}  location")
+        for row in report['allocations']:
+            lines.append(f"{_format_bytes(row['size_diff']):>12} {row['count_diff']:+10d}  {row['location']}")
+    return '\n'.join(lines) + '\n'
+
+
+class ProfileSession:
+    """單一轉換任務的效能分析，收集各工作進程任務的報告"""
+
+    def __init__(self, job_id: str, profile_dir: Path = settings.PROFILE_DIR):
+        """
+        初始化分析
+
+        Args:
+            job_id: 任務識別碼，作為報告目錄名稱
+            profile_dir: 報告根目錄
+        """
+        self.job_id = job_id
+        self.directory = Path(profile_dir) / job_id
+        self.created_at = time.time()
+        self.reports: List[Dict[str, Any]] = []
+
+    def add(self, label: str, report: Dict[str, Any]) -> None:
+        """
+        加入一份報告（可在任何執行緒中調用）
+
+        Args:
+            label: 報告名稱，例如工作進程任務與頁面範圍
+            report: collect_profile 產生的結果
+        """
+        self.reports.append(dict(report, label=label))
+
+    def save(self, **metadata: Any) -> Optional[Path]:
+        """
+        保存報告（阻塞，應在執行緒中調用）
+
+        Args:
+            **metadata: 附加於報告的任務資訊
+
+        Returns:
+            Optional[Path]: report.json 的路徑，沒有任何報告時返回 None
+        """
+        if not self.reports:
+            return None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        summary = {'job_id': self.job_id, 'created_at': self.created_at, **metadata, 'reports': []}
+        for index, report in enumerate(self.reports):
+            report = dict(report)
+            stats = report.pop('stats', None)
+            if stats:
+                report['stats_file'] = f"{index:02d}.prof"
+                (self.directory / report['stats_file']).write_bytes(stats)
+            summary['reports'].append(report)
+        (self.directory / 'report.txt').write_text(_format_text(summary), encoding='utf-8')
+        path = self.directory / 'report.json'
+        path.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding='utf-8')
+        cleanup_profiles()
+        return path
+
+
+@contextmanager
+def profile_job(job_id: str, requested: Optional[bool] = None) -> Iterator[Optional[ProfileSession]]:
+    """
+    依請求或抽樣決定是否分析任務，分析時在 with 區塊內設為目前的分析
+
+    Args:
+        job_id: 任務識別碼
+        requested: 請求明確指定是否分析，None 表示依抽樣比例決定
+
+    Yields:
+        Optional[ProfileSession]: 分析，不分析時為 None
+    """
+    if not should_profile(requested):
+        yield None
+        return
+    session = ProfileSession(job_id)
+    token = _current_session.set(session)
+    try:
+        yield session
+    finally:
+        _current_session.reset(token)
+
+
+def current_session() -> Optional[ProfileSession]:
+    """取得目前的分析"""
+    return _current_session.get()
+
+
+def report_path(job_id: str, profile_dir: Path = settings.PROFILE_DIR) -> Path:
+    """取得任務的 report.json 路徑"""
+    return Path(profile_dir) / job_id / 'report.json'
+
+
+def cleanup_profiles(profile_dir: Path = settings.PROFILE_DIR, max_age: int = settings.PROFILE_MAX_AGE) -> None:
+    """移除超過保存時間的報告"""
+    deadline = time.time() - max_age
+    for directory in Path(profile_dir).iterdir():
+        try:
+            if directory.is_dir() and directory.stat().st_mtime < deadline:
+                shutil.rmtree(directory, ignore_errors=True)
+        except OSError as e:
+            logger.warning(f"清除效能分析報告失敗: {directory}: {e}")
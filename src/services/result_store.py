@@ -0,0 +1,167 @@
+"""
+結果存放模組
+
+此模組將處理結果保存在伺服器端，供下載路由以串流方式提供。
+超過保存時間的結果不再提供下載，並在保存新結果時定期刪除。
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+_RESULT_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+# 保存新結果時刪除過期結果的最短間隔（秒）
+_CLEANUP_INTERVAL = 600
+
+
+class ResultStore:
+    """伺服器端處理結果存放區"""
+
+    def __init__(self, store_dir: Path = settings.RESULT_DIR, max_age: int = settings.RESULT_STORE_MAX_AGE):
+        """
+        初始化結果存放區
+
+        Args:
+            store_dir: 存放目錄
+            max_age: 結果保存時間（秒）
+        """
+        self.store_dir = Path(store_dir)
+        self.max_age = max_age
+        self.store_dir.mkdir(exist_ok=True, parents=True)
+        self._cleanup_lock = threading.Lock()
+        self._next_cleanup = 0.0
+
+    def _expired(self, meta: Dict[str, Any]) -> bool:
+        """結果是否已超過保存時間"""
+        return meta.get('created', 0) + self.max_age < time.time()
+
+    def _maybe_cleanup(self) -> None:
+        """距離上次清理超過 _CLEANUP_INTERVAL 時刪除過期結果，其他執行緒正在清理時直接返回"""
+        if time.time() < self._next_cleanup or not self._cleanup_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_cleanup = time.time() + _CLEANUP_INTERVAL
+            self.cleanup()
+        finally:
+            self._cleanup_lock.release()
+
+    def put(self, content: str, filename: str, media_type: str = 'text/markdown') -> str:
+        """
+        保存處理結果
+
+        Args:
+            content: 結果內容
+            filename: 下載時使用的文件名
+            media_type: 內容的 MIME 類型
+
+        Returns:
+            str: 結果識別碼
+        """
+        result_id = uuid.uuid4().hex
+        content_path = self.store_dir / f"{result_id}.dat"
+        tmp_path = content_path.with_suffix('.tmp')
+        tmp_path.write_text(content, encoding='utf-8')
+        os.replace(tmp_path, content_path)
+
+        meta = {
+            'filename': filename,
+            'media_type': media_type,
+            'created': time.time(),
+        }
+        (self.store_dir / f"{result_id}.json").write_text(
+            json.dumps(meta, ensure_ascii=False), encoding='utf-8'
+        )
+        self._maybe_cleanup()
+        return result_id
+
+    def put_bundle(self, result_ids: List[str], filename: str) -> str:
+        """
+        保存由多個結果組成的下載包，下載時才組成 ZIP
+
+        Args:
+            result_ids: 結果識別碼列表
+            filename: 下載時使用的文件名
+
+        Returns:
+            str: 下載包識別碼
+        """
+        bundle_id = uuid.uuid4().hex
+        meta = {
+            'filename': filename,
+            'media_type': 'application/zip',
+            'members': list(result_ids),
+            'created': time.time(),
+        }
+        (self.store_dir / f"{bundle_id}.bundle.json").write_text(
+            json.dumps(meta, ensure_ascii=False), encoding='utf-8'
+        )
+        self._maybe_cleanup()
+        return bundle_id
+
+    def get_bundle(self, bundle_id: str) -> Optional[Dict[str, Any]]:
+        """
+        取得下載包的資訊與仍然存在的成員結果
+
+        Args:
+            bundle_id: 下載包識別碼
+
+        Returns:
+            Optional[dict]: 包含 filename、media_type、members（各成員結果資訊）的字典，
+                不存在或已過期時返回 None
+        """
+        if not _RESULT_ID_PATTERN.match(bundle_id):
+            return None
+        try:
+            meta = json.loads((self.store_dir / f"{bundle_id}.bundle.json").read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        if self._expired(meta):
+            return None
+        meta['members'] = [entry for entry in map(self.get, meta['members']) if entry is not None]
+        return meta
+
+    def get(self, result_id: str) -> Optional[Dict[str, Any]]:
+        """
+        取得處理結果的文件路徑與資訊
+
+        Args:
+            result_id: 結果識別碼
+
+        Returns:
+            Optional[dict]: 包含 path、filename、media_type 的字典，不存在或已過期時返回 None
+        """
+        if not _RESULT_ID_PATTERN.match(result_id):
+            return None
+        content_path = self.store_dir / f"{result_id}.dat"
+        meta_path = self.store_dir / f"{result_id}.json"
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        if self._expired(meta) or not content_path.exists():
+            return None
+        meta['path'] = content_path
+        return meta
+
+    def cleanup(self) -> None:
+        """刪除超過保存時間的結果"""
+        deadline = time.time() - self.max_age
+        for file in self.store_dir.glob('*'):
+            try:
+                if file.is_file() and file.stat().st_mtime < deadline:
+                    file.unlink()
+            except OSError as e:
+                logger.warning(f"無法刪除過期結果 {file}: {e}")
+
+
+# 創建全局結果存放實例
+result_store = ResultStore()
@@ -0,0 +1,262 @@
+"""
+任務追蹤模組
+
+此模組為每個轉換任務記錄一組巢狀的計時區段（span），同一任務的區段共用一個追蹤識別碼。
+目前的區段保存在 contextvars 中，由同一任務建立的 asyncio 任務自動繼承；
+工作進程內量測的區段（頁面拆分、docling 各階段、Markdown 輸出）以事件回報後
+由主進程補記。結束的區段經由佇列交給背景執行緒寫入輪替的 JSON Lines 檔案，
+不在事件循環中進行磁碟寫入。
+"""
+import asyncio
+import json
+import logging
+import queue
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+_current_span: ContextVar[Optional['Span']] = ContextVar('current_span', default=None)
+
+
+class Span:
+    """單一計時區段"""
+
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'name', 'start', 'duration', 'status', 'attrs', '_started')
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str] = None,
+        start: Optional[float] = None,
+        attrs: Optional[Dict[str, Any]] = None
+    ):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.start = time.time() if start is None else start
+        self.duration: Optional[float] = None
+        self.status = 'ok'
+        self.attrs = attrs or {}
+        self._started = time.perf_counter()
+
+    def set(self, **attrs: Any) -> None:
+        """設定區段的屬性"""
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """轉為寫入檔案的字典"""
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start': round(self.start, 6),
+            'duration': round(self.duration or 0.0, 6),
+            'status': self.status,
+            'attrs': self.attrs,
+        }
+
+
+def new_trace_id() -> str:
+    """產生新的追蹤識別碼"""
+    return secrets.token_hex(16)
+
+
+class Tracer:
+    """建立區段並寫入 JSON Lines 檔案"""
+
+    def __init__(
+        self,
+        trace_dir: Path = settings.TRACE_DIR,
+        max_bytes: int = settings.TRACE_MAX_BYTES,
+        backup_count: int = settings.TRACE_BACKUP_COUNT,
+        enabled: bool = settings.TRACE_ENABLED
+    ):
+        """
+        初始化追蹤器
+
+        Args:
+            trace_dir: 區段檔案所在目錄
+            max_bytes: 單一檔案的大小上限，超過即輪替
+            backup_count: 保留的舊檔案數量
+            enabled: 是否寫入區段；停用時區段照常建立但不寫入
+        """
+        self.path = Path(trace_dir) / 'spans.jsonl'
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.enabled = enabled
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._handler = QueueHandler(self._queue)
+        self._listener: Optional[QueueListener] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        """取得目前的區段"""
+        return _current_span.get()
+
+    @contextmanager
+    def span(self, name: str, trace_id: Optional[str] = None, **attrs: Any) -> Iterator[Span]:
+        """
+        記錄 with 區塊的區段，並在區塊內設為目前的區段
+
+        已在區段內時建立子區段；否則以 trace_id（未提供時產生新的識別碼）開始一個根區段。
+
+        Args:
+            name: 區段名稱
+            trace_id: 追蹤識別碼，只在沒有目前區段時使用
+            **attrs: 區段屬性
+
+        Yields:
+            Span: 建立的區段
+        """
+        parent = _current_span.get()
+        if parent is not None:
+            span = Span(name, parent.trace_id, parent.span_id, attrs=attrs)
+        else:
+            span = Span(name, trace_id or new_trace_id(), attrs=attrs)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                span.status = 'cancelled'
+            else:
+                span.status = 'error'
+                span.attrs.setdefault('error', str(e) or type(e).__name__)
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span)
+
+    def start_span(self, name: str, parent: Optional[Span], **attrs: Any) -> Optional[Span]:
+        """
+        在指定的父區段下開始一個區段，不改變目前的區段，需以 end_span 結束
+
+        Args:
+            name: 區段名稱
+            parent: 父區段，None 時不記錄
+            **attrs: 區段屬性
+
+        Returns:
+            Optional[Span]: 建立的區段
+        """
+        if parent is None:
+            return None
+        return Span(name, parent.trace_id, parent.span_id, attrs=attrs)
+
+    def end_span(self, span: Optional[Span], status: Optional[str] = None) -> None:
+        """
+        結束區段並寫入
+
+        Args:
+            span: 區段
+            status: 區段狀態，None 表示維持原狀態
+        """
+        if span is None:
+            return
+        span.duration = time.perf_counter() - span._started
+        if status:
+            span.status = status
+        self._export(span)
+
+    def record(
+        self,
+        parent: Optional[Span],
+        name: str,
+        start: float,
+        duration: float,
+        **attrs: Any
+    ) -> None:
+        """
+        補記已量測完成的區段，例如工作進程回報的階段耗時
+
+        Args:
+            parent: 父區段，None 時不記錄
+            name: 區段名稱
+            start: 開始時間（Unix 時間，秒）
+            duration: 耗時（秒）
+            **attrs: 區段屬性
+        """
+        if parent is None:
+            return
+        span = Span(name, parent.trace_id, parent.span_id, start=start, attrs=attrs)
+        span.duration = duration
+        self._export(span)
+
+    def _export(self, span: Span) -> None:
+        """交由背景執行緒寫入區段"""
+        if not self.enabled:
+            return
+        if self._listener is None:
+            self._start_listener()
+        self._handler.handle(logging.makeLogRecord({'msg': json.dumps(span.to_dict(), ensure_ascii=False)}))
+
+    def _start_listener(self) -> None:
+        """啟動寫入檔案的背景執行緒"""
+        with self._lock:
+            if self._listener is not None:
+                return
+            file_handler = RotatingFileHandler(
+                self.path,
+                maxBytes=self.max_bytes,
+                backupCount=self.backup_count,
+                encoding='utf-8'
+            )
+            self._listener = QueueListener(self._queue, file_handler)
+            self._listener.start()
+
+    def shutdown(self) -> None:
+        """寫入所有待寫入的區段並停止背景執行緒"""
+        with self._lock:
+            if self._listener is None:
+                return
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+            self._listener = None
+
+    def load(self, trace_id: str) -> List[Dict[str, Any]]:
+        """
+        讀取指定追蹤識別碼的所有區段（阻塞，應在執行緒中調用）
+
+        Args:
+            trace_id: 追蹤識別碼
+
+        Returns:
+            List[dict]: 依開始時間排序的區段
+        """
+        # 由最舊的輪替檔案讀到目前的檔案
+        paths = [self.path.with_name(f"{self.path.name}.{index}") for index in range(self.backup_count, 0, -1)]
+        paths.append(self.path)
+        needle = f'"trace_id": "{trace_id}"'
+        spans = []
+        for path in paths:
+            try:
+                with open(path, encoding='utf-8') as f:
+                    for line in f:
+                        if needle not in line:
+                            continue
+                        try:
+                            spans.append(json.loads(line))
+                        except json.JSONDecodeError:
+                            logger.warning(f"略過無法解析的追蹤紀錄: {path}")
+            except FileNotFoundError:
+                continue
+        spans.sort(key=lambda span: span['start'])
+        return spans
+
+
+# 創建全局追蹤器實例
+tracer = Tracer()
@@ -0,0 +1,205 @@
+"""
+營運儀表板頁面模組
+
+此模組提供管理員使用的 /admin 頁面，顯示佇列長度、工作進程使用率與記憶體、結果快取命中率、
+各格式的近期處理耗時、造成事件循環阻塞的處理函數以及上傳目錄大小。頁面以伺服器端計時器定期將共用快照推送至瀏覽器，
+瀏覽器不會另外發出請求。需以 ?token= 提供 settings.ADMIN_TOKEN；未設定時一律拒絕存取，
+除非明確設定 settings.ADMIN_ALLOW_LOCALHOST 允許由本機開啟。
+"""
+import hmac
+import time
+from typing import Any, Dict, Optional
+
+from fastapi import Depends, HTTPException, Request
+from nicegui import ui
+
+from src.config import settings
+from src.services.dashboard import dashboard_sampler
+
+_LOCAL_HOSTS = {'127.0.0.1', '::1', 'localhost'}
+
+
+def _require_admin(request: Request, token: str = '') -> None:
+    """檢查是否有權限開啟儀表板，在建立頁面前執行"""
+    if settings.ADMIN_TOKEN:
+        authorized = hmac.compare_digest(token.encode(), settings.ADMIN_TOKEN.encode())
+    elif settings.ADMIN_ALLOW_LOCALHOST:
+        authorized = request.client is not None and request.client.host in _LOCAL_HOSTS
+    else:
+        authorized = False
+    if not authorized:
+        raise HTTPException(status_code=403, detail="需要管理員權限")
+
+
+def _format_bytes(size: Optional[int]) -> str:
+    """格式化位元組數"""
+    if size is None:
+        return '—'
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1000 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1000
+    return ''
+
+
+def _format_seconds(seconds: Optional[float]) -> str:
+    """格式化秒數"""
+    if seconds is None:
+        return '—'
+    if seconds < 1:
+        return f"{seconds * 1000:.0f} ms"
+    if seconds < 120:
+        return f"{seconds:.1f} s"
+    return f"{seconds / 60:.1f} min"
+
+
+class AdminDashboard:
+    """營運儀表板"""
+
+    _WORKER_COLUMNS = [
+        {'name': 'index', 'label': '#', 'field': 'index', 'align': 'left'},
+        {'name': 'pid', 'label': 'PID', 'field': 'pid', 'align': 'left'},
+        {'name': 'state', 'label': '狀態', 'field': 'state', 'align': 'left'},
+        {'name': 'task', 'label': '任務', 'field': 'task', 'align': 'left'},
+        {'name': 'busy', 'label': '已執行', 'field': 'busy', 'align': 'right'},
+        {'name': 'rss', 'label': '記憶體', 'field': 'rss', 'align': 'right'},
+    ]
+    _LATENCY_COLUMNS = [
+        {'name': 'format', 'label': '格式', 'field': 'format', 'align': 'left'},
+        {'name': 'count', 'label': '文件數', 'field': 'count', 'align': 'right'},
+        {'name': 'cached', 'label': '快取', 'field': 'cached', 'align': 'right'},
+        {'name': 'failures', 'label': '失敗', 'field': 'failures', 'align': 'right'},
+        {'name': 'p50', 'label': 'P50', 'field': 'p50', 'align': 'right'},
+        {'name': 'p90', 'label': 'P90', 'field': 'p90', 'align': 'right'},
+        {'name': 'max', 'label': '最長', 'field': 'max', 'align': 'right'},
+    ]
+    _STALL_COLUMNS = [
+        {'name': 'handler', 'label': '處理函數', 'field': 'handler', 'align': 'left'},
+        {'name': 'location', 'label': '位置', 'field': 'location', 'align': 'left'},
+        {'name': 'count', 'label': '次數', 'field': 'count', 'align': 'right'},
+        {'name': 'total', 'label': '總阻塞時間', 'field': 'total', 'align': 'right'},
+        {'name': 'max', 'label': '最長', 'field': 'max', 'align': 'right'},
+    ]
+
+    def __init__(self):
+        """初始化儀表板"""
+        self.labels: Dict[str, ui.label] = {}
+        self.worker_table: Optional[ui.table] = None
+        self.latency_table: Optional[ui.table] = None
+        self.stall_table: Optional[ui.table] = None
+        self.updated_label: Optional[ui.label] = None
+
+    def _stat_card(self, key: str, title: str, icon: str) -> None:
+        """建立單一數值卡片"""
+        with ui.card().classes('min-w-[180px]'):
+            with ui.row().classes('items-center no-wrap'):
+                ui.icon(icon, size='1.5rem', color='primary')
+                ui.label(title).classes('text-caption text-grey-7')
+            self.labels[key] = ui.label('—').classes('text-h5')
+            self.labels[f"{key}_detail"] = ui.label('').classes('text-caption text-grey-7')
+
+    def create(self, snapshot: Dict[str, Any]) -> None:
+        """
+        建立儀表板並顯示第一份快照
+
+        Args:
+            snapshot: 取樣器的快照
+        """
+        with ui.column().classes('w-full p-4'):
+            with ui.row().classes('w-full items-center'):
+                ui.icon('monitor_heart', size='2rem', color='primary')
+                ui.label('營運儀表板').classes('text-h5 text-primary')
+                ui.space()
+                self.updated_label = ui.label('').classes('text-caption text-grey-7')
+
+            with ui.row().classes('w-full'):
+                self._stat_card('queue', '排隊中的任務', 'queue')
+                self._stat_card('workers', '工作進程使用率', 'memory')
+                self._stat_card('cache', '結果快取命中率', 'cached')
+                self._stat_card('uploads', '上傳目錄', 'folder')
+                self._stat_card('main', '主進程記憶體', 'dns')
+
+            ui.label('工作進程').classes('text-h6 q-mt-md')
+            self.worker_table = ui.table(columns=self._WORKER_COLUMNS, rows=[], row_key='index').classes('w-full')
+
+            ui.label(
+                f"各格式近期處理耗時（最近 {settings.DASHBOARD_LATENCY_WINDOW // 60} 分鐘）"
+            ).classes('text-h6 q-mt-md')
+            self.latency_table = ui.table(columns=self._LATENCY_COLUMNS, rows=[], row_key='format').classes('w-full')
+
+            ui.label(
+                f"事件循環阻塞最嚴重的處理函數（超過 {settings.LOOP_STALL_THRESHOLD:g} 秒）"
+            ).classes('text-h6 q-mt-md')
+            self.stall_table = ui.table(columns=self._STALL_COLUMNS, rows=[], row_key='handler').classes('w-full')
+
+        self.refresh(snapshot)
+        ui.timer(dashboard_sampler.interval, lambda: self.refresh(dashboard_sampler.latest()))
+
+    def refresh(self, snapshot: Dict[str, Any]) -> None:
+        """
+        以快照更新儀表板
+
+        Args:
+            snapshot: 取樣器的快照
+        """
+        if not snapshot:
+            return
+        self.labels['queue'].text = str(snapshot['queue_depth'])
+        self.labels['queue_detail'].text = f"上限 {snapshot['max_queue_size']}"
+        self.labels['workers'].text = f"{snapshot['utilisation']:.0%}"
+        self.labels['workers_detail'].text = (
+            f"忙碌 {snapshot['busy_workers']} / 就緒 {snapshot['ready_workers']} / 共 {snapshot['max_workers']}，"
+            f"近期平均 {snapshot['utilisation_avg']:.0%}"
+        )
+        cache = snapshot['cache']
+        self.labels['cache'].text = f"{cache['hit_ratio']:.0%}"
+        self.labels['cache_detail'].text = (
+            f"命中 {cache['hits']} / 未命中 {cache['misses']}，"
+            f"{cache['entries']} 項 {_format_bytes(cache['total_bytes'])}"
+        )
+        self.labels['uploads'].text = _format_bytes(snapshot['upload_bytes'])
+        self.labels['uploads_detail'].text = f"{snapshot['upload_files']} 個文件"
+        self.labels['main'].text = _format_bytes(snapshot['main_rss_bytes'])
+        self.labels['main_detail'].text = '事件循環所在的進程'
+
+        self.worker_table.rows = [
+            {
+                'index': worker['index'],
+                'pid': worker['pid'] or '—',
+                'state': ('執行中' if worker['task'] else '閒置') if worker['ready'] else '載入中',
+                'task': worker['task'] or '',
+                'busy': _format_seconds(worker['busy_seconds']),
+                'rss': _format_bytes(worker['rss_bytes']),
+            }
+            for worker in snapshot['workers']
+        ]
+        self.worker_table.update()
+        self.latency_table.rows = [
+            {
+                **row,
+                'p50': _format_seconds(row['p50']),
+                'p90': _format_seconds(row['p90']),
+                'max': _format_seconds(row['max']),
+            }
+            for row in snapshot['latencies']
+        ]
+        self.latency_table.update()
+        self.stall_table.rows = [
+            {
+                'handler': row['handler'],
+                'location': row['location'],
+                'count': row['count'],
+                'total': _format_seconds(row['total_seconds']),
+                'max': _format_seconds(row['max_seconds']),
+            }
+            for row in snapshot['loop_stalls']
+        ]
+        self.stall_table.update()
+        self.updated_label.text = f"更新於 {time.strftime('%H:%M:%S', time.localtime(snapshot['time']))}"
+
+
+@ui.page('/admin', dependencies=[Depends(_require_admin)])
+async def admin_page() -> None:
+    """營運儀表板頁面"""
+    ui.page_title("營運儀表板 - 文件助手")
+    AdminDashboard().create(await dashboard_sampler.current())
@@ -0,0 +1,231 @@
+"""
+批次處理面板組件
+
+此模組提供多文件與資料夾上傳的批次處理面板：上傳的文件交由 OCR 服務並行轉換，
+每份文件的狀態即時顯示於表格中，完成的結果可個別下載或合併為 ZIP 下載。
+"""
+import asyncio
+import logging
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from nicegui import ui
+
+from src.config import settings
+from src.services.ocr.ocr_service import ocr_service
+from src.services.result_store import result_store
+from src.utils.file_utils import markdown_filename, save_uploaded_file
+
+logger = logging.getLogger(__name__)
+
+# 選擇資料夾與拖放資料夾時展開其中的文件，再交給上傳元件
+_FOLDER_UPLOAD_SCRIPT = '''
+<script>
+window.batchPickFolder = (uploaderId) => {
+  const input = document.createElement('input');
+  input.type = 'file';
+  input.multiple = true;
+  input.webkitdirectory = true;
+  input.onchange = () => getElement(uploaderId).$refs.qRef.addFiles(input.files);
+  input.click();
+};
+window.batchDropFolder = async (uploaderId, event) => {
+  const entries = [...event.dataTransfer.items]
+    .map(item => item.webkitGetAsEntry && item.webkitGetAsEntry())
+    .filter(entry => entry);
+  if (!entries.some(entry => entry.isDirectory)) return;
+  event.preventDefault();
+  event.stopPropagation();
+  // 關閉上傳元件的拖放提示層
+  event.target.dispatchEvent(new DragEvent('dragleave', { bubbles: true }));
+  const files = [];
+  const walk = async (entry) => {
+    if (entry.isFile) {
+      files.push(await new Promise((resolve, reject) => entry.file(resolve, reject)));
+    } else if (entry.isDirectory) {
+      const reader = entry.createReader();
+      let batch;
+      do {
+        batch = await new Promise((resolve, reject) => reader.readEntries(resolve, reject));
+        for (const child of batch) await walk(child);
+      } while (batch.length);
+    }
+  };
+  for (const entry of entries) await walk(entry);
+  getElement(uploaderId).$refs.qRef.addFiles(files);
+};
+</script>
+'''
+
+_STATUS_COLORS = {
+    '等待中': 'grey',
+    '處理中': 'primary',
+    '完成': 'positive',
+    '失敗': 'negative',
+    '已取消': 'warning',
+}
+
+
+class BatchPanel:
+    """多文件批次處理面板"""
+
+    def __init__(self):
+        """初始化批次處理面板"""
+        self.rows: List[Dict[str, Any]] = []
+        # 已加入表格、正在保存的文件：(表格列, 保存結果)
+        self.pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self.paths: Dict[str, Path] = {}
+        self.job_ids: List[str] = []
+        self.table: Optional[ui.table] = None
+        self.upload: Optional[ui.upload] = None
+        self.batch_dir = settings.UPLOAD_DIR / f"batch_{uuid.uuid4().hex}"
+
+    def create(self) -> None:
+        """在目前的容器中建立面板"""
+        ui.add_body_html(_FOLDER_UPLOAD_SCRIPT)
+
+        with ui.column().classes('w-full'):
+            self.upload = ui.upload(
+                label='選擇或拖放多個文件、資料夾',
+                multiple=True,
+                auto_upload=True,
+                on_upload=self._handle_upload,
+                on_multi_upload=self._handle_multi_upload,
+                max_file_size=settings.MAX_FILE_SIZE
+            ).classes('w-full')
+            # 在捕獲階段攔截資料夾拖放，一般文件仍由上傳元件處理
+            self.upload.on(
+                'drop.capture',
+                js_handler=f'(event) => batchDropFolder({self.upload.id}, event)'
+            )
+
+            with ui.row().classes('w-full items-center'):
+                ui.button(
+                    '選擇資料夾',
+                    icon='folder_open'
+                ).props('flat color=primary').on(
+                    'click',
+                    js_handler=f'() => batchPickFolder({self.upload.id})'
+                )
+                ui.space()
+                ui.button('全部下載 (ZIP)', icon='archive', on_click=self._download_all).props('flat color=primary')
+                ui.button('取消處理', icon='cancel', on_click=self._cancel).props('flat color=negative')
+
+            self.table = ui.table(
+                columns=[
+                    {'name': 'name', 'label': '文件名', 'field': 'name', 'align': 'left'},
+                    {'name': 'size', 'label': '大小', 'field': 'size', 'align': 'right'},
+                    {'name': 'status', 'label': '狀態', 'field': 'status', 'align': 'left'},
+                    {'name': 'message', 'label': '訊息', 'field': 'message', 'align': 'left'},
+                    {'name': 'action', 'label': '', 'field': 'result_id', 'align': 'right'},
+                ],
+                rows=self.rows,
+                row_key='key',
+                pagination={'rowsPerPage': 20},
+            ).classes('w-full')
+            colors = ', '.join(f"'{status}': '{color}'" for status, color in _STATUS_COLORS.items())
+            self.table.add_slot('body-cell-status', f'''
+                <q-td :props="props">
+                    <q-badge :color="({{{colors}}})[props.value] || 'grey'" :label="props.value" />
+                </q-td>
+            ''')
+            self.table.add_slot('body-cell-action', '''
+                <q-td :props="props">
+                    <q-btn v-if="props.row.result_id" flat dense icon="download"
+                           @click="() => $parent.$emit('download', props.row)" />
+                </q-td>
+            ''')
+            self.table.on('download', lambda e: self._download(e.args['result_id']))
+
+    def _handle_upload(self, e) -> None:
+        """將上傳文件加入表格，並在執行緒中開始保存內容"""
+        key = uuid.uuid4().hex
+        row = {'key': key, 'name': e.name, 'size': '', 'status': '等待中', 'message': '', 'result_id': None}
+        save = asyncio.get_running_loop().run_in_executor(None, save_uploaded_file, e, self.batch_dir / key)
+        self.pending.append((row, save))
+        self.rows.append(row)
+        self.table.update()
+
+    async def _handle_multi_upload(self, e) -> None:
+        """等待一次上傳的文件全部保存後開始批次處理"""
+        self.upload.reset()
+        pending, self.pending = self.pending, []
+        rows = []
+        for row, save in pending:
+            file_path, _, error = await save
+            if error:
+                row.update(status='失敗', message=error)
+            else:
+                row['size'] = f"{file_path.stat().st_size / 1_000_000:.2f} MB"
+                self.paths[row['key']] = file_path
+                rows.append(row)
+        self.table.update()
+        if rows:
+            await self._process(rows)
+
+    async def _process(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        交由 OCR 服務並行處理文件，逐一更新各文件的狀態
+
+        Args:
+            rows: 要處理的表格列
+        """
+        job_id = uuid.uuid4().hex
+        self.job_ids.append(job_id)
+        by_path = {self.paths[row['key']]: row for row in rows}
+        for row in rows:
+            row['status'] = '處理中'
+        self.table.update()
+
+        loop = asyncio.get_running_loop()
+        try:
+            async for path, success, message, content, _ in ocr_service.process_batch(
+                list(by_path),
+                job_id=job_id,
+                client_id=ui.context.client.id
+            ):
+                row = by_path.pop(path)
+                if success:
+                    row['result_id'] = await loop.run_in_executor(
+                        None, result_store.put, content, markdown_filename(row['name'])
+                    )
+                    row.update(status='完成', message=message)
+                else:
+                    row.update(status='失敗', message=message)
+                self.table.update()
+        except Exception as ex:
+            logger.error(f"批次處理出錯: {str(ex)}", exc_info=True)
+            for row in by_path.values():
+                row.update(status='失敗', message=str(ex))
+            by_path.clear()
+        finally:
+            self.job_ids.remove(job_id)
+            # 批次被取消時，尚未完成的文件標記為已取消
+            for row in by_path.values():
+                row.update(status='已取消', message='')
+            self.table.update()
+
+    async def _cancel(self) -> None:
+        """取消所有進行中的批次"""
+        if not self.job_ids:
+            ui.notify("沒有進行中的批次", type='info')
+            return
+        for job_id in list(self.job_ids):
+            await ocr_service.cancel_processing(job_id)
+        ui.notify("已取消批次處理", type='warning')
+
+    def _download(self, result_id: str) -> None:
+        """下載單一結果"""
+        ui.download(f"/download/{result_id}")
+
+    async def _download_all(self) -> None:
+        """將所有已完成的結果合併為 ZIP 下載"""
+        result_ids = [row['result_id'] for row in self.rows if row['result_id']]
+        if not result_ids:
+            ui.notify("尚無已完成的結果", type='info')
+            return
+        bundle_id = await asyncio.get_running_loop().run_in_executor(
+            None, result_store.put_bundle, result_ids, 'ocr_results.zip'
+        )
+        ui.download(f"/download/bundle/{bundle_id}")
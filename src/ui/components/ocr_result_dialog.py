@@ -31,6 +31,8 @@ class OCRResultDialog:
         self.is_processing = False
         self.on_cancel = None
         self.on_download = None
+        self.partial_area = None
+        self.partial_container = None
     
     def show_processing_dialog(self, on_cancel: Optional[Callable] = None) -> None:
         """
@@ -42,12 +44,20 @@ class OCRResultDialog:
         self.on_cancel = on_cancel
         self.is_processing = True
         
-        with ui.dialog() as self.dialog, ui.card().classes('w-full max-w-2xl'):
+        with ui.dialog() as self.dialog, ui.card().classes('w-full max-w-4xl'):
             with ui.column().classes('w-full items-stretch'):
                 ui.label('OCR 處理中...').classes('text-h6')
-                ui.linear_progress().bind_value(self, 'progress')
+                ui.linear_progress(show_value=False).bind_value_from(
+                    self, 'progress', backward=lambda progress: progress / 100
+                )
                 ui.label().bind_text_from(self, 'status')
                 
+                # 已完成頁面的即時內容，隨處理進度逐段附加
+                self.partial_area = ui.scroll_area().classes('w-full h-[50vh] border rounded')
+                self.partial_area.visible = False
+                with self.partial_area:
+                    self.partial_container = ui.column().classes('w-full p-4')
+                
                 with ui.row().classes('w-full justify-end'):
                     ui.button('取消', on_click=self._handle_cancel, color='negative')
         
@@ -65,13 +75,28 @@ class OCRResultDialog:
         self.status = status
         ui.update(self.dialog)
     
-    def show_result(self, content: str, on_download: Optional[Callable] = None) -> None:
+    def append_content(self, content: str) -> None:
+        """
+        附加已完成頁面的內容，讓使用者在處理完成前開始閱讀
+        
+        Args:
+            content: 新完成頁面的 Markdown 內容
+        """
+        if not self.partial_container:
+            return
+        self.partial_area.visible = True
+        # 每段各自建立元素，只傳送新增的內容
+        with self.partial_container:
+            ui.markdown(content)
+    
+    def show_result(self, content: str, on_download: Optional[Callable] = None, summary: Optional[str] = None) -> None:
         """
         顯示處理結果
         
         Args:
             content: 處理結果內容
             on_download: 下載按鈕的回調函數
+            summary: 處理摘要，例如各頁是否執行 OCR
         """
         self.is_processing = False
         self.result_content = content
@@ -93,6 +118,9 @@ class OCRResultDialog:
                         ui.button('下載', on_click=lambda: self._handle_download(), 
                                  icon='download').props('flat color=primary')
                 
+                if summary:
+                    ui.label(summary).classes('text-caption text-grey-7')
+                
                 # 內容區域
                 with ui.scroll_area().classes('w-full flex-grow border rounded'):
                     self.content_display = ui.markdown(content).classes('p-4')
@@ -128,10 +156,10 @@ class OCRResultDialog:
         
         self.dialog.open()
     
-    def _handle_cancel(self) -> None:
+    async def _handle_cancel(self) -> None:
         """處理取消按鈕點擊"""
         if self.on_cancel:
-            self.on_cancel(self.dialog)
+            await self.on_cancel(self.dialog)
         if self.dialog:
             self.dialog.close()
     
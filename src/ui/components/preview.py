@@ -3,19 +3,41 @@
 
 此模組提供不同類型文件的預覽功能。
 """
-import fitz  # PyMuPDF
-import pandas as pd
+import asyncio
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Callable, List, Optional
 from nicegui import ui
 
-from src.config import settings
+from src.services.metrics import PREVIEW_SECONDS, STAGE_SECONDS
+from src.services.preview.csv_index import CSVIndex
+from src.services.preview.pdf_render_cache import pdf_render_cache
+from src.services.preview.sheet_reader import SheetReader
+from src.services.tracing import tracer
+from src.utils.file_utils import hash_file
+
+class _ClosingColumn(ui.column):
+    """刪除時（清空預覽區域或客戶端離線）一併關閉資源的容器"""
+    
+    def __init__(self, resource) -> None:
+        super().__init__()
+        self._resource = resource
+    
+    def _handle_delete(self) -> None:
+        # 關閉時需等待進行中的讀取完成，在執行緒中進行以免阻塞事件循環
+        try:
+            asyncio.get_running_loop().run_in_executor(None, self._resource.close)
+        except RuntimeError:
+            self._resource.close()
+        super()._handle_delete()
+
 
 class FilePreview:
     """文件預覽基類"""
     
-    def __init__(self, file_path: Path):
+    def __init__(self, file_path: Path, content_hash: Optional[str] = None):
         self.file_path = file_path
+        self.content_hash = content_hash
     
     async def show(self):
         """顯示文件預覽"""
@@ -28,37 +50,36 @@ class PDFPreview(FilePreview):
     async def show(self):
         """顯示 PDF 預覽"""
         try:
-            # 使用 PyMuPDF 提取 PDF 第一頁作為預覽
-            doc = fitz.open(self.file_path)
+            # 頁面由渲染快取在背景執行緒中產生，經由預覽路由提供
+            loop = asyncio.get_running_loop()
+            if self.content_hash is None:
+                self.content_hash = await loop.run_in_executor(None, hash_file, self.file_path)
+            page_count = await loop.run_in_executor(
+                None, pdf_render_cache.register, self.content_hash, self.file_path
+            )
             
             # 顯示頁面導航
             with ui.row().classes('w-full justify-center'):
-                page_slider = ui.slider(min=1, max=len(doc), value=1, step=1).props('label-slot')
+                page_slider = ui.slider(min=1, max=page_count, value=1, step=1).props('label-slot')
                 with page_slider.add_slot('label'):
                     ui.label('頁面')
                 ui.label().bind_text_from(page_slider, 'value')
             
             # 顯示當前頁面
-            page_container = ui.column().classes('w-full items-center')
+            with ui.column().classes('w-full items-center'):
+                page_image = ui.image().classes('max-w-full border')
             
-            async def update_page(e):
+            def update_page(e):
                 # 從事件參數中獲取值
                 value = e.args if isinstance(e.args, (int, float)) else getattr(e, 'value', 1)
                 page_num = int(value) - 1
-                if 0 <= page_num < len(doc):
-                    page = doc.load_page(page_num)
-                    pix = page.get_pixmap()
-                    img_path = settings.UPLOAD_DIR / f"preview_{self.file_path.stem}_{page_num}.png"
-                    pix.save(img_path)
-                    
-                    page_container.clear()
-                    with page_container:
-                        ui.image(str(img_path)).classes('max-w-full border')
+                if 0 <= page_num < page_count:
+                    page_image.set_source(f"/preview/pdf/{self.content_hash}/{page_num}.png")
             
             page_slider.on('update:model-value', update_page)
             
             # 觸發初始頁面加載
-            await update_page(type('obj', (), {'args': 1}))
+            update_page(type('obj', (), {'args': 1}))
             
         except Exception as e:
             ui.notify(f"預覽 PDF 時出錯: {str(e)}", type='negative')
@@ -158,18 +179,30 @@ class PPTXPreview(FilePreview):
 class ExcelPreview(FilePreview):
     """Excel 文件預覽"""
     
-    async def show(self, num_rows: int = 100):
-        """顯示 Excel 預覽"""
+    async def show(self, page_size: int = 10):
+        """顯示 Excel 預覽
+        
+        Args:
+            page_size: 每頁顯示的行數
+        """
         try:
-            xl = pd.ExcelFile(self.file_path)
+            # 以唯讀串流方式讀取，只取出目前頁面的資料列
+            loop = asyncio.get_running_loop()
+            reader = SheetReader(self.file_path)
+            try:
+                sheet_names = await loop.run_in_executor(None, lambda: reader.sheet_names)
+            except Exception:
+                await loop.run_in_executor(None, reader.close)
+                raise
             
-            with ui.column().classes('w-full'):
+            # 唯讀工作簿會保持文件開啟，預覽被移除時關閉
+            with _ClosingColumn(reader).classes('w-full'):
                 # 工作表選擇器
                 with ui.row().classes('w-full items-center'):
                     sheet_select = ui.select(
                         label='工作表',
-                        options=xl.sheet_names,
-                        value=xl.sheet_names[0],
+                        options=sheet_names,
+                        value=sheet_names[0],
                     ).classes('w-64')
                     
                     # 添加展開/收合按鈕
@@ -186,29 +219,27 @@ class ExcelPreview(FilePreview):
                     # 表格容器
                     table_container = ui.column().classes('w-full')
                     
-                    def update_table(sheet_name: str):
+                    async def update_table(sheet_name: str):
                         try:
-                            # 讀取選中的工作表
-                            df = xl.parse(sheet_name)
+                            # 總行數由工作表尺寸資訊取得，不解析整張工作表
+                            header, total = await loop.run_in_executor(
+                                None, lambda: (reader.header(sheet_name), reader.row_count(sheet_name))
+                            )
                             
                             # 清空容器
                             table_container.clear()
                             
                             # 顯示數據總行數
                             with table_container:
-                                ui.label(f'總行數: {len(df)}')
-                                
-                                # 創建分頁表格
-                                grid = ui.aggrid.from_pandas(df.head(num_rows))  # 限制最大顯示100行
-                                grid.classes('w-full')
-                                
-                                # 添加分頁控制
-                                grid.options['pagination'] = True
-                                grid.options['paginationPageSize'] = 10
-                                grid.update()
+                                ui.label(f'總行數: {total}')
                                 
-                                if len(df) > num_rows:
-                                    ui.label(f"... (僅顯示前{num_rows}行)")
+                                # 創建伺服器端分頁表格
+                                await create_paginated_table(
+                                    header,
+                                    total,
+                                    lambda start, count: reader.read_rows(sheet_name, start, count),
+                                    page_size=page_size
+                                )
                                     
                             return True
                         except Exception as e:
@@ -232,12 +263,12 @@ class ExcelPreview(FilePreview):
                     expand_btn.on_click(toggle_expand)
                     
                     # 綁定工作表選擇變化事件
-                    def on_sheet_change(e):
+                    async def on_sheet_change(e):
                         # 從事件參數中獲取工作表名稱
                         if isinstance(e.args, dict) and 'label' in e.args:
-                            update_table(e.args['label'])
+                            await update_table(e.args['label'])
                         else:
-                            update_table(e.args)
+                            await update_table(e.args)
                     
                     sheet_select.on('update:model-value', on_sheet_change)
                     
@@ -245,7 +276,7 @@ class ExcelPreview(FilePreview):
                     card.classes('max-h-12 overflow-hidden transition-all duration-300')
                     
                     # 初始加載第一個工作表的數據
-                    ui.timer(0.1, lambda: update_table(xl.sheet_names[0]), once=True)
+                    ui.timer(0.1, lambda: update_table(sheet_names[0]), once=True)
                     
         except Exception as e:
             ui.notify(f"預覽 Excel 時出錯: {str(e)}", type='negative')
@@ -255,36 +286,82 @@ class ExcelPreview(FilePreview):
 class CSVPreview(FilePreview):
     """CSV 文件預覽"""
     
-    async def show(self, num_rows: int = 100):
+    async def show(self, page_size: int = 10):
         """顯示 CSV 預覽
         
         Args:
-            num_rows: 要顯示的行數
+            page_size: 每頁顯示的行數
         """
         try:
-            df = pd.read_csv(self.file_path, nrows=num_rows)
+            # 建立行位移索引，翻頁時直接跳至對應位置讀取
+            loop = asyncio.get_running_loop()
+            index = await loop.run_in_executor(None, CSVIndex, self.file_path)
+            header = await loop.run_in_executor(None, index.header)
             
             with ui.column().classes('w-full'):
-                # 創建表格
-                columns = [{'name': col, 'label': col, 'field': col} for col in df.columns]
-                rows = df.to_dict('records')
+                ui.label(f'總行數: {index.row_count}')
                 
-                # 創建表格並設置列和行
-                table = ui.table(
-                    columns=columns,
-                    rows=rows,
-                    row_key='id',
-                    pagination={'rowsPerPage': 10}
-                ).classes('w-full')
-                
-                if len(df) >= num_rows:
-                    ui.label(f"... (僅顯示前{num_rows}行)")
+                # 創建伺服器端分頁表格
+                await create_paginated_table(header, index.row_count, index.read_rows, page_size=page_size)
                     
         except Exception as e:
             ui.notify(f"預覽 CSV 時出錯: {str(e)}", type='negative')
             ui.label(f"無法預覽 CSV 文件: {str(e)}")
 
 
+async def create_paginated_table(
+    header: List[str],
+    total_rows: int,
+    fetch_rows: Callable[[int, int], List[List[str]]],
+    page_size: int = 10
+) -> ui.table:
+    """
+    創建伺服器端分頁表格，翻頁時才讀取該頁的資料列
+    
+    Args:
+        header: 欄位標題
+        total_rows: 資料總列數
+        fetch_rows: 讀取資料列的函數，接收 (起始列, 列數)，在執行器中調用
+        page_size: 每頁顯示的行數
+        
+    Returns:
+        ui.table: 表格元件
+    """
+    loop = asyncio.get_running_loop()
+    columns = [
+        {'name': f'c{i}', 'label': label or f'Col {i+1}', 'field': f'c{i}', 'align': 'left'}
+        for i, label in enumerate(header)
+    ]
+    
+    def to_records(start: int, rows: List[List[str]]) -> List[dict]:
+        records = []
+        for offset, row in enumerate(rows):
+            record = {f'c{i}': value for i, value in enumerate(row)}
+            record['__row'] = start + offset
+            records.append(record)
+        return records
+    
+    first_rows = await loop.run_in_executor(None, fetch_rows, 0, page_size)
+    table = ui.table(
+        columns=columns,
+        rows=to_records(0, first_rows),
+        row_key='__row',
+        pagination={'rowsPerPage': page_size, 'page': 1, 'rowsNumber': total_rows},
+    ).classes('w-full').props('rows-per-page-options="[10, 25, 50, 100]"')
+    
+    async def on_request(e):
+        pagination = e.args['pagination']
+        per_page = pagination.get('rowsPerPage') or page_size
+        start = (pagination.get('page', 1) - 1) * per_page
+        rows = await loop.run_in_executor(None, fetch_rows, start, per_page)
+        table.rows = to_records(start, rows)
+        table.pagination = {**pagination, 'rowsNumber': total_rows}
+        table.update()
+    
+    table.on('request', on_request)
+    return table
+
+
 # 文件類型到預覽類的映射
 PREVIEW_CLASSES = {
     'application/pdf': PDFPreview,
@@ -300,13 +377,35 @@ PREVIEW_CLASSES = {
 }
 
 
-def get_preview_handler(file_path: Path, file_type: str) -> Optional[FilePreview]:
+async def show_preview(handler: FilePreview) -> None:
+    """
+    顯示預覽並記錄預覽處理器的耗時
+    
+    Args:
+        handler: 預覽處理器
+    """
+    started = time.perf_counter()
+    try:
+        with tracer.span('preview', handler=type(handler).__name__):
+            await handler.show()
+    finally:
+        elapsed = time.perf_counter() - started
+        PREVIEW_SECONDS.observe(elapsed, type(handler).__name__)
+        STAGE_SECONDS.observe(elapsed, 'preview')
+
+
+def get_preview_handler(
+    file_path: Path,
+    file_type: str,
+    content_hash: Optional[str] = None
+) -> Optional[FilePreview]:
     """
     根據文件類型獲取對應的預覽處理器
     
     Args:
         file_path: 文件路徑
         file_type: 文件 MIME 類型
+        content_hash: 文件內容的 SHA-256
         
     Returns:
         FilePreview 實例，如果不支援則返回 None
@@ -314,4 +413,4 @@ def get_preview_handler(file_path: Path, file_type: str) -> Optional[FilePreview
     preview_class = PREVIEW_CLASSES.get(file_type)
     if not preview_class:
         return None
-    return preview_class(file_path)
+    return preview_class(file_path, content_hash)
@@ -1,20 +1,26 @@
 """
 主用戶界面模組
 
-此模組包含應用的主用戶界面。
+此模組包含應用的主用戶界面。每個瀏覽器分頁各自建立一份界面與狀態，
+轉換任務以分頁的客戶端識別碼排程，各分頁之間輪流執行。
 """
-import os
+import asyncio
 import logging
+import uuid
 from pathlib import Path
 from typing import Optional
 
 from nicegui import ui
 
 from src.config import settings
-from src.utils.file_utils import save_uploaded_file, get_file_info, sanitize_filename
-from src.ui.components.preview import get_preview_handler
+from src.utils.file_utils import save_uploaded_file, get_file_info, markdown_filename
+from src.ui.components.batch_panel import BatchPanel
+from src.ui.components.preview import get_preview_handler, show_preview
 from src.ui.components.ocr_result_dialog import OCRResultDialog
+from src.services.metrics import STAGE_SECONDS
 from src.services.ocr.ocr_service import ocr_service
+from src.services.result_store import result_store
+from src.services.tracing import new_trace_id, tracer
 
 # 配置日誌
 logger = logging.getLogger(__name__)
@@ -26,7 +32,6 @@ class MainUI:
         """初始化主界面"""
         self.current_file_path = None
         self.preview_container = None
-        self.ocr_dialog = None
     
     async def init_ui(self):
         """初始化用戶界面"""
@@ -62,6 +67,9 @@ class MainUI:
             
             ui.label('上傳文件進行 OCR 處理或預覽').classes('text-subtitle1 text-grey-8')
             
+            # OCR 服務狀態（模型在背景載入，完成前仍可上傳與預覽）
+            ui.label().bind_text_from(ocr_service, 'status_text').classes('text-caption text-grey-7')
+            
             # 上傳區域
             with ui.card().classes('w-full max-w-3xl q-mt-md'):
                 with ui.column().classes('w-full items-center'):
@@ -71,6 +79,10 @@ class MainUI:
                         max_file_size=settings.MAX_FILE_SIZE
                     ).classes('w-full')
             
+            # 批次處理區域：多文件或整個資料夾並行轉換
+            with ui.expansion('批次處理多個文件', icon='library_books').classes('w-full max-w-3xl q-mt-md bg-white'):
+                BatchPanel().create()
+            
             # 預覽區域
             self.preview_container = ui.column().classes('w-full max-w-5xl q-mt-lg')
     
@@ -113,11 +125,21 @@ class MainUI:
     
     async def _handle_upload(self, e):
         """處理文件上傳事件"""
+        # 每個上傳的文件為一個追蹤，之後的 OCR 處理沿用同一個追蹤識別碼
+        trace_id = new_trace_id()
+        with STAGE_SECONDS.time('upload'), tracer.span('upload', trace_id=trace_id, filename=e.name):
+            await self._show_upload(e, trace_id)
+    
+    async def _show_upload(self, e, trace_id: str):
+        """保存上傳的文件並顯示文件訊息與預覽"""
         # 清空預覽區域
         self.preview_container.clear()
         
-        # 保存上傳的文件
-        file_path, error = save_uploaded_file(e)
+        # 保存上傳的文件（同時計算內容雜湊），在執行緒中寫入，不佔用事件循環
+        with STAGE_SECONDS.time('save'), tracer.span('ingest'):
+            file_path, content_hash, error = await asyncio.get_running_loop().run_in_executor(
+                None, save_uploaded_file, e
+            )
         if error:
             ui.notify(error, type='negative')
             return
@@ -144,12 +166,15 @@ class MainUI:
                         
                         ui.label('類型:')
                         ui.label(file_info['type'])
+                        
+                        ui.label('追蹤紀錄:')
+                        ui.link(trace_id, f"/traces/{trace_id}", new_tab=True).classes('text-caption')
                 
                 # 添加 OCR 按鈕
                 with ui.row().classes('w-full justify-center q-mt-md'):
                     ui.button(
                         '執行 OCR 辨識', 
-                        on_click=lambda: self._run_ocr(file_path, file_info['name']),
+                        on_click=lambda: self._run_ocr(file_path, file_info['name'], content_hash, trace_id),
                         icon='image_search'
                     ).props('color=primary')
                 
@@ -158,105 +183,115 @@ class MainUI:
                 ui.label('文件預覽').classes('text-h6')
                 
                 # 根據文件類型顯示預覽
-                preview_handler = get_preview_handler(file_path, e.type)
+                preview_handler = get_preview_handler(file_path, e.type, content_hash)
                 if preview_handler:
-                    await preview_handler.show()
+                    await show_preview(preview_handler)
                 else:
                     ui.label(f"不支援預覽 {file_info['type']} 類型的文件")
     
-    async def _run_ocr(self, file_path: Path, original_filename: str):
+    async def _run_ocr(
+        self,
+        file_path: Path,
+        original_filename: str,
+        content_hash: Optional[str] = None,
+        trace_id: Optional[str] = None
+    ):
         """
         執行 OCR 處理
         
         Args:
             file_path: 文件路徑
             original_filename: 原始文件名
+            content_hash: 文件內容的 SHA-256
+            trace_id: 上傳時建立的追蹤識別碼
         """
-        # 創建 OCR 結果對話框
-        self.ocr_dialog = OCRResultDialog(original_filename)
+        # 對話框與任務識別碼只屬於這次處理，同時進行的其他處理不會互相覆蓋
+        ocr_dialog = OCRResultDialog(original_filename)
+        job_id = uuid.uuid4().hex
+        
+        # 取消時只取消這次處理的任務
+        async def cancel_ocr(dialog):
+            await ocr_service.cancel_processing(job_id)
+            dialog.close()
         
         # 顯示處理中的對話框
-        self.ocr_dialog.show_processing_dialog(on_cancel=self._cancel_ocr)
+        ocr_dialog.show_processing_dialog(on_cancel=cancel_ocr)
         
         # 定義進度回調函數
         async def progress_callback(progress: int, status: str):
-            if hasattr(self, 'ocr_dialog') and self.ocr_dialog:
-                self.ocr_dialog.update_progress(progress, status)
+            ocr_dialog.update_progress(progress, status)
+        
+        # 定義頁面結果回調函數，將已完成的頁面即時顯示
+        async def page_callback(content: str, pages_done: int, total_pages: int):
+            if content:
+                ocr_dialog.append_content(content)
         
         # 執行 OCR 處理
         try:
-            success, message, result = await ocr_service.process_document(
-                file_path,
-                progress_callback=progress_callback
-            )
+            with tracer.span('ocr', trace_id=trace_id, job_id=job_id):
+                success, message, result = await ocr_service.process_document(
+                    file_path,
+                    progress_callback=progress_callback,
+                    job_id=job_id,
+                    content_hash=content_hash,
+                    page_callback=page_callback,
+                    client_id=ui.context.client.id
+                )
         except asyncio.CancelledError:
             logger.info("OCR 處理已被取消")
             return
         except Exception as e:
             logger.error(f"OCR 處理出錯: {str(e)}", exc_info=True)
-            self.ocr_dialog.show_error(f"處理過程中發生錯誤: {str(e)}")
+            ocr_dialog.show_error(f"處理過程中發生錯誤: {str(e)}")
             return
         
         if success and result:
+            content = result if isinstance(result, str) else result.get('content', '')
+            
+            # 將結果保存在伺服器端，供下載路由以串流方式提供
+            result_id = await asyncio.get_running_loop().run_in_executor(
+                None, result_store.put, content, self._download_filename(original_filename)
+            )
+            
             # 顯示處理結果
-            self.ocr_dialog.show_result(
-                content=result if isinstance(result, str) else result.get('content', ''),
-                on_download=self._download_markdown
+            ocr_dialog.show_result(
+                content=content,
+                on_download=lambda _content, _filename: self._download_markdown(result_id),
+                summary=message
             )
         else:
             # 顯示錯誤訊息
-            self.ocr_dialog.show_error(message)
+            ocr_dialog.show_error(message)
     
-    async def _cancel_ocr(self, dialog):
-        """取消正在進行的 OCR 處理"""
-        await ocr_service.cancel_processing()
-        dialog.close()
+    def _download_filename(self, original_filename: str) -> str:
+        """
+        生成下載文件名
+        
+        Args:
+            original_filename: 原始文件名
+            
+        Returns:
+            str: 下載文件名
+        """
+        return markdown_filename(original_filename)
     
-    async def _download_markdown(self, content: str, original_filename: str):
+    async def _download_markdown(self, result_id: str):
         """
         下載 Markdown 文件
         
         Args:
-            content: Markdown 內容
-            original_filename: 原始文件名
+            result_id: 伺服器端保存的結果識別碼
         """
         try:
-            # 生成下載文件名
-            base_name = os.path.splitext(original_filename)[0]
-            safe_name = sanitize_filename(base_name)
-            download_filename = f"{safe_name}_ocr_result.md"
-            
-            # 確保內容是字節類型
-            if isinstance(content, str):
-                logger.debug("內容是字符串，進行編碼")
-                content_bytes = content.encode('utf-8')
-            
-            logger.debug(f"內容字節長度: {len(content_bytes) if content_bytes else 0}")
-            
-            # 使用 JavaScript 處理下載
-            js = f"""
-            try {{
-                // 將 Python 字節轉換為 JavaScript Uint8Array
-                const content = new TextDecoder().decode(new Uint8Array({list(content_bytes)}));
-                const blob = new Blob([content], {{ type: 'text/markdown;charset=utf-8' }});
-                const url = URL.createObjectURL(blob);
-                const a = document.createElement('a');
-                a.href = url;
-                a.download = '{download_filename}';
-                document.body.appendChild(a);
-                a.click();
-                // 清理
-                setTimeout(() => {{
-                    document.body.removeChild(a);
-                    URL.revokeObjectURL(url);
-                }}, 100);
-            }} catch (e) {{
-                console.error('下載錯誤:', e);
-                throw e;
-            }}
-            """
-            ui.run_javascript(js)
-            ui.notify(f"已開始下載: {safe_name}", type='positive')
+            # 由瀏覽器直接向下載路由請求文件，不經由 websocket 傳送內容
+            ui.download(f"/download/{result_id}")
+            ui.notify("已開始下載", type='positive')
         except Exception as e:
             logger.error(f"下載 Markdown 文件時出錯: {str(e)}", exc_info=True)
             ui.notify(f"下載文件時出錯: {str(e)}", type='negative')
+
+
+@ui.page('/')
+async def main_page() -> None:
+    """主頁面，每個瀏覽器分頁各自擁有一個 MainUI"""
+    await MainUI().init_ui()
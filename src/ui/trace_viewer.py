@@ -0,0 +1,118 @@
+"""
+追蹤檢視頁面模組
+
+此模組提供 /traces/{trace_id} 頁面，以瀑布圖顯示單一任務各區段的開始時間、耗時與父子關係。
+"""
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from nicegui import ui
+
+from src.services.tracing import tracer
+
+
+def _format_duration(seconds: float) -> str:
+    """將秒數格式化為易讀的耗時"""
+    if seconds < 1:
+        return f"{seconds * 1000:.1f} ms"
+    if seconds < 60:
+        return f"{seconds:.2f} s"
+    minutes, seconds = divmod(seconds, 60)
+    return f"{int(minutes)} m {seconds:.0f} s"
+
+
+def _bar_color(span: Dict[str, Any]) -> str:
+    """依區段類型與狀態決定顏色"""
+    if span['status'] != 'ok':
+        return 'var(--q-negative)'
+    if span['name'] == 'queue_wait':
+        return '#9E9E9E'
+    if span['name'].startswith('docling.'):
+        return 'var(--q-accent)'
+    if span['name'].startswith('worker.'):
+        return 'var(--q-warning)'
+    return 'var(--q-primary)'
+
+
+def _order_spans(spans: List[Dict[str, Any]]) -> List[Tuple[int, Dict[str, Any]]]:
+    """
+    依父子關係排列區段，同一層依開始時間排序
+
+    Args:
+        spans: 區段列表
+
+    Returns:
+        List[Tuple[深度, 區段]]: 深度優先排列的區段
+    """
+    span_ids = {span['span_id'] for span in spans}
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    for span in spans:
+        # 父區段不在紀錄中（尚未結束或已輪替移除）時視為根區段
+        parent_id = span['parent_id'] if span['parent_id'] in span_ids else None
+        children.setdefault(parent_id, []).append(span)
+
+    ordered = []
+
+    def visit(parent_id: Optional[str], depth: int) -> None:
+        for span in sorted(children.get(parent_id, []), key=lambda item: item['start']):
+            ordered.append((depth, span))
+            visit(span['span_id'], depth + 1)
+
+    visit(None, 0)
+    return ordered
+
+
+def _describe(span: Dict[str, Any], begin: float) -> str:
+    """產生區段的提示文字"""
+    parts = [
+        f"{span['name']}：開始於 +{_format_duration(span['start'] - begin)}，耗時 {_format_duration(span['duration'])}"
+    ]
+    if span['status'] != 'ok':
+        parts.append(f"狀態：{span['status']}")
+    parts.extend(f"{key}: {value}" for key, value in span['attrs'].items())
+    return '；'.join(parts)
+
+
+@ui.page('/traces/{trace_id}')
+async def trace_page(trace_id: str) -> None:
+    """
+    顯示單一追蹤的區段瀑布圖
+
+    Args:
+        trace_id: 追蹤識別碼（API 任務即為任務識別碼）
+    """
+    ui.page_title(f"追蹤紀錄 {trace_id[:8]} - 文件助手")
+    spans = await asyncio.get_running_loop().run_in_executor(None, tracer.load, trace_id)
+
+    with ui.column().classes('w-full p-4'):
+        with ui.row().classes('items-center'):
+            ui.icon('timeline', size='2rem', color='primary')
+            ui.label('追蹤紀錄').classes('text-h5 text-primary')
+        ui.label(trace_id).classes('text-caption text-grey-7')
+
+        if not spans:
+            ui.label('找不到此追蹤的紀錄，任務可能尚未有區段結束，或紀錄已被輪替移除').classes('text-grey-8')
+            return
+
+        begin = min(span['start'] for span in spans)
+        end = max(span['start'] + span['duration'] for span in spans)
+        total = max(end - begin, 1e-6)
+        ui.label(f"共 {len(spans)} 個區段，總耗時 {_format_duration(end - begin)}").classes('text-subtitle1')
+
+        with ui.element('div').classes('w-full').style(
+            'display: grid; grid-template-columns: minmax(220px, 28%) 90px 1fr;'
+            'gap: 2px 12px; align-items: center; font-size: 13px'
+        ):
+            for depth, span in _order_spans(spans):
+                description = _describe(span, begin)
+                ui.label(span['name']).style(
+                    f"padding-left: {depth * 16}px; white-space: nowrap; overflow: hidden; text-overflow: ellipsis"
+                ).tooltip(description)
+                ui.label(_format_duration(span['duration'])).style('text-align: right; font-family: monospace')
+                left = 100 * (span['start'] - begin) / total
+                width = max(100 * span['duration'] / total, 0.2)
+                with ui.element('div').style('position: relative; height: 14px; background: #f0f0f0'):
+                    ui.element('div').style(
+                        f"position: absolute; top: 0; bottom: 0; left: {left:.3f}%; width: {width:.3f}%;"
+                        f"background: {_bar_color(span)}; border-radius: 2px"
+                    ).tooltip(description)
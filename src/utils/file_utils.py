@@ -3,15 +3,19 @@
 
 此模組提供處理文件的工具函數，包括文件上傳、下載和預覽等功能。
 """
+import asyncio
+import hashlib
 import os
 import re
+import shutil
 import unicodedata
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import AsyncIterator, BinaryIO, Optional, Tuple
 
 from nicegui import ui
 
 from src.config import settings
+from src.services.metrics import BYTES_INGESTED_TOTAL
 
 
 def sanitize_filename(filename: str) -> str:
@@ -32,45 +36,176 @@ def sanitize_filename(filename: str) -> str:
     return sanitized
 
 
-def save_uploaded_file(uploaded_file) -> Tuple[Optional[Path], Optional[str]]:
+def write_stream(
+    stream: BinaryIO,
+    file_path: Path,
+    max_size: int = settings.MAX_FILE_SIZE,
+    chunk_size: int = settings.UPLOAD_CHUNK_SIZE
+) -> Tuple[int, str]:
+    """
+    以固定大小的區塊將串流寫入磁碟，同時計算大小與 SHA-256
+    
+    內容先寫入暫存檔，完成後才替換為目標文件；超過大小限制時立即中止並刪除暫存檔。
+    
+    Args:
+        stream (BinaryIO): 來源串流
+        file_path (Path): 目標文件路徑
+        max_size (int): 允許的最大位元組數
+        chunk_size (int): 每次讀取的位元組數
+        
+    Returns:
+        Tuple[int, str]: (文件大小, 內容雜湊)
+        
+    Raises:
+        ValueError: 內容超過大小限制
+    """
+    digest = hashlib.sha256()
+    size = 0
+    part_path = file_path.with_name(file_path.name + '.part')
+    try:
+        with open(part_path, 'wb') as f:
+            for chunk in iter(lambda: stream.read(chunk_size), b''):
+                size += len(chunk)
+                if size > max_size:
+                    raise ValueError(f"檔案大小超過限制 (最大 {max_size/1_000_000}MB)")
+                digest.update(chunk)
+                f.write(chunk)
+        os.replace(part_path, file_path)
+    except BaseException:
+        if part_path.exists():
+            part_path.unlink()
+        raise
+    return size, digest.hexdigest()
+
+
+async def write_async_stream(
+    chunks: AsyncIterator[bytes],
+    file_path: Path,
+    max_size: int = settings.MAX_FILE_SIZE,
+    chunk_size: int = settings.UPLOAD_CHUNK_SIZE
+) -> Tuple[int, str]:
+    """
+    將非同步串流（例如 HTTP 請求內容）寫入磁碟，同時計算大小與 SHA-256
+
+    收到的資料累積至 chunk_size 後才在執行緒中寫入，記憶體用量不超過一個區塊，
+    也不阻塞事件循環。內容先寫入暫存檔，完成後才替換為目標文件。
+
+    Args:
+        chunks (AsyncIterator[bytes]): 來源串流
+        file_path (Path): 目標文件路徑
+        max_size (int): 允許的最大位元組數
+        chunk_size (int): 每次寫入的位元組數
+
+    Returns:
+        Tuple[int, str]: (文件大小, 內容雜湊)
+
+    Raises:
+        ValueError: 內容超過大小限制
+    """
+    loop = asyncio.get_running_loop()
+    digest = hashlib.sha256()
+    size = 0
+    part_path = file_path.with_name(file_path.name + '.part')
+
+    def write_block(f: BinaryIO, block: bytes) -> None:
+        digest.update(block)
+        f.write(block)
+
+    try:
+        f = await loop.run_in_executor(None, open, part_path, 'wb')
+        try:
+            buffer = bytearray()
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_size:
+                    raise ValueError(f"檔案大小超過限制 (最大 {max_size/1_000_000}MB)")
+                buffer += chunk
+                if len(buffer) >= chunk_size:
+                    await loop.run_in_executor(None, write_block, f, bytes(buffer))
+                    buffer.clear()
+            if buffer:
+                await loop.run_in_executor(None, write_block, f, bytes(buffer))
+        finally:
+            await loop.run_in_executor(None, f.close)
+        os.replace(part_path, file_path)
+    except BaseException:
+        if part_path.exists():
+            part_path.unlink()
+        raise
+    return size, digest.hexdigest()
+
+
+def save_uploaded_file(
+    uploaded_file,
+    target_dir: Path = settings.UPLOAD_DIR
+) -> Tuple[Optional[Path], Optional[str], Optional[str]]:
     """
     保存上傳的文件到臨時目錄
     
     Args:
         uploaded_file: 上傳的文件對象
+        target_dir (Path): 保存目錄
         
     Returns:
-        Tuple[Optional[Path], Optional[str]]: (文件路徑, 錯誤訊息)
+        Tuple[Optional[Path], Optional[str], Optional[str]]: (文件路徑, 內容雜湊, 錯誤訊息)
     """
     if not uploaded_file.content:
-        return None, "未選擇文件"
+        return None, None, "未選擇文件"
     
     try:
-        # 檢查檔案大小
-        file_size = len(uploaded_file.content.read())
-        uploaded_file.content.seek(0)  # 重置文件指針
-        
-        if file_size > settings.MAX_FILE_SIZE:
-            return None, f"檔案大小超過限制 (最大 {settings.MAX_FILE_SIZE/1_000_000}MB)"
-        
         # 檢查文件類型
         if uploaded_file.type not in settings.SUPPORTED_FILE_TYPES:
-            return None, "不支援的文件類型"
+            return None, None, "不支援的文件類型"
 
         # 生成安全檔名
         file_name = uploaded_file.name
         safe_name = sanitize_filename(file_name)
-        file_path = settings.UPLOAD_DIR / safe_name
+        target_dir.mkdir(parents=True, exist_ok=True)
+        file_path = target_dir / safe_name
         
-        # 保存文件
-        with open(file_path, 'wb') as f:
-            uploaded_file.content.seek(0)
-            f.write(uploaded_file.content.read())
+        # 單次分塊寫入文件，同時檢查大小並計算雜湊
+        uploaded_file.content.seek(0)
+        size, content_hash = write_stream(uploaded_file.content, file_path)
+        BYTES_INGESTED_TOTAL.inc(uploaded_file.type, amount=size)
             
-        return file_path, None
+        return file_path, content_hash, None
         
+    except ValueError as e:
+        return None, None, str(e)
     except Exception as e:
-        return None, f"保存文件時發生錯誤: {str(e)}"
+        return None, None, f"保存文件時發生錯誤: {str(e)}"
+
+
+def markdown_filename(original_filename: str) -> str:
+    """
+    生成轉換結果的下載文件名
+    
+    Args:
+        original_filename (str): 原始文件名
+        
+    Returns:
+        str: 下載文件名
+    """
+    base_name = os.path.splitext(original_filename)[0]
+    return f"{sanitize_filename(base_name)}_ocr_result.md"
+
+
+def hash_file(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    計算文件內容的 SHA-256
+    
+    Args:
+        file_path (Path): 文件路徑
+        chunk_size (int): 每次讀取的位元組數
+        
+    Returns:
+        str: 十六進位的雜湊值
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
 
 
 def get_file_info(file_path: Path) -> dict:
@@ -104,6 +239,9 @@ def clear_upload_directory() -> None:
         try:
             if file.is_file():
                 file.unlink()
+            elif file.is_dir():
+                # 批次上傳的文件各自保存在子目錄中
+                shutil.rmtree(file)
         except Exception as e:
             print(f"無法刪除文件 {file}: {e}")
 
@@ -0,0 +1,37 @@
+"""
+批次處理測試
+
+損壞的文件只應使該文件失敗，批次中的其他文件仍需返回結果。
+"""
+import asyncio
+from pathlib import Path
+
+from src.services.ocr.ocr_service import OCRService
+from src.services.ocr.result_cache import ResultCache
+from src.utils.file_utils import hash_file
+
+
+async def _collect(service: OCRService, paths):
+    return [result async for result in service.process_batch(paths)]
+
+
+def test_unreadable_pdf_fails_only_itself(tmp_path: Path):
+    """無法讀取的 PDF 回報為失敗，其他文件照常返回結果"""
+    service = OCRService(max_workers=1)
+    service.cache = ResultCache(cache_dir=tmp_path / 'cache')
+
+    broken = tmp_path / 'broken.pdf'
+    broken.write_bytes(b'%PDF-1.7\nnot really a pdf')
+    good = tmp_path / 'good.csv'
+    good.write_text('a,b\n1,2\n', encoding='utf-8')
+    # 預先放入快取，不需啟動工作進程即可取得結果
+    service.cache.put(service.cache.make_key(hash_file(good), service.pipeline_options()), '| a | b |\n')
+    missing = tmp_path / 'missing.pdf'
+
+    results = asyncio.run(_collect(service, [broken, good, missing]))
+
+    by_path = {path: (success, message, content) for path, success, message, content, _ in results}
+    assert set(by_path) == {broken, good, missing}
+    assert by_path[good][0] and by_path[good][2] == '| a | b |\n'
+    assert not by_path[broken][0] and by_path[broken][1].startswith("OCR 處理出錯")
+    assert not by_path[missing][0]